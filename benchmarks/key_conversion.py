@@ -0,0 +1,95 @@
+"""
+Time per payload to convert Lavalink's camelCased keys with
+lavalink_dictovert, and to build constructs from them with
+Serializable.construct, next to a plain recursive dict copy.
+
+Each payload is converted raw (as it arrives from orjson), and again once
+already converted, which is how RestAPI and WebSocket hand payloads on to
+construct().
+
+    python -m benchmarks.key_conversion [count]
+"""
+from __future__ import annotations
+import functools
+import gc
+import orjson as json
+import sys
+import time
+import typing as t
+
+from koe.impl.constructs.stats import NodeStats
+from koe.impl.constructs.track import Track
+from koe.testing import make_track
+from koe.utils import lavalink_dictovert
+
+
+def plain_copy(data: dict[str, t.Any]) -> dict[str, t.Any]:
+    """
+    Walk a payload like lavalink_dictovert does, without renaming keys.
+    Lists are left alone, as lavalink_dictovert leaves them.
+    """
+    return {key: plain_copy(value) if isinstance(value, dict) else value for key, value in data.items()}
+
+
+def payloads() -> dict[str, bytes]:
+    return {
+        'track': json.dumps({'loadType': "track", 'data': make_track("benchmark")}),
+        'search': json.dumps({'loadType': "search", 'data': [make_track("ytsearch:benchmark", index) for index in range(10)]}),
+        'stats': json.dumps({
+            'op': "stats",
+            'players': 1,
+            'playingPlayers': 1,
+            'uptime': 123456789,
+            'memory': {'free': 123456789, 'used': 123456789, 'allocated': 123456789, 'reservable': 123456789},
+            'cpu': {'cores': 4, 'systemLoad': 0.5, 'lavalinkLoad': 0.5},
+            'frameStats': {'sent': 6000, 'nulled': 10, 'deficit': -3010}
+        })
+    }
+
+
+def construct(kind: str, data: dict[str, t.Any]) -> t.Any:
+    if kind == "track":
+        return Track.construct(data['data'])
+    if kind == "search":
+        return [Track.construct(track) for track in data['data']]
+    return NodeStats.construct(data)
+
+
+def measure(name: str, count: int, prepare: t.Callable[[], list[t.Any]], run: t.Callable[[t.Any], t.Any]) -> None:
+    inputs = prepare()
+    for value in inputs[:100]:
+        run(value)
+
+    # Like timeit, keep the collector out of the timing.
+    gc.collect()
+    gc.disable()
+    try:
+        started = time.perf_counter()
+        for value in inputs:
+            run(value)
+        elapsed = time.perf_counter() - started
+    finally:
+        gc.enable()
+
+    print(f"{name:<32} {elapsed / count * 1e6:>9.2f}us/payload")
+
+
+def main(count: int = 10000) -> None:
+    for kind, raw in payloads().items():
+        # Fresh dicts for every run, as each frame is parsed anew.
+        def parsed() -> list[dict[str, t.Any]]:
+            return [json.loads(raw) for _ in range(count)]
+
+        def converted() -> list[dict[str, t.Any]]:
+            return [lavalink_dictovert(json.loads(raw)) for _ in range(count)]
+
+        print(f"{kind} ({len(raw)} bytes)")
+        measure("  plain copy", count, parsed, plain_copy)
+        measure("  lavalink_dictovert", count, parsed, lavalink_dictovert)
+        measure("  lavalink_dictovert, converted", count, converted, lavalink_dictovert)
+        measure("  construct", count, parsed, functools.partial(construct, kind))
+        measure("  construct, converted", count, converted, functools.partial(construct, kind))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
@@ -0,0 +1,103 @@
+"""
+Session lookups by guild, voice and text channel, run alongside a stream
+of connects and disconnects in other guilds, against a FakeLavalink and a
+FakeGatewayBot. Run with one lock stripe, which serializes every mutation
+like the old global lock, and with the default 64.
+
+    python -m benchmarks.session_contention [guilds] [commands]
+"""
+from __future__ import annotations
+import asyncio
+import hikari
+import random
+import statistics
+import sys
+import time
+import typing as t
+
+import koe
+from koe.log import logger
+from koe.testing import FakeGatewayBot, FakeLavalink, FakeLavalinkConfig
+
+
+async def lookups(client: koe.Koe, guilds: int, count: int, latencies: list[float], seed: int) -> None:
+    rng = random.Random(seed)
+    for _ in range(count):
+        guild_id = rng.randrange(1, guilds + 1)
+        kind = rng.randrange(3)
+
+        started = time.perf_counter()
+        if kind == 0:
+            await client.get_session_by(guild_id=hikari.Snowflake(guild_id))
+        elif kind == 1:
+            await client.get_session_by(voice_id=hikari.Snowflake(1000000 + guild_id))
+        else:
+            await client.get_session_by(channel_id=hikari.Snowflake(2000000 + guild_id))
+        latencies.append(time.perf_counter() - started)
+
+        # Let the churn interleave, as other commands would.
+        await asyncio.sleep(0)
+
+
+async def churn(client: koe.Koe, guild_id: int, rounds: int) -> None:
+    for _ in range(rounds):
+        session = koe.Session(client)
+        await session.connect(hikari.Snowflake(guild_id), hikari.Snowflake(1000000 + guild_id))
+        await session.disconnect()
+
+
+async def measure(stripes: int, guilds: int, commands: int) -> None:
+    lavalink = FakeLavalink(FakeLavalinkConfig(update_interval=60.0, seed=1))
+    await lavalink.start()
+
+    bot = FakeGatewayBot()
+    client = koe.Koe(t.cast(t.Any, bot), host=lavalink.host, port=lavalink.port, password=lavalink.password, lock_stripes=stripes)
+    try:
+        await bot.start()
+        while not client.ready:
+            await asyncio.sleep(0.01)
+
+        # Half the guilds stay connected, and are looked up. The other half
+        # connect and disconnect over and over.
+        looked_up = guilds // 2
+        for guild_id in range(1, looked_up + 1):
+            await koe.Session(client).connect(
+                hikari.Snowflake(guild_id),
+                hikari.Snowflake(1000000 + guild_id),
+                hikari.Snowflake(2000000 + guild_id)
+            )
+
+        churned = range(looked_up + 1, guilds + 1)
+        rounds = max(commands // (10 * len(churned)), 1)
+        workers = 8
+        latencies: list[float] = []
+
+        started = time.perf_counter()
+        await asyncio.gather(
+            *(lookups(client, looked_up, commands // workers, latencies, seed) for seed in range(workers)),
+            *(churn(client, guild_id, rounds) for guild_id in churned)
+        )
+        elapsed = time.perf_counter() - started
+
+        latencies.sort()
+        p50 = statistics.median(latencies) * 1e6
+        p99 = latencies[int(len(latencies) * 0.99)] * 1e6
+        print(
+            f"stripes={stripes:<3} {len(latencies) / elapsed:>10.0f} lookups/s"
+            f" p50 {p50:>6.1f}us p99 {p99:>7.1f}us"
+            f" {2 * rounds * len(churned) / elapsed:>8.0f} connects+disconnects/s"
+        )
+    finally:
+        await client.stop()
+        await lavalink.stop()
+
+
+async def main(guilds: int = 200, commands: int = 20000) -> None:
+    # Every connect and disconnect is logged, which would drown the results.
+    logger.disable("koe")
+    for stripes in (1, 64):
+        await measure(stripes, guilds, commands)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(*(int(arg) for arg in sys.argv[1:3])))
@@ -0,0 +1,70 @@
+"""
+Construction time and memory of a queue of tracks, built lazily (only the
+encoded string is kept until info is read) and eagerly (info built at once).
+
+    python -m benchmarks.track_decoding [count]
+"""
+from __future__ import annotations
+import gc
+import sys
+import time
+import tracemalloc
+import typing as t
+
+from koe.impl.constructs.track import Track
+from koe.testing import make_track
+from koe.utils import lavalink_dictovert
+
+
+def measure(name: str, build: t.Callable[[], list[Track]]) -> None:
+    build()
+
+    # Like timeit, keep the collector out of the timing.
+    gc.collect()
+    gc.disable()
+    try:
+        started = time.perf_counter()
+        build()
+        elapsed = time.perf_counter() - started
+    finally:
+        gc.enable()
+
+    tracemalloc.start()
+    tracks = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{name:<24} {elapsed * 1000:>9.2f}ms {current / 1024:>10.0f}KiB  ({len(tracks)} tracks)")
+
+
+def main(count: int = 10000) -> None:
+    # As they arrive from RestAPI. Only the tracks are measured, not these.
+    payloads = [lavalink_dictovert(make_track("benchmark", index)) for index in range(count)]
+    encoded = [payload['encoded'] for payload in payloads]
+
+    def lazy() -> list[Track]:
+        return [Track.construct(payload) for payload in payloads]
+
+    def eager() -> list[Track]:
+        tracks = [Track.construct(payload) for payload in payloads]
+        for track in tracks:
+            track.info
+        return tracks
+
+    def from_encoded() -> list[Track]:
+        return [Track.from_encoded(string) for string in encoded]
+
+    def decoded() -> list[Track]:
+        tracks = [Track.from_encoded(string) for string in encoded]
+        for track in tracks:
+            track.info
+        return tracks
+
+    measure("lazy", lazy)
+    measure("eager", eager)
+    measure("from_encoded", from_encoded)
+    measure("from_encoded, decoded", decoded)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
@@ -0,0 +1,116 @@
+"""
+Messages per second through WebSocket._loop, for a stream of playerUpdate
+and stats frames, with the fast path off and on.
+
+    python -m benchmarks.ws_throughput [count]
+"""
+from __future__ import annotations
+import asyncio
+import contextlib
+import hikari
+import multiprocessing
+import orjson as json
+import sys
+import time
+import typing as t
+
+from websockets.asyncio.client import connect
+from websockets.sync.server import serve
+
+import koe
+from koe.impl.ws import WebSocket
+from koe.testing import FakeGatewayBot
+
+
+def frames(count: int) -> list[bytes]:
+    update = json.dumps({
+        'op': "playerUpdate",
+        'guildId': "1",
+        'state': {'time': 1500467109, 'position': 60000, 'connected': True, 'ping': 50}
+    })
+    stats = json.dumps({
+        'op': "stats",
+        'players': 1,
+        'playingPlayers': 1,
+        'uptime': 123456789,
+        'memory': {'free': 123456789, 'used': 123456789, 'allocated': 123456789, 'reservable': 123456789},
+        'cpu': {'cores': 4, 'systemLoad': 0.5, 'lavalinkLoad': 0.5},
+        'frameStats': {'sent': 6000, 'nulled': 10, 'deficit': -3010}
+    })
+    # Roughly what a busy node sends: stats are rare next to updates.
+    return [stats if index % 100 == 0 else update for index in range(count)]
+
+
+def _serve(payload: list[bytes], ports: multiprocessing.Queue) -> None:
+    def blast(connection: t.Any) -> None:
+        for frame in payload:
+            connection.send(frame)
+        connection.close()
+
+    with serve(blast, "127.0.0.1", 0) as server:
+        ports.put(server.socket.getsockname()[1])
+        server.serve_forever()
+
+
+@contextlib.contextmanager
+def blasting(payload: list[bytes]) -> t.Iterator[int]:
+    """
+    Serve the frames to whoever connects, from another process so sending
+    them doesn't compete with what's being measured. Yields the port.
+    """
+    ports: multiprocessing.Queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=_serve, args=(payload, ports), daemon=True)
+    process.start()
+    try:
+        yield ports.get(timeout=10)
+    finally:
+        process.terminate()
+        process.join()
+
+
+def report(name: str, count: int, elapsed: float) -> None:
+    print(f"{name:<32} {count / elapsed:>10.0f} msg/s {elapsed * 1000:>9.1f}ms")
+
+
+async def measure_transport(count: int) -> None:
+    """
+    Receiving alone, without handling anything, as a ceiling.
+    """
+    with blasting(frames(count)) as port:
+        started = time.perf_counter()
+        async with connect(f"ws://127.0.0.1:{port}") as ws:
+            async for _ in ws:
+                pass
+        report("transport only", count, time.perf_counter() - started)
+
+
+async def measure(name: str, count: int, fast_path: bool, listener: bool) -> None:
+    bot = FakeGatewayBot()
+    client = koe.Koe(t.cast(t.Any, bot))
+    if listener:
+        async def on_update(_: koe.PlayerUpdateEvent) -> None:
+            pass
+        bot.subscribe(koe.PlayerUpdateEvent, on_update)
+
+    with blasting(frames(count)) as port:
+        ws = WebSocket(hikari.Snowflake(1), url="127.0.0.1", port=port, fast_path=fast_path, reconnect=False)
+
+        started = time.perf_counter()
+        await ws._loop(client)
+        elapsed = time.perf_counter() - started
+
+    # Let dispatched listeners finish before the next run.
+    await asyncio.sleep(0)
+    report(name, count, elapsed)
+
+
+async def main(count: int = 100000) -> None:
+    await measure_transport(count)
+    await measure("fast path off", count, fast_path=False, listener=False)
+    await measure("fast path on", count, fast_path=True, listener=False)
+    await measure("fast path off, with a listener", count, fast_path=False, listener=True)
+    await measure("fast path on, with a listener", count, fast_path=True, listener=True)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000))
@@ -2,7 +2,7 @@ from .client import Koe
 from .session.base import Session
 from .const import __author__, __version__
 from .events import KoeEvent, LavalinkReadyEvent, PlayerUpdateEvent, StatisticsEvent, TrackEvent, TrackStartEvent, TrackEndEvent, TrackExceptionEvent, WebSocketClosedEvent, WebSocketRecvEvent
-from .impl.constructs import Player, PlayerState, VoiceState, Queue, Memory, CPU, FrameStats, Track, TrackInfo, HistoryRecord, RepeatMode, SessionMode
+from .impl.constructs import Player, PlayerState, Playlist, VoiceState, Queue, Memory, CPU, FrameStats, NodeStats, Track, TrackInfo, HistoryAction, HistoryRecord, RepeatMode, SessionMode, SessionSnapshot
 
 from . import impl
 from . import errors
@@ -14,18 +14,22 @@ __all__ = [
     "__version__",
     "CPU",
     "FrameStats",
+    "HistoryAction",
     "HistoryRecord",
     "Koe",
     "KoeEvent",
     "LavalinkReadyEvent",
     "Memory",
+    "NodeStats",
     "Player",
     "PlayerState",
     "PlayerUpdateEvent",
+    "Playlist",
     "Queue",
     "RepeatMode",
     "Session",
     "SessionMode",
+    "SessionSnapshot",
     "StatisticsEvent",
     "Track",
     "TrackEvent",
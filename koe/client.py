@@ -1,17 +1,26 @@
-from collections import deque
+import asyncio
+import contextlib
+import dataclasses
 import hikari
 import typing
 
 from .session.base import Session
-from .impl.rest import RestAPI
-from .impl.ws import WebSocket
-from .events.ws import StatisticsEvent, LavalinkReadyEvent
+from .impl.rest import RestAPI, TransportConfig
+from .impl.resilience import ResilienceConfig
+from .impl.node import Node, NodePool
+from .impl.statistics import StatisticsStore
+from .impl.cache import TrackCache, MemoryTrackCache
+from .impl.metrics import KoeMetrics, MetricsRegistry
+from .impl.tracing import Span, StartTracker, Tracer, use_span
+from .events.track import TrackStartEvent, TrackEndEvent
 from .const import __version__
 from .errors import NoSessionError, ExistingSessionError
-from .utils import AsyncConditionalLock, ensure_one_of
+from .utils import ReentrantLock, WindowRateLimiter, ensure_one_of
 from .impl.constructs.track import Track
-from .impl.constructs.player import Player
-from .impl.constructs.enums import SessionMode
+from .impl.constructs.playlist import Playlist
+from .impl.constructs.player import Player, PlayerState
+from .impl.constructs.stats import NodeStats
+from .impl.constructs.snapshot import SessionSnapshot, dump_snapshots, load_snapshots, write_atomic
 from .log import logger
 
 
@@ -26,38 +35,111 @@ class Koe:
         host="localhost",
         port=2333,
         password="",
-        ssl=False
+        ssl=False,
+        fast_path=True,
+        stats_capacity: int=1440,
+        stats_max_age: float | None=None,
+        stats_windows: typing.Iterable[float]=(300.0, 3600.0),
+        resume_timeout: int | None=60,
+        track_cache: TrackCache | None=None,
+        transport: TransportConfig | None=None,
+        resilience: ResilienceConfig | None=None,
+        lock_stripes: int=64,
+        gateway_rate: tuple[int, float]=(100, 60.0),
+        metrics: MetricsRegistry | None=None,
+        tracer: Tracer | None=None
     ):
         self.bot = bot
         self.host = host
         self.port = port
         self.password = password
         self.ssl = ssl
+        self.fast_path = fast_path
+        self.resume_timeout = resume_timeout
+        self.transport = transport
+        self.resilience = resilience
+        
+        # Identical loadtracks requests are served from here, and concurrent
+        # ones share a single request while it's in flight.
+        self.track_cache: TrackCache = track_cache if track_cache is not None else MemoryTrackCache()
+        self._pending_loads: dict[str, asyncio.Future[dict]] = {}
+        
+        # Metrics are off unless a registry is passed in. Lock timings are
+        # only recorded while ReentrantLock is instrumented, so turning
+        # metrics on turns that on too.
+        self.metrics = KoeMetrics(metrics)
+        if self.metrics.enabled:
+            ReentrantLock.instrumented = True
+            self.metrics.bind(self)
+        
+        # Tracing is off unless a tracer is passed in. Time to first audio
+        # is tracked if either tracing or metrics are on.
+        self.tracer = tracer if tracer is not None else Tracer()
+        self.starts = StartTracker(
+            self.tracer,
+            on_started=self.metrics.first_audio.observe if self.metrics.enabled else None
+        )
+        
+        self._stats_capacity = stats_capacity
+        self._stats_max_age = stats_max_age
+        self._stats_windows = tuple(stats_windows)
         
-        self._session_id: str | None = None
         self._sessions: dict[hikari.Snowflake, Session] = {}
-        self._session_lock = AsyncConditionalLock()
         
-        self.stats: deque['StatisticsEvent'] = deque()
+        # Secondary indexes, so sessions can be found by voice or text channel
+        # without a scan. Kept in step with _sessions by add_session,
+        # rm_session and move_session.
+        self._voice_index: dict[int, Session] = {}
+        self._channel_index: dict[int, Session] = {}
+        
+        # Lookups are plain dict reads, which are atomic under asyncio, so
+        # they don't lock at all. Mutations lock per guild, striped over a
+        # fixed number of locks so unrelated guilds rarely wait on each other.
+        self._session_locks = [ReentrantLock() for _ in range(lock_stripes)]
+        
+        # The node owning each guild's player. Guilds are placed on the least
+        # loaded node the first time a player call is made for them.
+        self._guild_nodes: dict[int, Node] = {}
+        
+        # Bulk restores and shutdowns send a voice state update per guild.
+        # Discord allows 120 gateway sends per minute per shard, so they're
+        # limited per shard, with some headroom left for everything else.
+        self.gateway_rate = gateway_rate
+        self._gateway_limiters: dict[int, WindowRateLimiter] = {}
         
-        self._ws: WebSocket | None = None
-        self._rest: RestAPI | None = None
+        self._user_id: hikari.Snowflake | None = None
+        self.nodes = NodePool()
+        self._default_node = self.add_node("default", host=host, port=port, password=password, ssl=ssl)
         
         self.bot.subscribe(hikari.ShardReadyEvent, self.on_ready)
-        self.bot.subscribe(LavalinkReadyEvent, self.on_lavalink_ready)
-        self.bot.subscribe(StatisticsEvent, self.on_statistics)
+        
+        # Session events are subscribed to exactly once here, and routed to
+        # the owning session by guild ID rather than having every session
+        # subscribe and filter for itself. Player updates are the exception,
+        # since the websocket hands those straight to on_player_state.
+        self.bot.subscribe(hikari.VoiceStateUpdateEvent, self.route_voice_state_update)
+        self.bot.subscribe(hikari.VoiceServerUpdateEvent, self.route_voice_server_update)
+        self.bot.subscribe(TrackStartEvent, self.route_track_start)
+        self.bot.subscribe(TrackEndEvent, self.route_track_end)
     
     @property
     def ready(self) -> bool:
-        if self._session_id is None:
-            return False
-        return True
+        return len(self.nodes.ready) > 0
     
     @property
     def rest(self) -> RestAPI:
-        if self._rest is None:
-            raise RuntimeError("RestAPI not ready.")
-        return self._rest
+        """
+        The REST API of the least loaded node, for calls that aren't
+        specific to any one guild.
+        """
+        return self.nodes.best().rest
+    
+    @property
+    def stats(self) -> StatisticsStore:
+        """
+        The statistics of the default node. See Node.stats for the others.
+        """
+        return self._default_node.stats
     
     @property
     def bot_id(self) -> hikari.Snowflake:
@@ -65,85 +147,357 @@ class Koe:
         assert bot is not None
         return bot.id
     
+    def session_lock(self, guild_id: hikari.Snowflake | int) -> ReentrantLock:
+        """
+        Get the lock guarding mutations of a guild's session.
+        """
+        return self._session_locks[int(guild_id) % len(self._session_locks)]
+    
     async def get_session_by(
         self,
         guild_id: hikari.Snowflake | None = None,
         voice_id: hikari.Snowflake | None = None,
-        unsafe=False
+        channel_id: hikari.Snowflake | None = None
     ) -> 'Session':
-        ensure_one_of(guild_id=guild_id, voice_id=voice_id)
-        
-        async with self._session_lock(unsafe=unsafe):
-            if guild_id is not None:
-                session = self._sessions.get(guild_id, None)
-                if session is None:
-                    raise NoSessionError(guild_id=guild_id)
-                return session
-            
-            for session in self._sessions.values():
-                if voice_id == session.voice_id:
-                    return session
-            
-            raise NoSessionError(voice_id=voice_id)
+        ensure_one_of(guild_id=guild_id, voice_id=voice_id, channel_id=channel_id)
+        
+        if guild_id is not None:
+            session = self._sessions.get(guild_id, None)
+        elif voice_id is not None:
+            session = self._voice_index.get(int(voice_id), None)
+        else:
+            session = self._channel_index.get(int(channel_id), None)  # type: ignore
+        
+        if session is None:
+            raise NoSessionError(guild_id=guild_id, voice_id=voice_id, channel_id=channel_id)
+        return session
+    
+    def _index_session(self, session: 'Session') -> None:
+        if session._voice_id is not None:
+            self._voice_index[int(session._voice_id)] = session
+        if session._channel_id is not None:
+            self._channel_index[int(session._channel_id)] = session
+    
+    def _unindex_session(self, session: 'Session') -> None:
+        for index, key in ((self._voice_index, session._voice_id), (self._channel_index, session._channel_id)):
+            if key is not None and index.get(int(key), None) is session:
+                del index[int(key)]
     
-    async def add_session(self, session: 'Session', unsafe: bool=False) -> None:
-        async with self._session_lock(unsafe=unsafe):
+    async def add_session(self, session: 'Session') -> None:
+        async with self.session_lock(session.guild_id):
             existing_session = self._sessions.get(session.guild_id, None)
             if existing_session is not None:
                 raise ExistingSessionError(existing_session, session.guild_id, session.voice_id)
             self._sessions[session.guild_id] = session
+            self._index_session(session)
             logger.info(f"Added session with GID {session.guild_id}")
     
-    async def rm_session(self, guild_id: hikari.Snowflake, unsafe: bool=False) -> 'Session':
-        async with self._session_lock(unsafe=unsafe):
+    async def rm_session(self, guild_id: hikari.Snowflake) -> 'Session':
+        async with self.session_lock(guild_id):
             session = self._sessions.pop(guild_id, None)
             if session is None:
                 raise NoSessionError(guild_id)
+            self._unindex_session(session)
+            if self.metrics.enabled:
+                self.metrics.retire_session(session)
             logger.info(f"Removed session with GID {session.guild_id}")
             return session
     
+    async def move_session(
+        self,
+        session: 'Session',
+        voice_id: hikari.Snowflake | None = None,
+        channel_id: hikari.Snowflake | None = None
+    ) -> None:
+        """
+        Change a session's voice channel and/or text channel, keeping the
+        voice_id and channel_id indexes consistent.
+        
+        Arguments
+        ---------
+        session: Session
+            The session to move.
+        voice_id: hikari.Snowflake | None
+            The new voice channel. None leaves it unchanged.
+        channel_id: hikari.Snowflake | None
+            The new text channel. None leaves it unchanged.
+        """
+        async with self.session_lock(session.guild_id):
+            registered = self._sessions.get(session.guild_id, None) is session
+            if registered:
+                self._unindex_session(session)
+            
+            if voice_id is not None:
+                session._voice_id = voice_id
+            if channel_id is not None:
+                session._channel_id = channel_id
+            
+            if registered:
+                self._index_session(session)
+    
     async def get_session_or_none_by(
         self,
         guild_id: hikari.Snowflake | None = None,
         voice_id: hikari.Snowflake | None = None,
-        unsafe=False
+        channel_id: hikari.Snowflake | None = None
     ) -> Session | None:
-        async with self._session_lock(unsafe=unsafe):
-            try:
-                return await self.get_session_by(guild_id=guild_id, voice_id=voice_id, unsafe=True)
-            except NoSessionError:
-                return None
+        try:
+            return await self.get_session_by(guild_id=guild_id, voice_id=voice_id, channel_id=channel_id)
+        except NoSessionError:
+            return None
     
-    async def update_player(self, guild_id: hikari.Snowflake, no_replace: bool=False, data: dict={}) -> Player:
+    def add_node(
+        self,
+        name: str,
+        host: str="localhost",
+        port: int=2333,
+        password: str="",
+        ssl: bool=False,
+        resume_timeout: int | None=None,
+        transport: TransportConfig | None=None,
+        resilience: ResilienceConfig | None=None
+    ) -> Node:
+        """
+        Add a Lavalink node to the pool.
+        
+        If Koe is already running, the node is started immediately.
+        resume_timeout, transport and resilience default to Koe's.
+        """
+        node = Node(
+            name,
+            host=host,
+            port=port,
+            password=password,
+            ssl=ssl,
+            fast_path=self.fast_path,
+            resume_timeout=resume_timeout if resume_timeout is not None else self.resume_timeout,
+            transport=transport if transport is not None else self.transport,
+            resilience=resilience if resilience is not None else self.resilience,
+            stats=StatisticsStore(
+                capacity=self._stats_capacity,
+                max_age=self._stats_max_age,
+                windows=self._stats_windows
+            )
+        )
+        self.nodes.add(node)
+        
+        if self._user_id is not None:
+            node.start(self, self._user_id)
+        return node
+    
+    def get_node_for(self, guild_id: hikari.Snowflake | int) -> Node:
+        """
+        Get the node which owns a guild's player, placing the guild on
+        the least loaded node if it doesn't have one yet.
+        """
+        node = self._guild_nodes.get(int(guild_id), None)
+        if node is None:
+            node = self.nodes.best()
+            self.assign_node(guild_id, node)
+        return node
+    
+    def assign_node(self, guild_id: hikari.Snowflake | int, node: Node) -> None:
+        previous = self._guild_nodes.get(int(guild_id), None)
+        if previous is not None:
+            previous.rm_guild(guild_id)
+        
+        self._guild_nodes[int(guild_id)] = node
+        node.add_guild(guild_id)
+    
+    def release_node(self, guild_id: hikari.Snowflake | int) -> None:
+        node = self._guild_nodes.pop(int(guild_id), None)
+        if node is not None:
+            node.rm_guild(guild_id)
+    
+    async def update_player(self, guild_id: hikari.Snowflake, no_replace: bool=False, data: dict={}, node: Node | None=None) -> Player:
+        if node is None:
+            node = self.get_node_for(guild_id)
         no_replace_str = 'true' if no_replace else 'false'
-        response = await self.rest.patch(
-            f"sessions/{self._session_id}/players/{guild_id}",
+        response = await node.rest.patch(
+            f"sessions/{node.session_id}/players/{guild_id}",
             params={"noReplace": no_replace_str},
-            payload=data
+            payload=data,
+            # Setting the same fields twice is harmless, but starting a
+            # track twice isn't.
+            idempotent='track' not in data
         )
         return Player.construct(response)
     
     async def get_player(self, guild_id: hikari.Snowflake) -> Player:
-        player_data = await self.rest.get(
-            f"sessions/{self._session_id}/players/{guild_id}",
+        node = self.get_node_for(guild_id)
+        player_data = await node.rest.get(
+            f"sessions/{node.session_id}/players/{guild_id}",
             payload={}
         )
         return Player.construct(player_data)
     
     async def delete_player(self, guild_id: hikari.Snowflake) -> None:
-        await self.rest.delete(
-            f"sessions/{self._session_id}/players/{guild_id}"
-        )
+        node = self._guild_nodes.get(int(guild_id), None)
+        if node is None:
+            return
+        
+        # Attempted even when the node isn't ready. An open breaker fails
+        # fast, and the player is at least logged as left behind.
+        if node.session_id is None:
+            logger.warning(f"Left the player for GID {guild_id} behind on node {node.name}, which has no session.")
+        else:
+            try:
+                await node.rest.delete(
+                    f"sessions/{node.session_id}/players/{guild_id}"
+                )
+            except Exception as e:
+                logger.warning(f"Left the player for GID {guild_id} behind on node {node.name}: {e!r}")
+        self.release_node(guild_id)
+    
+    async def migrate_guild(self, guild_id: hikari.Snowflake | int, target: Node) -> None:
+        """
+        Move a guild's player to another node.
+        
+        The player is rebuilt on the target with one PATCH, carrying over
+        the voice state, track, position, volume and pause state. The old
+        player is deleted afterwards if its node is still reachable.
+        """
+        source = self._guild_nodes.get(int(guild_id), None)
+        session = self._route(guild_id)
+        
+        if session is None:
+            self.release_node(guild_id)
+            raise NoSessionError(guild_id=hikari.Snowflake(guild_id))
+        
+        await session.migrate(target)
+        self.assign_node(guild_id, target)
+        
+        if source is not None and source is not target and source.ready:
+            try:
+                await source.rest.delete(f"sessions/{source.session_id}/players/{guild_id}")
+            except Exception as e:
+                logger.warning(f"Failed to delete old player for GID {guild_id} on node {source.name}: {e!r}")
+    
+    async def migrate(
+        self,
+        source: Node,
+        target: Node | None=None,
+        concurrency: int=32,
+        exclude_source: bool=True
+    ) -> dict[int, Exception | None]:
+        """
+        Move every player on a node elsewhere, concurrently.
+        
+        Arguments
+        ---------
+        source: Node
+            The node to move players off of.
+        target: Node | None
+            The node to move them to. If None, each player is placed on
+            whichever node is least loaded at the time.
+        concurrency: int
+            The maximum number of migrations in flight at once.
+        exclude_source: bool
+            Whether or not the source node may be picked as a target. This
+            is only useful for rebuilding players lost by a node.
+        
+        Returns
+        -------
+        dict[int, Exception | None]
+            The result of each guild's migration, None meaning success.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        exclude = [source] if exclude_source else []
+        
+        async def migrate_one(guild_id: int) -> Exception | None:
+            async with semaphore:
+                try:
+                    await self.migrate_guild(guild_id, target if target is not None else self.nodes.best(exclude=exclude))
+                except Exception as e:
+                    logger.warning(f"Failed to migrate GID {guild_id} off of node {source.name}: {e!r}")
+                    return e
+                return None
+        
+        guild_ids = list(source.guild_ids)
+        results = await asyncio.gather(*[migrate_one(guild_id) for guild_id in guild_ids])
+        
+        failed = len([result for result in results if result is not None])
+        logger.info(f"Migrated {len(guild_ids) - failed}/{len(guild_ids)} players off of node {source.name}.")
+        return dict(zip(guild_ids, results))
     
-    async def load_tracks(self, identifier: str) -> Track | list[Track] | None:
-        track_data = await self.rest.get("loadtracks", params={'identifier': identifier})
+    async def drain_node(self, name: str, concurrency: int=32) -> dict[int, Exception | None]:
+        """
+        Stop placing new players on a node, and move its players elsewhere.
+        """
+        node = self.nodes.get(name)
+        node.draining = True
+        return await self.migrate(node, concurrency=concurrency)
+    
+    async def _load(self, identifier: str) -> dict:
+        cached = await self.track_cache.get(identifier)
+        if cached is not None:
+            return cached
+        
+        pending = self._pending_loads.get(identifier, None)
+        if pending is not None:
+            return await asyncio.shield(pending)
+        
+        future: asyncio.Future[dict] = asyncio.get_running_loop().create_future()
+        self._pending_loads[identifier] = future
+        
+        try:
+            track_data = await self.rest.get("loadtracks", params={'identifier': identifier})
+            await self.track_cache.put(identifier, track_data)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark it as retrieved, since there may not be anyone waiting.
+            future.exception()
+            raise
+        else:
+            future.set_result(track_data)
+            return track_data
+        finally:
+            self._pending_loads.pop(identifier, None)
+    
+    @contextlib.contextmanager
+    def trace_play(self, guild_id: hikari.Snowflake | int, **attributes: typing.Any) -> typing.Iterator[Span]:
+        """
+        Trace everything from a play command to the track starting.
+        
+        Ex:
+        ```
+        with koe.trace_play(guild_id, query=query):
+          result = await koe.load_tracks(query)
+          await session.enqueue(result)
+        ```
+        
+        The span is current inside the with block, so loading, locking,
+        enqueueing and the REST requests made are all its children. It
+        stays open after the block, and ends when the guild's
+        TrackStartEvent arrives. Its duration is the time to first audio.
+        """
+        if not self.starts.active:
+            yield Span()
+            return
+        
+        pending = self.starts.open(guild_id, **attributes)
+        try:
+            with use_span(pending.span):
+                yield pending.span
+        except BaseException as e:
+            pending.span.record_exception(e)
+            self.starts.close(guild_id, outcome="failed")
+            raise
+    
+    async def load_tracks(self, identifier: str) -> Track | list[Track] | Playlist | None:
+        with self.tracer.span("koe.load_tracks", identifier=identifier) as span:
+            track_data = await self._load(identifier)
+            span.set_attribute("koe.load_type", track_data['load_type'])
 
         load_type = track_data['load_type']
         
         if load_type == "track":
             return Track.construct(track_data['data'])
         elif load_type == "playlist":
-            raise ValueError("Playlists unsupported.")
+            return Playlist.construct(track_data['data'])
         elif load_type == "search":
             return list([Track.construct(data) for data in track_data['data']])
         elif load_type == "empty":
@@ -151,71 +505,257 @@ class Koe:
         else:
             return None
                     
+    async def decode_tracks(self, encoded: list[str]) -> list[Track]:
+        """
+        Turn encoded track strings back into Tracks.
+        
+        This happens locally, without a request to Lavalink. Each track's
+        info is decoded from its string when it's first accessed.
+        """
+        return [Track.from_encoded(track) for track in encoded]
+    
     async def on_ready(self, _: hikari.ShardReadyEvent):
         bot_user = self.bot.get_me()
         
         if bot_user is None:
             raise RuntimeError("Bot not ready.")
         
-        self._ws = WebSocket(
-            bot_user.id,
-            url=self.host,
-            port=self.port,
-            password=self.password
-        )
+        self._user_id = bot_user.id
+        for node in self.nodes:
+            node.start(self, bot_user.id)
+        logger.info("Initialization complete.")
+    
+    def on_statistics(self, node: Node, stats: NodeStats) -> None:
+        node.stats.append(stats)
+    
+    def on_player_state(self, guild_id: int, state: PlayerState) -> None:
+        session = self._route(guild_id)
+        if session is not None:
+            session.on_player_state(state)
+    
+    def _route(self, guild_id: hikari.Snowflake | int | None) -> Session | None:
+        if guild_id is None:
+            return None
+        return self._sessions.get(guild_id, None)  # type: ignore
+    
+    async def route_voice_state_update(self, event: hikari.VoiceStateUpdateEvent) -> None:
+        if event.state.user_id != self.bot_id:
+            return
         
-        self._rest = RestAPI(
-            url=self.host,
-            port=self.port,
-            password=self.password
-        )
+        session = self._route(event.guild_id)
+        if session is not None:
+            await session.on_voice_state_update(event)
+    
+    async def route_voice_server_update(self, event: hikari.VoiceServerUpdateEvent) -> None:
+        session = self._route(event.guild_id)
+        if session is not None:
+            await session.on_voice_server_update(event)
+    
+    async def route_track_start(self, event: TrackStartEvent) -> None:
+        session = self._route(event.guild_id)
+        if session is not None:
+            await session.on_track_start(event)
+    
+    async def route_track_end(self, event: TrackEndEvent) -> None:
+        session = self._route(event.guild_id)
+        if session is not None:
+            await session.on_track_end(event)
         
-        self._ws.start(self)
-        logger.info("Initialization complete.")
+    def gateway_limiter(self, guild_id: hikari.Snowflake | int) -> WindowRateLimiter:
+        """
+        Get the rate limiter for the gateway shard a guild is on.
+        """
+        shard_id = hikari.snowflakes.calculate_shard_id(self.bot.shard_count or 1, guild_id)
+        limiter = self._gateway_limiters.get(shard_id, None)
+        if limiter is None:
+            limiter = self._gateway_limiters[shard_id] = WindowRateLimiter(*self.gateway_rate)
+        return limiter
+    
+    async def _bulk(
+        self,
+        action: str,
+        guild_ids: list[int],
+        func: typing.Callable[[int], typing.Awaitable[None]],
+        concurrency: int,
+        progress: typing.Callable[[int, Exception | None], typing.Any] | None
+    ) -> dict[int, Exception | None]:
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def run_one(guild_id: int) -> Exception | None:
+            async with semaphore:
+                await self.gateway_limiter(guild_id).acquire()
+                try:
+                    await func(guild_id)
+                except Exception as e:
+                    logger.warning(f"Failed to {action} GID {guild_id}: {e!r}")
+                    result = e
+                else:
+                    result = None
+            
+            if progress is not None:
+                try:
+                    progress(guild_id, result)
+                except Exception as e:
+                    logger.warning(f"Progress callback failed for GID {guild_id}: {e!r}")
+            return result
+        
+        results = await asyncio.gather(*[run_one(guild_id) for guild_id in guild_ids])
+        
+        failed = len([result for result in results if result is not None])
+        logger.info(f"{action.capitalize()}: {len(guild_ids) - failed}/{len(guild_ids)} sessions succeeded.")
+        return dict(zip(guild_ids, results))
+    
+    async def _teardown(self, session: Session) -> None:
+        try:
+            await session.disconnect()
+        finally:
+            # Make sure it's gone even if the disconnect failed halfway.
+            try:
+                await self.rm_session(session.guild_id)
+            except NoSessionError:
+                pass
+    
+    async def stop(
+        self,
+        concurrency: int=32,
+        progress: typing.Callable[[int, Exception | None], typing.Any] | None=None
+    ) -> dict[int, Exception | None]:
+        """
+        Disconnect every session concurrently, then stop every node.
+        
+        Arguments
+        ---------
+        concurrency: int
+            The maximum number of disconnects in flight at once.
+        progress: typing.Callable[[int, Exception | None], typing.Any] | None
+            Called with each guild ID and its result as it finishes.
+        
+        Returns
+        -------
+        dict[int, Exception | None]
+            The result of each guild's disconnect, None meaning success.
+        """
+        async def disconnect(guild_id: int) -> None:
+            session = self._sessions.get(guild_id, None)  # type: ignore
+            if session is not None:
+                await self._teardown(session)
+        
+        # Sessions remove themselves as they disconnect, so work off a copy.
+        guild_ids = [int(guild_id) for guild_id in list(self._sessions.keys())]
+        results = await self._bulk("disconnect", guild_ids, disconnect, concurrency, progress)
+        
+        for node in self.nodes:
+            await node.stop()
+        return results
+    
+    def snapshot_sessions(self, history_tail: int=50) -> list[SessionSnapshot]:
+        """
+        Snapshot every connected session, in one pass.
+        """
+        return [
+            session.snapshot(history_tail=history_tail)
+            for session in list(self._sessions.values())
+            if session._connected
+        ]
+    
+    async def serialize_sessions(self, history_tail: int=50) -> dict:
+        return {
+            snapshot.guild_id: dataclasses.asdict(snapshot)
+            for snapshot in self.snapshot_sessions(history_tail=history_tail)
+        }
+    
+    async def checkpoint(self, path: str, history_tail: int=50) -> int:
+        """
+        Atomically write a snapshot of every session to a file.
+        
+        Sessions are snapshotted without yielding, so the file is a
+        consistent picture of one moment. Encoding and writing happen in
+        a worker thread.
+        
+        Returns
+        -------
+        int
+            The number of sessions written.
+        """
+        snapshots = self.snapshot_sessions(history_tail=history_tail)
+        await asyncio.to_thread(lambda: write_atomic(path, dump_snapshots(snapshots)))
+        return len(snapshots)
     
-    async def on_statistics(self, event: StatisticsEvent):
-        self.stats.append(event)
+    async def restore_checkpoint(
+        self,
+        path: str,
+        concurrency: int=32,
+        progress: typing.Callable[[int, Exception | None], typing.Any] | None=None
+    ) -> dict[int, Exception | None]:
+        """
+        Restore the sessions in a file written by checkpoint(). See
+        deserialize_sessions().
+        """
+        def read() -> list[SessionSnapshot]:
+            with open(path, "rb") as f:
+                return load_snapshots(f.read())
+        
+        snapshots = await asyncio.to_thread(read)
+        return await self.restore_sessions(snapshots, concurrency=concurrency, progress=progress)
+    
+    async def deserialize_sessions(
+        self,
+        session_data: dict,
+        concurrency: int=32,
+        progress: typing.Callable[[int, Exception | None], typing.Any] | None=None
+    ) -> dict[int, Exception | None]:
+        """
+        Reconnect saved sessions concurrently, restoring their queues,
+        playback positions and settings.
+        
+        Voice state updates are rate limited per shard. A session which
+        fails to restore is removed again, so it may simply be retried.
+        
+        Arguments
+        ---------
+        session_data: dict
+            Sessions, as returned by serialize_sessions().
+        concurrency: int
+            The maximum number of restores in flight at once.
+        progress: typing.Callable[[int, Exception | None], typing.Any] | None
+            Called with each guild ID and its result as it finishes.
+        
+        Returns
+        -------
+        dict[int, Exception | None]
+            The result of each guild's restore, None meaning success.
+        """
+        snapshots = [SessionSnapshot.from_dict(sd) for sd in session_data.values()]
+        return await self.restore_sessions(snapshots, concurrency=concurrency, progress=progress)
     
-    async def on_lavalink_ready(self, event: LavalinkReadyEvent):
-        self._session_id = event.session_id
+    async def restore_sessions(
+        self,
+        snapshots: list[SessionSnapshot],
+        concurrency: int=32,
+        progress: typing.Callable[[int, Exception | None], typing.Any] | None=None
+    ) -> dict[int, Exception | None]:
+        by_guild = {snapshot.guild_id: snapshot for snapshot in snapshots}
         
-    async def stop(self) -> None:
-        async with self._session_lock:
-            for session in self._sessions.values():
-                await session.disconnect()
-                await self.rm_session(session.guild_id, unsafe=True)
+        async def restore(guild_id: int) -> None:
+            snapshot = by_guild[guild_id]
+            session = Session(self)
             
-            self._rest = None
+            # Decoding doesn't depend on the connection, so do it first.
+            tracks = await self.decode_tracks(snapshot.queue or [])
             
-            if self._ws is not None:
-                self._ws.stop()
-                self._ws = None
-    
-    async def serialize_sessions(self) -> dict:
-        async with self._session_lock:
-            out = {}
+            await session.connect(
+                hikari.Snowflake(snapshot.guild_id),
+                hikari.Snowflake(snapshot.voice_id),
+                hikari.Snowflake(snapshot.channel_id) if snapshot.channel_id is not None else None
+            )
             
-            for gid, session in self._sessions.items():
-                if session._connected:
-                    out[int(gid)] = {
-                        'guild_id': int(session.guild_id),
-                        'voice_id': int(session.voice_id),
-                        'channel_id': int(session.channel_id),
-                        'mode': str(session.session_mode)
-                    }
-            return out
-    
-    async def deserialize_sessions(self, session_data: dict) -> None:
-        async with self._session_lock:
-            for sd in session_data.values():
-                session = Session(self)
-                if sd['mode'] == 'TRANSIENT':
-                    session.session_mode = SessionMode.TRANSIENT
-                await session.connect(
-                    sd['guild_id'],
-                    sd['voice_id'],
-                    sd['channel_id']
-                )
-                
-                await self.add_session(session)
-            
\ No newline at end of file
+            try:
+                await session.restore(snapshot, tracks)
+            except Exception:
+                try:
+                    await self._teardown(session)
+                except Exception as e:
+                    logger.warning(f"Failed to clean up GID {guild_id} after a failed restore: {e!r}")
+                raise
+        
+        return await self._bulk("restore", list(by_guild), restore, concurrency, progress)
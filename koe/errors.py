@@ -37,17 +37,21 @@ class NoSessionError(KoeError):
     def __init__(
         self,
         guild_id: hikari.Snowflake | None = None,
-        voice_id: hikari.Snowflake | None = None
+        voice_id: hikari.Snowflake | None = None,
+        channel_id: hikari.Snowflake | None = None
     ):
-        if all([guild_id, voice_id]):
-            raise ValueError("Only one of guild_id or voice_id may be provided, not both.")
-        if not any([guild_id, voice_id]):
-            raise ValueError("One of guild_id or voice_id must be provided.")
+        given = [val for val in (guild_id, voice_id, channel_id) if val is not None]
+        if len(given) > 1:
+            raise ValueError("Only one of guild_id, voice_id or channel_id may be provided.")
+        if not given:
+            raise ValueError("One of guild_id, voice_id or channel_id must be provided.")
 
         if guild_id is not None:
             super().__init__(f"Session with GID #{guild_id} does not exist.")
-        else:
+        elif voice_id is not None:
             super().__init__(f"Session with VID #{voice_id} does not exist.")
+        else:
+            super().__init__(f"Session with CID #{channel_id} does not exist.")
 
 
 class VoiceRequiredError(KoeError):
@@ -61,4 +65,28 @@ class UninitializedSessionError(KoeError):
 
 
 class InvalidPosition(KoeError):
-    pass
\ No newline at end of file
+    pass
+
+class NoNodeError(KoeError):
+    pass
+
+
+class RestError(KoeError):
+    def __init__(self, method: str, endpoint: str, status: int, body: bytes=b""):
+        self.method = method
+        self.endpoint = endpoint
+        self.status = status
+        self.body = body
+        super().__init__(f"{method} {endpoint} failed with status {status}.")
+
+
+class CircuitOpenError(KoeError):
+    def __init__(self, retry_after: float):
+        self.retry_after = retry_after
+        super().__init__(f"Too many recent failures. Requests to this node are suspended for another {retry_after:.1f}s.")
+
+
+class BackpressureError(KoeError):
+    def __init__(self, queued: int):
+        self.queued = queued
+        super().__init__(f"Too many requests are already waiting on this node ({queued}).")
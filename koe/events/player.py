@@ -19,7 +19,7 @@ class PlayerUpdateEvent(WebSocketRecvEvent):
     state: PlayerState
         The state of the player.
     """
-    def __init__(self, koe: 'Koe', payload: dict):
+    def __init__(self, koe: 'Koe', payload: dict, state: PlayerState | None = None):
         super().__init__(koe, payload)
         self.guild_id = int(payload['guild_id'])
-        self.state = PlayerState.construct(payload['state'])
\ No newline at end of file
+        self.state = state if state is not None else PlayerState.construct(payload['state'])
\ No newline at end of file
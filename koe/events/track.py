@@ -16,9 +16,12 @@ class TrackEvent(WebSocketRecvEvent):
     ----------
     track: Track
         The track associated with the event.
+    guild_id: int
+        The guild in which the event occurred.
     """
     def __init__(self, koe: 'Koe', payload: dict):
         super().__init__(koe, payload)
+        self.guild_id = int(payload['guild_id'])
         self.track = Track.construct(payload['track'])
 
 
@@ -35,7 +38,6 @@ class TrackStartEvent(TrackEvent):
     """
     def __init__(self, koe: 'Koe', payload: dict):
         super().__init__(koe, payload)
-        self.guild_id: int = payload['guild_id']
 
 
 class TrackEndEvent(TrackEvent):
@@ -46,6 +48,8 @@ class TrackEndEvent(TrackEvent):
     ----------
     track: Track
         The track that ended.
+    guild_id: int
+        The guild in which playback ended.
     reason: str
         The reason the track ended.
     """
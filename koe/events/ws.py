@@ -2,7 +2,7 @@ from __future__ import annotations
 import typing
 
 from .base import WebSocketRecvEvent
-from ..impl.constructs.stats import Memory, CPU, FrameStats
+from ..impl.constructs.stats import NodeStats
 
 
 if typing.TYPE_CHECKING:
@@ -64,6 +64,8 @@ class StatisticsEvent(WebSocketRecvEvent):
     
     Attributes
     ----------
+    stats: NodeStats
+        The decoded statistics.
     num_players: int
         The number of players connected to the node.
     num_playing_players: int
@@ -80,18 +82,19 @@ class StatisticsEvent(WebSocketRecvEvent):
     def __init__(
         self,
         koe: 'Koe',
-        payload
+        payload,
+        stats: NodeStats | None = None
     ):
         super().__init__(koe, payload)
         
-        self.num_players = self.data['players']
-        self.num_playing_players = self.data['playing_players']
-        self.uptime = self.data['uptime']
+        if stats is None:
+            stats = NodeStats.construct({**self.data, 'frame_stats': self.data.get('frame_stats')})
+        self.stats = stats
         
-        self.memory = Memory.construct(self.data['memory'])
-        self.cpu = CPU.construct(self.data['cpu'])
-
-        if self.data['frame_stats'] is not None:
-            self.frame_stats = FrameStats.construct(self.data['frame_stats'])
-        else:
-            self.frame_stats = None
\ No newline at end of file
+        self.num_players = stats.players
+        self.num_playing_players = stats.playing_players
+        self.uptime = stats.uptime
+        
+        self.memory = stats.memory
+        self.cpu = stats.cpu
+        self.frame_stats = stats.frame_stats
\ No newline at end of file
@@ -1,12 +1,41 @@
+from .cache import TrackCache, MemoryTrackCache, SQLiteTrackCache
 from .connection import Connection
-from .rest import RestAPI
+from .metrics import Counter, Gauge, Histogram, KoeMetrics, MetricsExporter, MetricsRegistry, NullRegistry
+from .node import Node, NodePool
+from .resilience import CircuitBreaker, CircuitState, Resilience, ResilienceConfig, ResilienceMetrics
+from .rest import RestAPI, TransportConfig
+from .statistics import StatisticsStore
+from .tracing import OpenTelemetryTracer, Span, StartTracker, Tracer
 from .ws import WebSocket
 from . import constructs
 
 
 __all__ = [
+    "CircuitBreaker",
+    "CircuitState",
     "Connection",
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "KoeMetrics",
+    "MetricsExporter",
+    "MetricsRegistry",
+    "MemoryTrackCache",
+    "Node",
+    "NodePool",
+    "NullRegistry",
+    "OpenTelemetryTracer",
+    "Resilience",
+    "ResilienceConfig",
+    "ResilienceMetrics",
     "RestAPI",
+    "SQLiteTrackCache",
+    "Span",
+    "StartTracker",
+    "StatisticsStore",
+    "TrackCache",
+    "Tracer",
+    "TransportConfig",
     "WebSocket",
     "constructs"
 ]
\ No newline at end of file
@@ -0,0 +1,172 @@
+from __future__ import annotations
+import abc
+import asyncio
+from collections import OrderedDict
+import orjson as json
+import sqlite3
+import time
+import typing as t
+
+
+class TrackCache(abc.ABC):
+    """
+    A cache of `loadtracks` results, keyed on the identifier.
+
+    Results are stored as returned by the REST API, so the encoded track
+    blobs are kept and can be turned back into Tracks without another
+    round trip. Results which found something are kept for `ttl` seconds.
+    Results which found nothing are kept for `negative_ttl` seconds.
+    Errors are never cached.
+    """
+    CACHED_LOAD_TYPES: t.ClassVar[frozenset[str]] = frozenset(["track", "playlist", "search"])
+
+    def __init__(self, ttl: float = 3600.0, negative_ttl: float = 60.0):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+
+    def ttl_for(self, data: dict[str, t.Any]) -> float | None:
+        load_type = data.get('load_type', None)
+        if load_type in self.CACHED_LOAD_TYPES:
+            return self.ttl
+        if load_type == "empty":
+            return self.negative_ttl
+        return None
+
+    async def put(self, identifier: str, data: dict[str, t.Any]) -> None:
+        ttl = self.ttl_for(data)
+        if ttl is not None and ttl > 0:
+            await self.set(identifier, data, time.time() + ttl)
+
+    @abc.abstractmethod
+    async def get(self, identifier: str) -> dict[str, t.Any] | None:
+        """
+        Get a cached result, or None if there is no live entry.
+        """
+        pass
+
+    @abc.abstractmethod
+    async def set(self, identifier: str, data: dict[str, t.Any], expires_at: float) -> None:
+        pass
+
+    @abc.abstractmethod
+    async def clear(self) -> None:
+        pass
+
+
+class MemoryTrackCache(TrackCache):
+    """
+    An in-memory LRU track cache. A maxsize of 0 disables caching.
+    """
+    def __init__(self, maxsize: int = 1024, ttl: float = 3600.0, negative_ttl: float = 60.0):
+        super().__init__(ttl=ttl, negative_ttl=negative_ttl)
+        self.maxsize = maxsize
+        self._entries: OrderedDict[str, tuple[float, dict[str, t.Any]]] = OrderedDict()
+
+    def __repr__(self) -> str:
+        return f"<MemoryTrackCache len: {len(self._entries)}, maxsize: {self.maxsize}>"
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, identifier: str) -> dict[str, t.Any] | None:
+        entry = self._entries.get(identifier, None)
+        if entry is None:
+            return None
+
+        expires_at, data = entry
+        if expires_at < time.time():
+            del self._entries[identifier]
+            return None
+
+        self._entries.move_to_end(identifier)
+        return data
+
+    async def set(self, identifier: str, data: dict[str, t.Any], expires_at: float) -> None:
+        if self.maxsize <= 0:
+            return
+
+        self._entries[identifier] = (expires_at, data)
+        self._entries.move_to_end(identifier)
+
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    async def clear(self) -> None:
+        self._entries.clear()
+
+
+class SQLiteTrackCache(TrackCache):
+    """
+    An on-disk track cache backed by sqlite, which survives restarts.
+
+    Queries run in a worker thread so they don't block the event loop.
+    Expired entries are removed as they're read, and by purge().
+    """
+    def __init__(self, path: str, ttl: float = 86400.0, negative_ttl: float = 60.0):
+        super().__init__(ttl=ttl, negative_ttl=negative_ttl)
+        self.path = path
+
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS tracks ("
+            "identifier TEXT PRIMARY KEY, "
+            "expires_at REAL NOT NULL, "
+            "data BLOB NOT NULL)"
+        )
+        self._db.commit()
+        self._lock = asyncio.Lock()
+
+    def __repr__(self) -> str:
+        return f"<SQLiteTrackCache {self.path}>"
+
+    def _get(self, identifier: str) -> dict[str, t.Any] | None:
+        row = self._db.execute(
+            "SELECT expires_at, data FROM tracks WHERE identifier = ?",
+            (identifier,)
+        ).fetchone()
+
+        if row is None:
+            return None
+
+        expires_at, data = row
+        if expires_at < time.time():
+            self._db.execute("DELETE FROM tracks WHERE identifier = ?", (identifier,))
+            self._db.commit()
+            return None
+        return json.loads(data)
+
+    def _set(self, identifier: str, data: dict[str, t.Any], expires_at: float) -> None:
+        self._db.execute(
+            "INSERT OR REPLACE INTO tracks (identifier, expires_at, data) VALUES (?, ?, ?)",
+            (identifier, expires_at, json.dumps(data))
+        )
+        self._db.commit()
+
+    def _purge(self) -> int:
+        cursor = self._db.execute("DELETE FROM tracks WHERE expires_at < ?", (time.time(),))
+        self._db.commit()
+        return cursor.rowcount
+
+    async def get(self, identifier: str) -> dict[str, t.Any] | None:
+        async with self._lock:
+            return await asyncio.to_thread(self._get, identifier)
+
+    async def set(self, identifier: str, data: dict[str, t.Any], expires_at: float) -> None:
+        async with self._lock:
+            await asyncio.to_thread(self._set, identifier, data, expires_at)
+
+    async def purge(self) -> int:
+        """
+        Remove every expired entry, returning how many were removed.
+        """
+        async with self._lock:
+            return await asyncio.to_thread(self._purge)
+
+    async def clear(self) -> None:
+        async with self._lock:
+            await asyncio.to_thread(self._db.execute, "DELETE FROM tracks")
+            await asyncio.to_thread(self._db.commit)
+
+    def close(self) -> None:
+        self._db.close()
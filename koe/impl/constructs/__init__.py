@@ -1,23 +1,33 @@
 from .base import Serializable
-from .enums import RepeatMode, SessionMode
-from .player import Player, PlayerState, VoiceState
+from .enums import HistoryAction, RepeatMode, SessionMode
+from .player import Player, PlayerSnapshot, PlayerState, VoiceState
+from .playlist import Playlist, PlaylistInfo
 from .queue import Queue
-from .stats import Memory, CPU, FrameStats
+from .stats import Memory, CPU, FrameStats, NodeStats
 from .track import Track, TrackInfo, TrackException
-from .history import HistoryRecord
+from .history import HistoryRecord, HistoryStore, HistoryView
+from .snapshot import SessionSnapshot
 
 
 __all__ = [
     "CPU",
     "FrameStats",
+    "HistoryAction",
     "HistoryRecord",
+    "HistoryStore",
+    "HistoryView",
     "Memory",
+    "NodeStats",
     "Player",
+    "PlayerSnapshot",
     "PlayerState",
+    "Playlist",
+    "PlaylistInfo",
     "Queue",
     "RepeatMode",
     "Serializable",
     "SessionMode",
+    "SessionSnapshot",
     "Track",
     "TrackException",
     "TrackInfo",
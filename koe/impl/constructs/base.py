@@ -1,10 +1,87 @@
 from __future__ import annotations
+import dataclasses
+import types
 import typing as t
-from dacite import from_dict
+from dacite import Config, from_dict
 
 from ...utils import lavalink_dictovert
 
 
+_constructors: dict[type, t.Callable[[dict[str, t.Any]], t.Any]] = {}
+
+
+def _unwrap_optional(hint: t.Any) -> tuple[t.Any, bool]:
+    """
+    Split `X | None` into `(X, True)`. Anything else is `(hint, False)`.
+    """
+    if t.get_origin(hint) in (t.Union, types.UnionType):
+        args = [arg for arg in t.get_args(hint) if arg is not type(None)]
+        if len(args) == 1 and len(args) != len(t.get_args(hint)):
+            return args[0], True
+    return hint, False
+
+
+def _compile_constructor(cls: type) -> t.Callable[[dict[str, t.Any]], t.Any]:
+    """
+    Generate a constructor for a Serializable dataclass.
+    
+    The type hints are resolved exactly once, here, and turned into a
+    plain function which pulls each field out of the dict and passes it
+    to the dataclass' __init__. Nested Serializables are built with their
+    own construct(), and Optional fields may be absent from the dict.
+    """
+    hints = t.get_type_hints(cls)
+    namespace: dict[str, t.Any] = {'cls': cls}
+    args = []
+    
+    for field in dataclasses.fields(cls):
+        if not field.init:
+            continue
+        
+        name = field.name
+        hint, optional = _unwrap_optional(hints[name])
+        
+        if field.default is not dataclasses.MISSING:
+            namespace[f"_default_{name}"] = field.default
+            get = f"data.get({name!r}, _default_{name})"
+        elif field.default_factory is not dataclasses.MISSING:
+            namespace[f"_factory_{name}"] = field.default_factory
+            get = f"(data[{name!r}] if {name!r} in data else _factory_{name}())"
+        elif optional:
+            get = f"data.get({name!r})"
+        else:
+            get = f"data[{name!r}]"
+        
+        if isinstance(hint, type) and issubclass(hint, Serializable):
+            namespace[f"_type_{name}"] = hint
+            if optional:
+                get = f"(None if (value := {get}) is None else _type_{name}.construct(value))"
+            else:
+                get = f"_type_{name}.construct({get})"
+        
+        args.append(f"{name}={get}")
+    
+    source = f"def construct(data):\n    return cls({', '.join(args)})\n"
+    exec(compile(source, f"<{cls.__qualname__}.construct>", "exec"), namespace)
+    return namespace['construct']
+
+
+def _strict_config() -> Config:
+    """
+    dacite only knows how to build dataclasses. Serializables which aren't
+    dataclasses, like the lazy Track, are built with their own construct()
+    wherever they're nested.
+    """
+    hooks: dict[type, t.Callable[[t.Any], t.Any]] = {}
+    pending = list(Serializable.__subclasses__())
+    while pending:
+        cls = pending.pop()
+        pending.extend(cls.__subclasses__())
+        if not dataclasses.is_dataclass(cls):
+            hooks[cls] = cls.construct
+    return Config(type_hooks=hooks)
+
+
 class Serializable:
     """
     A serializable object.
@@ -13,7 +90,17 @@ class Serializable:
     representations of JSON information. It provides a classmethod
     which allows for an easy way to convert Lavalink's JSON into nice
     clean objects.
+    
+    Each subclass gets its own generated constructor the first time it is
+    constructed, so type hints aren't introspected on every call. Setting
+    `Serializable.strict` to True routes construction through dacite
+    instead, which validates the types of every field. This is slower,
+    and mostly useful for testing.
     """
+    __slots__ = ()
+    
+    strict: t.ClassVar[bool] = False
+    
     @classmethod
     def construct(cls, data: dict[str, t.Any]) -> t.Self:
         """
@@ -30,4 +117,11 @@ class Serializable:
             The constructed dataclass.
         """
         data = lavalink_dictovert(data)
-        return from_dict(cls, data)
\ No newline at end of file
+        
+        if cls.strict is True:
+            return from_dict(cls, data, config=_strict_config())
+        
+        constructor = _constructors.get(cls, None)
+        if constructor is None:
+            constructor = _constructors[cls] = _compile_constructor(cls)
+        return constructor(data)
@@ -9,4 +9,19 @@ class RepeatMode(enum.Enum):
 
 class SessionMode(enum.Enum):
     TRANSIENT = "TRANSIENT"
-    PERSISTENT = "PERSISTENT"
\ No newline at end of file
+    PERSISTENT = "PERSISTENT"
+
+
+class HistoryAction(enum.IntEnum):
+    OTHER = 0
+    CONNECT = 1
+    DISCONNECT = 2
+    SET_VOLUME = 3
+    INCR_VOLUME = 4
+    STOP = 5
+    SKIP_TO = 6
+    SKIP_BY = 7
+    SEEK = 8
+    PAUSE = 9
+    ENQUEUE = 10
+    ENQUEUE_MANY = 11
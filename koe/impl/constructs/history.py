@@ -1,19 +1,238 @@
+from __future__ import annotations
+from array import array
+import bisect
 from dataclasses import dataclass
 import hikari
+import time
+import typing as t
 
 from .base import Serializable
+from .enums import HistoryAction
+from .track import Track
 
 
-@dataclass
+# How each action is rendered for display. `{}` is the action's argument.
+ACTION_FORMATS: dict[HistoryAction, str] = {
+    HistoryAction.OTHER: "{}",
+    HistoryAction.CONNECT: "connect",
+    HistoryAction.DISCONNECT: "disconnect",
+    HistoryAction.SET_VOLUME: "set volume={}",
+    HistoryAction.INCR_VOLUME: "incr volume={}",
+    HistoryAction.STOP: "stop",
+    HistoryAction.SKIP_TO: "skip to={}",
+    HistoryAction.SKIP_BY: "skip by={}",
+    HistoryAction.SEEK: "seek pos={}",
+    HistoryAction.PAUSE: "pause set={}",
+    HistoryAction.ENQUEUE: "enqueue track={}",
+    HistoryAction.ENQUEUE_MANY: "enqueue tracks={}",
+}
+
+
+@dataclass(slots=True)
 class HistoryRecord(Serializable):
     time: float
     actor_id: int | None
-    action: str
-    
+    code: HistoryAction = HistoryAction.OTHER
+    arg: t.Any = None
+
+    @property
+    def action(self) -> str:
+        arg = self.arg
+        if self.code is HistoryAction.ENQUEUE and isinstance(arg, str):
+            # Enqueues store the encoded track, and only decode it for display.
+            arg = Track.from_encoded(arg).info.title
+        return ACTION_FORMATS[self.code].format(arg)
+
     def get_actor(self, bot: hikari.GatewayBot) -> hikari.User | None:
         if self.actor_id is None:
             return None
         return bot.cache.get_user(self.actor_id)
-    
+
+    def __repr__(self) -> str:
+        return f"<Action {self.code.name} by {self.actor_id}>"
+
+
+class HistoryView(t.Sequence[HistoryRecord]):
+    """
+    A read-only view of a HistoryStore, as it was when the view was made.
+
+    Views don't copy anything. Records appended afterwards aren't part of
+    the view. Records the store has since overwritten raise IndexError when
+    indexed, and are skipped when iterating.
+    """
+    __slots__ = ("_store", "_start", "_stop")
+
+    def __init__(self, store: 'HistoryStore', start: int, stop: int):
+        self._store = store
+        self._start = start
+        self._stop = stop
+
+    def __repr__(self) -> str:
+        return f"<HistoryView len: {len(self)}>"
+
+    def __len__(self) -> int:
+        return self._stop - self._start
+
+    @t.overload
+    def __getitem__(self, index: int) -> HistoryRecord: ...
+    @t.overload
+    def __getitem__(self, index: slice) -> list[HistoryRecord]: ...
+    def __getitem__(self, index: int | slice) -> HistoryRecord | list[HistoryRecord]:
+        if isinstance(index, slice):
+            return [self._store.record(self._start + i) for i in range(*index.indices(len(self)))]
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("HistoryView index out of range")
+        return self._store.record(self._start + index)
+
+    def __iter__(self) -> t.Iterator[HistoryRecord]:
+        for seq in range(max(self._start, self._store.first), self._stop):
+            yield self._store.record(seq)
+
+
+class HistoryStore:
+    """
+    A bounded history of actions taken on a session.
+
+    Records are stored column by column in ring buffers: times as doubles,
+    actor IDs as unsigned 64 bit ints and actions as single byte codes,
+    alongside a small argument per record. Once `capacity` records have
+    been written, each new one overwrites the oldest.
+
+    Every record gets a sequence number, counting up from 0, which is how
+    views keep track of what they cover.
+    """
+    def __init__(self, capacity: int = 1000):
+        self.capacity = capacity
+
+        self._times = array("d")
+        self._actors = array("Q")
+        self._codes = array("B")
+        self._args: list[t.Any] = []
+        self._written = 0
+
     def __repr__(self) -> str:
-        return f"<Action {self.action} by {self.actor_id}>"
\ No newline at end of file
+        return f"<HistoryStore len: {len(self)}, capacity: {self.capacity}>"
+
+    def __len__(self) -> int:
+        return min(self._written, self.capacity)
+
+    def __iter__(self) -> t.Iterator[HistoryRecord]:
+        return iter(self.view())
+
+    @property
+    def first(self) -> int:
+        """
+        The sequence number of the oldest record still stored.
+        """
+        return self._written - len(self)
+
+    def append(
+        self,
+        code: HistoryAction,
+        actor_id: int | None = None,
+        arg: t.Any = None,
+        timestamp: float | None = None
+    ) -> None:
+        if self.capacity <= 0:
+            return
+
+        timestamp = time.time() if timestamp is None else timestamp
+        # Snowflakes are never 0, so it stands in for no actor.
+        actor = int(actor_id) if actor_id is not None else 0
+
+        if self._written < self.capacity:
+            self._times.append(timestamp)
+            self._actors.append(actor)
+            self._codes.append(code)
+            self._args.append(arg)
+        else:
+            slot = self._written % self.capacity
+            self._times[slot] = timestamp
+            self._actors[slot] = actor
+            self._codes[slot] = code
+            self._args[slot] = arg
+        self._written += 1
+
+    def record(self, seq: int) -> HistoryRecord:
+        if not self.first <= seq < self._written:
+            raise IndexError(f"History record {seq} is no longer stored.")
+
+        slot = seq % self.capacity
+        actor = self._actors[slot]
+        return HistoryRecord(
+            time=self._times[slot],
+            actor_id=actor if actor != 0 else None,
+            code=HistoryAction(self._codes[slot]),
+            arg=self._args[slot]
+        )
+
+    def view(self) -> HistoryView:
+        return HistoryView(self, self.first, self._written)
+
+    def tail(self, count: int) -> HistoryView:
+        """
+        A view of the `count` most recent records.
+        """
+        return HistoryView(self, max(self.first, self._written - max(count, 0)), self._written)
+
+    def _bisect_time(self, timestamp: float) -> int:
+        # Times are appended in order, so they can be searched directly.
+        first, capacity, times = self.first, self.capacity, self._times
+        return first + bisect.bisect_left(
+            range(len(self)), timestamp, key=lambda i: times[(first + i) % capacity]
+        )
+
+    def query(
+        self,
+        actor_id: int | None = None,
+        code: HistoryAction | None = None,
+        since: float | None = None,
+        until: float | None = None,
+        limit: int | None = None
+    ) -> list[HistoryRecord]:
+        """
+        Find records matching every given filter, oldest first.
+
+        Arguments
+        ---------
+        actor_id: int | None
+            Only records of actions taken by this user.
+        code: HistoryAction | None
+            Only records of this action.
+        since: float | None
+            Only records at or after this UNIX timestamp.
+        until: float | None
+            Only records before this UNIX timestamp.
+        limit: int | None
+            Return at most this many of the most recent matches.
+        """
+        start = self.first if since is None else self._bisect_time(since)
+        stop = self._written if until is None else self._bisect_time(until)
+
+        actor = int(actor_id) if actor_id is not None else None
+        capacity, actors, codes = self.capacity, self._actors, self._codes
+
+        matches: list[int] = []
+        # Newest first, so a limit can stop the scan early.
+        for seq in range(stop - 1, start - 1, -1):
+            slot = seq % capacity
+            if actor is not None and actors[slot] != actor:
+                continue
+            if code is not None and codes[slot] != code:
+                continue
+
+            matches.append(seq)
+            if limit is not None and len(matches) >= limit:
+                break
+
+        return [self.record(seq) for seq in reversed(matches)]
+
+    def clear(self) -> None:
+        self._times = array("d")
+        self._actors = array("Q")
+        self._codes = array("B")
+        self._args = []
+        self._written = 0
@@ -5,7 +5,7 @@ from .base import Serializable
 from .track import Track
 
 
-@dataclass
+@dataclass(slots=True)
 class PlayerState(Serializable):
     time: int
     position: int
@@ -13,7 +13,7 @@ class PlayerState(Serializable):
     ping: int
 
 
-@dataclass
+@dataclass(slots=True)
 class VoiceState(Serializable):
     token: str
     endpoint: str
@@ -21,7 +21,7 @@ class VoiceState(Serializable):
     channel_id: int | None
 
 
-@dataclass
+@dataclass(slots=True)
 class Player(Serializable):
     guild_id: int
     volume: int
@@ -38,4 +38,40 @@ class Player(Serializable):
         
         if data['voice']['channel_id']:
             data['voice']['channel_id'] = int(data['voice']['channel_id'])
-        return super().construct(data)
\ No newline at end of file
+        # Zero-argument super() doesn't work in slotted dataclasses.
+        return super(Player, cls).construct(data)
+
+@dataclass(slots=True)
+class PlayerSnapshot:
+    """
+    Everything needed to rebuild a session's player on another node.
+    
+    Sessions keep their queue and history themselves, so only the state
+    which lives on the Lavalink node needs to be carried over.
+    """
+    guild_id: int
+    token: str
+    endpoint: str
+    session_id: str
+    channel_id: int
+    encoded: str | None
+    position: int
+    volume: int
+    paused: bool
+    
+    def to_payload(self) -> dict[str, Any]:
+        payload: dict[str, Any] = {
+            'voice': {
+                'token': self.token,
+                'endpoint': self.endpoint,
+                'sessionId': self.session_id,
+                'channelId': str(self.channel_id)
+            },
+            'volume': self.volume,
+            'paused': self.paused
+        }
+        
+        if self.encoded is not None:
+            payload['track'] = {'encoded': self.encoded}
+            payload['position'] = self.position
+        return payload
@@ -0,0 +1,87 @@
+from __future__ import annotations
+from dataclasses import dataclass
+import typing as t
+
+from .base import Serializable
+from .track import Track
+
+
+@dataclass(slots=True)
+class PlaylistInfo(Serializable):
+    name: str
+    selected_track: int
+
+
+class Playlist:
+    """
+    A playlist returned by Koe.load_tracks().
+
+    Playlists can hold thousands of tracks, so they're kept as the raw
+    data Lavalink sent, and each Track is only constructed the first time
+    it's accessed. Iterating a playlist constructs tracks one at a time.
+
+    Attributes
+    ----------
+    info: PlaylistInfo
+        The playlist's name and selected track.
+    plugin_info: dict
+        Extra information added by Lavalink plugins.
+    """
+    __slots__ = ("info", "plugin_info", "_data", "_tracks")
+
+    def __init__(self, info: PlaylistInfo, plugin_info: dict, tracks: list[dict[str, t.Any]]):
+        self.info = info
+        self.plugin_info = plugin_info
+        self._data = tracks
+        self._tracks: list[Track | None] = [None] * len(tracks)
+
+    def __repr__(self) -> str:
+        return f"<Playlist {self.name} tracks: {len(self)}>"
+
+    @classmethod
+    def construct(cls, data: dict[str, t.Any]) -> 'Playlist':
+        return cls(
+            info=PlaylistInfo.construct(data['info']),
+            plugin_info=data.get('plugin_info', {}),
+            tracks=data.get('tracks', [])
+        )
+
+    @property
+    def name(self) -> str:
+        return self.info.name
+
+    @property
+    def selected(self) -> Track | None:
+        """
+        The track which was selected in the playlist's URL, if any.
+        """
+        if 0 <= self.info.selected_track < len(self):
+            return self[self.info.selected_track]
+        return None
+
+    @property
+    def tracks(self) -> list[Track]:
+        """
+        Every track in the playlist. This constructs all of them.
+        """
+        return list(self)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __iter__(self) -> t.Iterator[Track]:
+        for i in range(len(self._data)):
+            yield self[i]
+
+    @t.overload
+    def __getitem__(self, index: int) -> Track: ...
+    @t.overload
+    def __getitem__(self, index: slice) -> list[Track]: ...
+    def __getitem__(self, index: int | slice) -> Track | list[Track]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        track = self._tracks[index]
+        if track is None:
+            track = self._tracks[index] = Track.construct(self._data[index])
+        return track
@@ -1,105 +1,386 @@
+from __future__ import annotations
+import itertools
+import random
+import typing as t
+
 from .track import Track
 from ...errors import InvalidPosition
-from ...utils import AsyncConditionalLock
+from ...utils import ReentrantLock
+
+
+T = t.TypeVar("T")
+
+
+class BlockList(t.Generic[T]):
+    """
+    A list stored as a sequence of blocks of up to about 2 * LOAD items.
+
+    A Fenwick tree over the block lengths finds the block holding any index
+    in O(log n), so positional reads, inserts and removals only ever touch
+    one small block, rather than shifting everything after them. Blocks are
+    split as they grow and dropped once empty, which rebuilds the tree.
+    """
+    LOAD: t.ClassVar[int] = 256
+
+    def __init__(self, items: t.Iterable[T] = ()):
+        self._blocks: list[list[T]] = []
+        self._tree: list[int] = [0]
+        self._len = 0
+        self._build(list(items))
+
+    def __repr__(self) -> str:
+        return f"<BlockList len: {self._len}, blocks: {len(self._blocks)}>"
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __iter__(self) -> t.Iterator[T]:
+        return itertools.chain.from_iterable(self._blocks)
+
+    def _build(self, items: list[T]) -> None:
+        self._blocks = [items[i:i+self.LOAD] for i in range(0, len(items), self.LOAD)]
+        self._len = len(items)
+        self._rebuild_tree()
+
+    def _rebuild_tree(self) -> None:
+        n = len(self._blocks)
+        tree = [0] * (n + 1)
+        for i, block in enumerate(self._blocks, 1):
+            tree[i] += len(block)
+            parent = i + (i & -i)
+            if parent <= n:
+                tree[parent] += tree[i]
+        self._tree = tree
+
+    def _update(self, block: int, delta: int) -> None:
+        i = block + 1
+        n = len(self._blocks)
+        while i <= n:
+            self._tree[i] += delta
+            i += i & -i
+
+    def _locate(self, index: int) -> tuple[int, int]:
+        # Descend the tree for the last block whose prefix sum is <= index.
+        n = len(self._blocks)
+        block, remaining = 0, index
+        step = 1 << (n.bit_length() - 1) if n else 0
+
+        while step:
+            nxt = block + step
+            if nxt <= n and self._tree[nxt] <= remaining:
+                block = nxt
+                remaining -= self._tree[nxt]
+            step >>= 1
+        return block, remaining
+
+    def _normalize(self, index: int) -> int:
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError("BlockList index out of range")
+        return index
+
+    @t.overload
+    def __getitem__(self, index: int) -> T: ...
+    @t.overload
+    def __getitem__(self, index: slice) -> list[T]: ...
+    def __getitem__(self, index: int | slice) -> T | list[T]:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._len)
+            if step != 1:
+                return self.tolist()[index]
+            return self.slice(start, stop)
+
+        block, offset = self._locate(self._normalize(index))
+        return self._blocks[block][offset]
+
+    def __setitem__(self, index: int, value: T) -> None:
+        block, offset = self._locate(self._normalize(index))
+        self._blocks[block][offset] = value
+
+    def slice(self, start: int, stop: int) -> list[T]:
+        """
+        Get the items in [start, stop), touching only the blocks they're in.
+        """
+        start, stop = max(start, 0), min(stop, self._len)
+        if start >= stop:
+            return []
+
+        block, offset = self._locate(start)
+        out: list[T] = []
+        count = stop - start
+
+        while len(out) < count:
+            out.extend(self._blocks[block][offset:offset + count - len(out)])
+            block += 1
+            offset = 0
+        return out
+
+    def insert(self, index: int, value: T) -> None:
+        if index < 0:
+            index = max(index + self._len, 0)
+        index = min(index, self._len)
+
+        if not self._blocks:
+            self._build([value])
+            return
+
+        if index == self._len:
+            block, offset = len(self._blocks) - 1, len(self._blocks[-1])
+        else:
+            block, offset = self._locate(index)
+
+        self._blocks[block].insert(offset, value)
+        self._len += 1
+
+        if len(self._blocks[block]) > 2 * self.LOAD:
+            items = self._blocks[block]
+            self._blocks[block:block+1] = [items[:self.LOAD], items[self.LOAD:]]
+            self._rebuild_tree()
+        else:
+            self._update(block, 1)
+
+    def append(self, value: T) -> None:
+        self.insert(self._len, value)
+
+    def extend(self, values: t.Iterable[T]) -> None:
+        values = list(values)
+        if not values:
+            return
+
+        # Top up the last block, then add whole new ones.
+        if self._blocks and len(self._blocks[-1]) < self.LOAD:
+            room = self.LOAD - len(self._blocks[-1])
+            self._blocks[-1].extend(values[:room])
+            values = values[room:]
+
+        self._blocks.extend(values[i:i+self.LOAD] for i in range(0, len(values), self.LOAD))
+        self._len = sum(len(block) for block in self._blocks)
+        self._rebuild_tree()
+
+    def pop(self, index: int = -1) -> T:
+        block, offset = self._locate(self._normalize(index))
+        value = self._blocks[block].pop(offset)
+        self._len -= 1
+
+        if not self._blocks[block]:
+            del self._blocks[block]
+            self._rebuild_tree()
+        else:
+            self._update(block, -1)
+        return value
+
+    def clear(self) -> None:
+        self._build([])
+
+    def tolist(self) -> list[T]:
+        return list(self)
+
+    def reorder(self, items: t.Iterable[T]) -> None:
+        """
+        Replace every item at once, rebuilding the blocks evenly.
+        """
+        self._build(list(items))
 
 
 class Queue:
+    """
+    A session's queue of tracks, and the position of the current one.
+
+    Tracks are kept in a BlockList, so inserting, removing and reading at
+    any position stays cheap even for queues with thousands of tracks.
+    """
     def __init__(self):
-        self._queue = []
+        self._queue: BlockList[Track] = BlockList()
         self._pos = 0
-        self.lock = AsyncConditionalLock()
-    
+        self.lock = ReentrantLock()
+
     def __repr__(self) -> str:
         return f"<Queue pos: {self._pos}, len: {len(self._queue)}>"
-    
-    async def insert(self, track: Track, position: int, unsafe: bool=False) -> None:
-        async with self.lock(unsafe=unsafe):
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    async def insert(self, track: Track, position: int) -> None:
+        async with self.lock:
+            # Inserting before the current track shifts it along.
+            if len(self._queue) > 0 and position <= self._pos:
+                self._pos += 1
             self._queue.insert(position, track)
-    
-    async def append(self, track: Track, unsafe: bool=False) -> None:
-        async with self.lock(unsafe=unsafe):
+
+    async def append(self, track: Track) -> None:
+        async with self.lock:
             self._queue.append(track)
-    
-    async def prepend(self, track: Track, unsafe: bool=False) -> None:
-        async with self.lock(unsafe=unsafe):
+
+    async def extend(self, tracks: t.Iterable[Track]) -> None:
+        """
+        Append many tracks at once, taking the lock only once.
+        """
+        async with self.lock:
+            self._queue.extend(tracks)
+
+    async def prepend(self, track: Track) -> None:
+        async with self.lock:
             self._queue.insert(self._pos+1, track)
-    
-    async def is_empty(self, unsafe: bool=False) -> bool:
-        async with self.lock(unsafe=unsafe):
-            return self._queue == []
-    
-    async def reset(self, unsafe: bool=False) -> None:
-        async with self.lock(unsafe=unsafe):
-            self._queue = []
+
+    async def is_empty(self) -> bool:
+        async with self.lock:
+            return len(self._queue) == 0
+
+    async def reset(self) -> None:
+        async with self.lock:
+            self._queue.clear()
             self._pos = 0
-    
-    async def get_pos(self, unsafe: bool=False) -> int:
-        async with self.lock(unsafe=unsafe):
+
+    async def get_pos(self) -> int:
+        async with self.lock:
             return self._pos
-    
-    async def advance_by(self, by: int, unsafe: bool=False) -> Track:
-        async with self.lock(unsafe=unsafe):
+
+    async def advance_by(self, by: int) -> Track:
+        async with self.lock:
             if by == 0:
                 raise InvalidPosition("The queue cannot be advanced by 0.")
-            
+
             new_pos = self._pos + by
             if new_pos < 0 or new_pos >= len(self._queue):
                 lwr_bnd = -(self._pos) if self._pos != 0 else 1
                 upr_bnd = len(self._queue) - (self._pos + 1) if (self._pos + 1) != len(self._queue) else -1
-                
+
                 if lwr_bnd == upr_bnd:
                     raise InvalidPosition(f"Invalid advance: `{by}`. The queue can currently only be advanced by `{lwr_bnd}`.")
                 raise InvalidPosition(f"Invalid advance: `{by}`. The queue can currently only be advanced by values between `{lwr_bnd}` and `{upr_bnd}`.")
 
             self._pos = new_pos
             return self._queue[self._pos]
-    
-    async def advance_to(self, to: int, zero_indexed: bool=False, unsafe: bool=False) -> Track:
-        to = to - 1 if zero_indexed is False else to
-        
-        if to < 0 or to > len(self._queue) - 1:
-            if zero_indexed is True:
-                raise InvalidPosition(f"Invalid advance: `{to}`. The queue can currently only be advanced to alues between `0` and `{len(self._queue)-1}`.")
-            raise InvalidPosition(f"Invalid advance: `{to+1}`. The queue can currently only be advanced to values between `1` and `{len(self._queue)}`.")
-
-        if to == self._pos:
-            if zero_indexed is True:
-                raise InvalidPosition(f"`{to}` is the current position of the queue. This operation would have no effect.")
-            raise InvalidPosition(f"`{to+1}` is the current position of the queue. This operation would have no effect.")
-        self._pos = to
-        return self._queue[self._pos]
-        
-    async def advance(self, unsafe: bool=False) -> Track | None:
-        async with self.lock(unsafe=unsafe):
+
+    async def advance_to(self, to: int, zero_indexed: bool=False) -> Track:
+        async with self.lock:
+            to = to - 1 if zero_indexed is False else to
+
+            if to < 0 or to > len(self._queue) - 1:
+                if zero_indexed is True:
+                    raise InvalidPosition(f"Invalid advance: `{to}`. The queue can currently only be advanced to alues between `0` and `{len(self._queue)-1}`.")
+                raise InvalidPosition(f"Invalid advance: `{to+1}`. The queue can currently only be advanced to values between `1` and `{len(self._queue)}`.")
+
+            if to == self._pos:
+                if zero_indexed is True:
+                    raise InvalidPosition(f"`{to}` is the current position of the queue. This operation would have no effect.")
+                raise InvalidPosition(f"`{to+1}` is the current position of the queue. This operation would have no effect.")
+            self._pos = to
+            return self._queue[self._pos]
+
+    async def advance(self) -> Track | None:
+        async with self.lock:
             try:
-                return await self.advance_by(1, unsafe=True)
+                return await self.advance_by(1)
             except InvalidPosition:
                 return None
-    
-    async def insert_after_current(self, track: Track, unsafe: bool=False) -> None:
-        await self.insert(track, self._pos + 1)
-    
-    async def get_current(self, unsafe: bool=False) -> Track | None:
-        async with self.lock(unsafe=unsafe):
+
+    async def insert_after_current(self, track: Track) -> None:
+        async with self.lock:
+            await self.insert(track, self._pos + 1)
+
+    async def get_current(self) -> Track | None:
+        async with self.lock:
             try:
                 return self._queue[self._pos]
             except IndexError:
                 return None
-    
-    async def remove_at(self, pos: int, unsafe=True) -> Track:
-        if (pos - 1) == self._pos:
-            raise InvalidPosition(f"Invalid position: `{pos}`. Removing at the current position is not allowed.")
-        
-        try:
-            return self._queue.pop(pos-1)
-        except IndexError:
-            raise InvalidPosition(f"Invalid position: `{pos}`. Values must be between `1` and `{len(self._queue)}`.")
-    
-    async def get_all_and_pos(self, unsafe: bool=False) -> tuple[list[Track], int]:
-        async with self.lock(unsafe=unsafe):
-            return self._queue, self._pos
-    
-    async def empty(self, unsafe: bool=False) -> None:
-        async with self.lock(unsafe=unsafe):
-            self._queue = []
-            self._pos = 0
\ No newline at end of file
+
+    async def remove_at(self, pos: int) -> Track:
+        async with self.lock:
+            if (pos - 1) == self._pos:
+                raise InvalidPosition(f"Invalid position: `{pos}`. Removing at the current position is not allowed.")
+            if not 1 <= pos <= len(self._queue):
+                raise InvalidPosition(f"Invalid position: `{pos}`. Values must be between `1` and `{len(self._queue)}`.")
+
+            track = self._queue.pop(pos-1)
+            if (pos - 1) < self._pos:
+                self._pos -= 1
+            return track
+
+    async def move(self, src: int, dst: int) -> None:
+        """
+        Move the track at position `src` to position `dst`. Both are one
+        indexed, like remove_at(). The current track stays current.
+        """
+        async with self.lock:
+            for pos in (src, dst):
+                if not 1 <= pos <= len(self._queue):
+                    raise InvalidPosition(f"Invalid position: `{pos}`. Values must be between `1` and `{len(self._queue)}`.")
+
+            src, dst = src - 1, dst - 1
+            if src == dst:
+                return
+
+            self._queue.insert(dst, self._queue.pop(src))
+
+            if src == self._pos:
+                self._pos = dst
+            elif src < self._pos <= dst:
+                self._pos -= 1
+            elif dst <= self._pos < src:
+                self._pos += 1
+
+    async def shuffle(self) -> None:
+        """
+        Shuffle the tracks after the current one.
+        """
+        async with self.lock:
+            upcoming = self._queue.slice(self._pos + 1, len(self._queue))
+            random.shuffle(upcoming)
+            self._queue.reorder(itertools.chain(self._queue.slice(0, self._pos + 1), upcoming))
+
+    async def dedupe(self) -> int:
+        """
+        Remove repeated tracks, keeping the first of each. The current
+        track always wins over its copies, wherever they are.
+
+        Returns
+        -------
+        int
+            The number of tracks removed.
+        """
+        async with self.lock:
+            current = self._queue[self._pos] if len(self._queue) > 0 else None
+            seen: set[str] = set() if current is None else {current.encoded}
+            kept: list[Track] = []
+            new_pos = 0
+
+            for i, track in enumerate(self._queue):
+                if i == self._pos:
+                    new_pos = len(kept)
+                elif track.encoded in seen:
+                    continue
+                else:
+                    seen.add(track.encoded)
+                kept.append(track)
+
+            removed = len(self._queue) - len(kept)
+            self._queue.reorder(kept)
+            self._pos = new_pos
+            return removed
+
+    async def get_slice(self, start: int, stop: int) -> list[Track]:
+        """
+        Get the tracks in [start, stop), zero indexed, for showing a page
+        of the queue without copying the rest of it.
+        """
+        async with self.lock:
+            return self._queue.slice(start, stop)
+
+    async def replace(self, tracks: list[Track], pos: int=0) -> None:
+        async with self.lock:
+            if tracks and not 0 <= pos < len(tracks):
+                raise InvalidPosition(f"Invalid position: `{pos}`. Values must be between `0` and `{len(tracks)-1}`.")
+            self._queue.reorder(tracks)
+            self._pos = pos if tracks else 0
+
+    async def get_all_and_pos(self) -> tuple[list[Track], int]:
+        async with self.lock:
+            return self._queue.tolist(), self._pos
+
+    async def empty(self) -> None:
+        async with self.lock:
+            self._queue.clear()
+            self._pos = 0
@@ -0,0 +1,130 @@
+from __future__ import annotations
+from dataclasses import dataclass
+import orjson as json
+import os
+import shutil
+import tempfile
+import typing as t
+
+from .enums import RepeatMode, SessionMode
+
+
+@dataclass(slots=True)
+class SessionSnapshot:
+    """
+    Everything needed to bring a session back after a restart.
+
+    Tracks are stored as their encoded strings, which is all Lavalink
+    needs to play them, and history as compact rows. Snapshots serialize
+    straight to JSON with orjson.
+
+    Attributes
+    ----------
+    queue: list[str]
+        The encoded tracks in the queue.
+    queue_pos: int
+        The zero indexed position of the current track in the queue.
+    position: int | None
+        How far into the current track playback was, in milliseconds. None
+        if nothing was playing.
+    history: list[tuple[float, int | None, int, t.Any]]
+        The most recent history records, as (time, actor_id, action code,
+        argument) rows.
+    """
+    guild_id: int
+    voice_id: int
+    channel_id: int | None = None
+    mode: str = SessionMode.PERSISTENT.value
+    repeat_mode: str = RepeatMode.NONE.value
+    volume: int = 100
+    paused: bool = False
+    queue: list[str] | None = None
+    queue_pos: int = 0
+    position: int | None = None
+    history: list[tuple[float, int | None, int, t.Any]] | None = None
+
+    @classmethod
+    def from_dict(cls, data: dict[str, t.Any]) -> 'SessionSnapshot':
+        """
+        Build a snapshot from its dict form. Missing fields take their
+        defaults, so sessions saved by older versions still load.
+        """
+        # Older saves stored str(SessionMode.X).
+        mode = str(data.get('mode', SessionMode.PERSISTENT.value)).rsplit(".", 1)[-1]
+
+        return cls(
+            guild_id=int(data['guild_id']),
+            voice_id=int(data['voice_id']),
+            channel_id=int(data['channel_id']) if data.get('channel_id', None) is not None else None,
+            mode=mode,
+            repeat_mode=data.get('repeat_mode', RepeatMode.NONE.value),
+            volume=data.get('volume', 100),
+            paused=data.get('paused', False),
+            queue=list(data.get('queue', None) or []),
+            queue_pos=data.get('queue_pos', 0),
+            position=data.get('position', None),
+            history=[tuple(record) for record in data.get('history', None) or []]  # type: ignore
+        )
+
+
+SNAPSHOT_VERSION = 1
+
+
+def dump_snapshots(snapshots: t.Iterable[SessionSnapshot]) -> bytes:
+    return json.dumps({'version': SNAPSHOT_VERSION, 'sessions': list(snapshots)})
+
+
+def load_snapshots(data: bytes) -> list[SessionSnapshot]:
+    loaded = json.loads(data)
+    if loaded.get('version', None) != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported snapshot version: {loaded.get('version', None)}.")
+    return [SessionSnapshot.from_dict(session) for session in loaded['sessions']]
+
+
+def write_atomic(path: str, data: bytes) -> None:
+    """
+    Write a file such that readers only ever see the old or new contents.
+
+    The data is written to a uniquely named temporary file next to the
+    target, flushed to disk, then moved over it in one step. The directory
+    is flushed too, so the move itself survives a crash.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+
+    with tempfile.NamedTemporaryFile(
+        dir=directory,
+        prefix=f".{os.path.basename(path)}.",
+        suffix=".tmp",
+        delete=False
+    ) as f:
+        tmp = f.name
+        try:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        except BaseException:
+            f.close()
+            os.unlink(tmp)
+            raise
+
+    try:
+        if os.path.exists(path):
+            shutil.copymode(path, tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+    _fsync_directory(directory)
+
+
+def _fsync_directory(directory: str) -> None:
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        # Not every platform can open a directory, Windows being one.
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
@@ -3,7 +3,7 @@ from dataclasses import dataclass
 from .base import Serializable
 
 
-@dataclass
+@dataclass(slots=True)
 class Memory(Serializable):
     free: int
     used: int
@@ -11,15 +11,30 @@ class Memory(Serializable):
     reservable: int
 
 
-@dataclass
+@dataclass(slots=True)
 class CPU(Serializable):
     cores: int
     system_load: float
     lavalink_load: float
 
 
-@dataclass
+@dataclass(slots=True)
 class FrameStats(Serializable):
     sent: int
     nulled: int
-    deficit: int
\ No newline at end of file
+    deficit: int
+
+@dataclass(slots=True)
+class NodeStats(Serializable):
+    """
+    A compact representation of a Lavalink `stats` frame.
+    
+    This is what the websocket decodes `stats` frames into, and is
+    what Koe keeps track of, rather than the full StatisticsEvent.
+    """
+    players: int
+    playing_players: int
+    uptime: int
+    memory: Memory
+    cpu: CPU
+    frame_stats: FrameStats | None
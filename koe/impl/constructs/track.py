@@ -1,10 +1,14 @@
 from __future__ import annotations
+import base64
 from dataclasses import dataclass
+import struct
+import typing as t
 
 from .base import Serializable
+from ...utils import lavalink_dictovert
 
 
-@dataclass
+@dataclass(slots=True)
 class TrackInfo(Serializable):
     identifier: str
     is_seekable: bool
@@ -19,7 +23,7 @@ class TrackInfo(Serializable):
     source_name: str
 
 
-@dataclass
+@dataclass(slots=True)
 class TrackException(Serializable):
     message: str
     severity: str
@@ -27,9 +31,264 @@ class TrackException(Serializable):
     cause_stack_trace: str
 
 
-@dataclass
+class _TrackReader:
+    """
+    Reads the Java DataOutput primitives Lavaplayer encodes tracks with.
+    """
+    __slots__ = ("data", "offset")
+
+    def __init__(self, data: bytes):
+        self.data = data
+        self.offset = 0
+
+    def read(self, fmt: str) -> t.Any:
+        value = struct.unpack_from(fmt, self.data, self.offset)[0]
+        self.offset += struct.calcsize(fmt)
+        return value
+
+    def utf(self) -> str:
+        size = self.read(">H")
+        raw = self.data[self.offset:self.offset + size]
+        self.offset += size
+
+        try:
+            return raw.decode("utf-8")
+        except UnicodeDecodeError:
+            # Java's modified UTF-8 encodes NUL as two bytes, and characters
+            # outside the BMP as a surrogate pair of three bytes each.
+            text = raw.replace(b"\xc0\x80", b"\x00").decode("utf-8", "surrogatepass")
+            return text.encode("utf-16", "surrogatepass").decode("utf-16")
+
+    def nullable_utf(self) -> str | None:
+        return self.utf() if self.read(">?") else None
+
+
+def decode_track_info(encoded: str) -> TrackInfo:
+    """
+    Decode the TrackInfo held in an encoded track, without asking Lavalink.
+
+    Arguments
+    ---------
+    encoded: str
+        The base64 encoded track, as sent by Lavalink.
+
+    Returns
+    -------
+    TrackInfo
+        The track's info. Lavalink doesn't encode whether a track is
+        seekable, so like Lavalink, every track which isn't a stream is.
+    """
+    data = base64.b64decode(encoded)
+    reader = _TrackReader(data)
+
+    header = reader.read(">i")
+    versioned = (header >> 30) & 1
+    version = reader.read(">B") if versioned else 1
+    if version > 3:
+        raise ValueError(f"Unsupported track version: {version}.")
+
+    title = reader.utf()
+    author = reader.utf()
+    length = reader.read(">q")
+    identifier = reader.utf()
+    is_stream = reader.read(">?")
+    uri = reader.nullable_utf() if version >= 2 else None
+
+    artwork_url, isrc = None, None
+    start = reader.offset
+    if version >= 3:
+        artwork_url, isrc = reader.nullable_utf(), reader.nullable_utf()
+    try:
+        source_name = reader.utf()
+    except (struct.error, UnicodeDecodeError):
+        if version != 2:
+            raise
+        source_name = ""
+
+    if version == 2 and (not source_name or not source_name.isprintable()):
+        # Some encoders write artwork and ISRC fields under version 2.
+        reader.offset = start
+        artwork_url, isrc = reader.nullable_utf(), reader.nullable_utf()
+        source_name = reader.utf()
+
+    # Source specific fields come next, but the position is always last.
+    position = struct.unpack_from(">q", data, len(data) - 8)[0]
+
+    return TrackInfo(
+        identifier=identifier,
+        is_seekable=not is_stream,
+        author=author,
+        length=length,
+        is_stream=is_stream,
+        position=position,
+        title=title,
+        uri=uri,
+        artwork_url=artwork_url,
+        irsc=isrc,
+        source_name=source_name
+    )
+
+
+def _java_utf(value: str) -> bytes:
+    if value.isascii() and "\x00" not in value:
+        raw = value.encode("ascii")
+    else:
+        # Java's modified UTF-8, the reverse of _TrackReader.utf().
+        out = bytearray()
+        for char in value:
+            point = ord(char)
+            if point == 0:
+                out += b"\xc0\x80"
+            elif point > 0xFFFF:
+                point -= 0x10000
+                for half in (0xD800 + (point >> 10), 0xDC00 + (point & 0x3FF)):
+                    out += chr(half).encode("utf-8", "surrogatepass")
+            else:
+                out += char.encode("utf-8")
+        raw = bytes(out)
+    return struct.pack(">H", len(raw)) + raw
+
+
+def _java_nullable_utf(value: str | None) -> bytes:
+    if value is None:
+        return struct.pack(">?", False)
+    return struct.pack(">?", True) + _java_utf(value)
+
+
+def encode_track_info(info: TrackInfo) -> str:
+    """
+    Encode a TrackInfo the way Lavaplayer does, as a version 3 track.
+
+    This is the reverse of decode_track_info(). Tracks encoded here carry
+    no source specific fields, so Lavalink can only play them if their
+    source doesn't need any.
+    """
+    body = b"".join((
+        struct.pack(">B", 3),
+        _java_utf(info.title),
+        _java_utf(info.author),
+        struct.pack(">q", info.length),
+        _java_utf(info.identifier),
+        struct.pack(">?", info.is_stream),
+        _java_nullable_utf(info.uri),
+        _java_nullable_utf(info.artwork_url),
+        _java_nullable_utf(info.irsc),
+        _java_utf(info.source_name),
+        struct.pack(">q", info.position)
+    ))
+    # The low 30 bits of the header are the size, and bit 30 marks the
+    # track as versioned.
+    header = struct.pack(">i", len(body) | (1 << 30))
+    return base64.b64encode(header + body).decode()
+
+
 class Track(Serializable):
+    """
+    A track which can be played by Lavalink.
+
+    Most of the time only `encoded` is needed, so Tracks are lazy. A Track
+    keeps the encoded string, and a reference to the raw info it was built
+    from if there was any, and only builds `info` the first time it's
+    accessed. Tracks without raw info, such as those from from_encoded(),
+    decode their info from the encoded string itself.
+
+    Attributes
+    ----------
     encoded: str
+        The base64 encoded track.
     info: TrackInfo
+        Information about the track.
     plugin_info: dict
-    user_data: dict
\ No newline at end of file
+        Extra information added by Lavalink plugins.
+    user_data: dict
+        Data attached to the track by the user.
+    """
+    __slots__ = ("encoded", "_raw_info", "_info", "_plugin_info", "_user_data")
+
+    def __init__(
+        self,
+        encoded: str,
+        info: TrackInfo | None = None,
+        plugin_info: dict | None = None,
+        user_data: dict | None = None
+    ):
+        self.encoded = encoded
+        self._raw_info: dict[str, t.Any] | None = None
+        self._info = info
+        self._plugin_info = plugin_info
+        self._user_data = user_data
+
+    def __repr__(self) -> str:
+        if self._info is None:
+            return f"<Track {self.encoded[:16]}...>"
+        return f"<Track {self._info.title} by {self._info.author}>"
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Track):
+            return NotImplemented
+        return self.encoded == other.encoded
+
+    def __hash__(self) -> int:
+        return hash(self.encoded)
+
+    @classmethod
+    def construct(cls, data: dict[str, t.Any]) -> t.Self:
+        """
+        Construct a Track from Lavalink's JSON, deferring everything except
+        the encoded string. Keys may be camelCased or snake_cased.
+        """
+        track = cls(
+            data['encoded'],
+            plugin_info=data.get('plugin_info', data.get('pluginInfo', None)),
+            user_data=data.get('user_data', data.get('userData', None))
+        )
+        track._raw_info = data.get('info', None)
+
+        if cls.strict is True:
+            track.info
+        return track
+
+    @classmethod
+    def from_encoded(cls, encoded: str) -> t.Self:
+        """
+        Make a Track from just its encoded string. Its info is decoded
+        locally when first accessed.
+        """
+        return cls(encoded)
+
+    @property
+    def info(self) -> TrackInfo:
+        if self._info is None:
+            if self._raw_info is not None:
+                self._info = TrackInfo.construct(self._raw_info)
+            else:
+                self._info = decode_track_info(self.encoded)
+            self._raw_info = None
+        return self._info
+
+    @info.setter
+    def info(self, info: TrackInfo) -> None:
+        self._info = info
+        self._raw_info = None
+
+    @property
+    def plugin_info(self) -> dict:
+        if self._plugin_info is None:
+            self._plugin_info = {}
+        self._plugin_info = lavalink_dictovert(self._plugin_info)
+        return self._plugin_info
+
+    @plugin_info.setter
+    def plugin_info(self, plugin_info: dict) -> None:
+        self._plugin_info = plugin_info
+
+    @property
+    def user_data(self) -> dict:
+        if self._user_data is None:
+            self._user_data = {}
+        self._user_data = lavalink_dictovert(self._user_data)
+        return self._user_data
+
+    @user_data.setter
+    def user_data(self, user_data: dict) -> None:
+        self._user_data = user_data
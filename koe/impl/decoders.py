@@ -0,0 +1,71 @@
+"""
+Op-specific decoders for frames recieved from the Lavalink websocket.
+
+`playerUpdate` and `stats` are by far the most frequent ops Lavalink sends,
+so rather than converting the entire payload to snake_case and building a
+full hikari event for every one, these decoders pull the fields Koe cares
+about straight out of the raw (camelCased) JSON.
+"""
+import typing
+
+from .constructs.player import PlayerState
+from .constructs.stats import Memory, CPU, FrameStats, NodeStats
+
+
+def decode_player_state(state: dict[str, typing.Any]) -> PlayerState:
+    return PlayerState(
+        time=state['time'],
+        position=state['position'],
+        connected=state['connected'],
+        ping=state['ping']
+    )
+
+
+def decode_player_update(data: dict[str, typing.Any]) -> tuple[int, PlayerState]:
+    """
+    Decode a raw `playerUpdate` frame.
+
+    Args:
+        data (dict): The raw frame, as parsed from JSON.
+
+    Returns:
+        tuple[int, PlayerState]: The guild ID and the state of its player.
+    """
+    return int(data['guildId']), decode_player_state(data['state'])
+
+
+def decode_stats(data: dict[str, typing.Any]) -> NodeStats:
+    """
+    Decode a raw `stats` frame.
+
+    Args:
+        data (dict): The raw frame, as parsed from JSON.
+
+    Returns:
+        NodeStats: The decoded node statistics.
+    """
+    memory = data['memory']
+    cpu = data['cpu']
+    frame_stats = data.get('frameStats')
+    
+    return NodeStats(
+        players=data['players'],
+        playing_players=data['playingPlayers'],
+        uptime=data['uptime'],
+        memory=Memory(
+            free=memory['free'],
+            used=memory['used'],
+            allocated=memory['allocated'],
+            reservable=memory['reservable']
+        ),
+        cpu=CPU(
+            cores=cpu['cores'],
+            system_load=cpu['systemLoad'],
+            lavalink_load=cpu['lavalinkLoad']
+        ),
+        frame_stats=FrameStats(
+            sent=frame_stats['sent'],
+            nulled=frame_stats['nulled'],
+            deficit=frame_stats['deficit']
+        ) if frame_stats is not None else None
+    )
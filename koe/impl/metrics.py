@@ -0,0 +1,507 @@
+from __future__ import annotations
+import bisect
+import math
+import typing as t
+import weakref
+
+from aiohttp import web
+
+from .constructs.enums import SessionMode
+from .statistics import FIELDS
+from ..log import logger
+
+
+if t.TYPE_CHECKING:
+    from ..client import Koe
+    from ..session.base import Session
+    from ..utils import ReentrantLock
+
+
+Labels = tuple[str, ...]
+
+# Latency buckets, in seconds, for requests that leave the process.
+DEFAULT_BUCKETS: tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Buckets for work done in-process, such as decoding a frame.
+FAST_BUCKETS: tuple[float, ...] = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.01)
+
+
+class Instrument:
+    """
+    A named family of values, one per set of label values.
+
+    Label values are passed positionally as a tuple, in the order the
+    label names were given, so recording a value is a single dict update.
+    """
+    kind: t.ClassVar[str] = "unknown"
+
+    def __init__(self, name: str, documentation: str, labels: t.Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels: Labels = tuple(labels)
+        self._values: dict[Labels, t.Any] = {}
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} {self.name} series: {len(self._values)}>"
+
+    def clear(self) -> None:
+        self._values.clear()
+
+    def samples(self) -> t.Iterator[tuple[str, Labels, Labels, float]]:
+        """
+        Yield (suffix, label names, label values, value) for every sample.
+        """
+        for labels, value in self._values.items():
+            yield "", self.labels, labels, value
+
+
+class Counter(Instrument):
+    kind = "counter"
+
+    def inc(self, labels: Labels = (), amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def samples(self) -> t.Iterator[tuple[str, Labels, Labels, float]]:
+        for labels, value in self._values.items():
+            yield "_total", self.labels, labels, value
+
+
+class Gauge(Instrument):
+    kind = "gauge"
+
+    def set(self, value: float, labels: Labels = ()) -> None:
+        self._values[labels] = value
+
+    def inc(self, labels: Labels = (), amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+
+class Histogram(Instrument):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: t.Sequence[str] = (),
+        buckets: t.Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labels)
+        self.buckets: tuple[float, ...] = tuple(sorted(buckets))
+
+    def observe(self, value: float, labels: Labels = ()) -> None:
+        # Each series is [count per bucket..., count above the last, sum].
+        # Counts aren't cumulative until they're exported.
+        series = self._values.get(labels, None)
+        if series is None:
+            series = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def samples(self) -> t.Iterator[tuple[str, Labels, Labels, float]]:
+        names = self.labels + ("le",)
+        for labels, series in self._values.items():
+            total = 0
+            for bound, count in zip(self.buckets, series):
+                total += count
+                yield "_bucket", names, labels + (_format_value(bound),), total
+
+            total += series[-2]
+            yield "_bucket", names, labels + ("+Inf",), total
+            yield "_sum", self.labels, labels, series[-1]
+            yield "_count", self.labels, labels, total
+
+
+class _NullInstrument:
+    """
+    Stands in for every instrument when metrics are disabled.
+    """
+    __slots__ = ()
+
+    def inc(self, labels: Labels = (), amount: float = 1.0) -> None:
+        pass
+
+    def set(self, value: float, labels: Labels = ()) -> None:
+        pass
+
+    def observe(self, value: float, labels: Labels = ()) -> None:
+        pass
+
+    def clear(self) -> None:
+        pass
+
+
+_NULL_INSTRUMENT = _NullInstrument()
+
+
+class MetricsRegistry:
+    """
+    Holds instruments, and renders them in the Prometheus text format.
+
+    This is the extension point for other metrics backends. A subclass
+    can override counter(), gauge() and histogram() to return its own
+    instruments, as long as they have the same inc(), set() and observe()
+    methods. Koe records everything through those.
+
+    Collectors are callables run just before the registry is rendered.
+    They are for values that are cheaper to read when scraped than to
+    track as they change, like the number of sessions.
+    """
+    enabled: bool = True
+
+    def __init__(self):
+        self._instruments: dict[str, Instrument] = {}
+        self._collectors: list[t.Callable[[], None]] = []
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} instruments: {len(self._instruments)}>"
+
+    def _register(self, cls: type[Instrument], name: str, *args, **kwargs) -> t.Any:
+        instrument = self._instruments.get(name, None)
+        if instrument is None:
+            instrument = self._instruments[name] = cls(name, *args, **kwargs)
+        elif type(instrument) is not cls:
+            raise ValueError(f"Metric {name} is already registered as a {instrument.kind}.")
+        return instrument
+
+    def counter(self, name: str, documentation: str, labels: t.Sequence[str] = ()) -> Counter:
+        return self._register(Counter, name, documentation, labels)
+
+    def gauge(self, name: str, documentation: str, labels: t.Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge, name, documentation, labels)
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labels: t.Sequence[str] = (),
+        buckets: t.Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram, name, documentation, labels, buckets=buckets)
+
+    def register_collector(self, collector: t.Callable[[], None]) -> None:
+        self._collectors.append(collector)
+
+    def collect(self) -> list[Instrument]:
+        for collector in self._collectors:
+            try:
+                collector()
+            except Exception as e:
+                logger.warning(f"Metrics collector {collector!r} failed: {e!r}")
+        return list(self._instruments.values())
+
+    def render(self, openmetrics: bool = False) -> str:
+        """
+        Render every instrument in the Prometheus text format, or in the
+        OpenMetrics text format if `openmetrics` is True.
+        """
+        lines: list[str] = []
+        for instrument in self.collect():
+            # OpenMetrics names counter families without the _total suffix,
+            # while the Prometheus format names them after their samples.
+            family = instrument.name
+            if instrument.kind == "counter" and not openmetrics:
+                family += "_total"
+
+            lines.append(f"# HELP {family} {_escape(instrument.documentation, help=True)}")
+            lines.append(f"# TYPE {family} {instrument.kind}")
+            for suffix, names, values, value in instrument.samples():
+                lines.append(f"{instrument.name}{suffix}{_format_labels(names, values)} {_format_value(value)}")
+
+        if openmetrics:
+            lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+
+class NullRegistry(MetricsRegistry):
+    """
+    A registry which records nothing. This is the default.
+    """
+    enabled = False
+
+    def counter(self, name: str, documentation: str, labels: t.Sequence[str] = ()) -> t.Any:
+        return _NULL_INSTRUMENT
+
+    def gauge(self, name: str, documentation: str, labels: t.Sequence[str] = ()) -> t.Any:
+        return _NULL_INSTRUMENT
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labels: t.Sequence[str] = (),
+        buckets: t.Sequence[float] = DEFAULT_BUCKETS
+    ) -> t.Any:
+        return _NULL_INSTRUMENT
+
+    def register_collector(self, collector: t.Callable[[], None]) -> None:
+        pass
+
+
+def _escape(value: str, help: bool = False) -> str:
+    value = value.replace("\\", "\\\\").replace("\n", "\\n")
+    return value if help else value.replace('"', '\\"')
+
+
+def _format_labels(names: Labels, values: Labels) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)) + "}"
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, int):
+        return str(value)
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+def route_template(endpoint: str) -> str:
+    """
+    Replace the session and guild IDs in an endpoint with placeholders, so
+    each route is one label value rather than one per guild.
+
+    Ex: `sessions/abc/players/123` becomes `sessions/{id}/players/{id}`.
+    """
+    parts = endpoint.split("/")
+    for i in range(1, len(parts)):
+        if parts[i-1] in ("sessions", "players"):
+            parts[i] = "{id}"
+    return "/".join(parts)
+
+
+class KoeMetrics:
+    """
+    The instruments Koe records to.
+
+    With the default NullRegistry every instrument is a no-op, and
+    `enabled` is False, which the hot paths check before doing any timing
+    at all. Everything below costs a dict update or two per event once
+    enabled, and is meant to be left on in production.
+
+    Attributes
+    ----------
+    rest_latency: Histogram
+        REST request latency, by node, method, endpoint and status. The
+        status is `error` if no response was recieved.
+    ws_messages: Counter
+        Websocket messages recieved, by node and op.
+    ws_decode: Histogram
+        Time taken to parse websocket messages, by node and op.
+    track_starts: Counter
+        Tracks started.
+    track_transitions: Counter
+        Tracks ended, by the reason they ended.
+    track_failures: Counter
+        Tracks which failed to load, threw an exception or got stuck.
+    first_audio: Histogram
+        Time to first audio, as measured by Koe.starts.
+    sessions: Gauge
+        Active sessions, by session mode. Collected when scraped.
+    lock_acquisitions, lock_contended: Counter
+        Lock acquisitions, and those which had to wait, by lock kind.
+    lock_wait, lock_hold: Counter
+        Total seconds spent waiting for and holding locks, by lock kind.
+        Collected from each lock's LockStats when scraped, and from a
+        session's locks when it's removed.
+    node_stats: dict[str, Gauge]
+        The latest statistics from each Lavalink node, by node.
+    """
+    def __init__(self, registry: MetricsRegistry | None = None):
+        self.registry = registry if registry is not None else NullRegistry()
+        self.enabled = self.registry.enabled
+        r = self.registry
+
+        self.rest_latency = r.histogram(
+            "koe_rest_request_duration_seconds",
+            "Latency of requests to the Lavalink REST API.",
+            ("node", "method", "endpoint", "status")
+        )
+        self.ws_messages = r.counter(
+            "koe_websocket_messages",
+            "Messages recieved from the Lavalink websocket.",
+            ("node", "op")
+        )
+        self.ws_decode = r.histogram(
+            "koe_websocket_decode_duration_seconds",
+            "Time taken to parse messages from the Lavalink websocket.",
+            ("node", "op"),
+            buckets=FAST_BUCKETS
+        )
+        self.track_starts = r.counter("koe_track_starts", "Tracks started.")
+        self.track_transitions = r.counter(
+            "koe_track_transitions",
+            "Tracks ended, by the reason they ended.",
+            ("reason",)
+        )
+        self.track_failures = r.counter(
+            "koe_track_failures",
+            "Tracks which failed to load, threw an exception or got stuck.",
+            ("kind",)
+        )
+        self.first_audio = r.histogram(
+            "koe_time_to_first_audio_seconds",
+            "Time from a track being requested to its TrackStartEvent arriving."
+        )
+        self.sessions = r.gauge("koe_sessions", "Active sessions.", ("mode",))
+
+        self.lock_acquisitions = r.counter("koe_lock_acquisitions", "Lock acquisitions, not counting re-entries.", ("lock",))
+        self.lock_contended = r.counter("koe_lock_contended", "Lock acquisitions which had to wait.", ("lock",))
+        self.lock_wait = r.counter("koe_lock_wait_seconds", "Time spent waiting for locks.", ("lock",))
+        self.lock_hold = r.counter("koe_lock_hold_seconds", "Time spent holding locks.", ("lock",))
+
+        # How much of each lock's LockStats has been counted so far. Only
+        # what's new is added, so the counters never go down as sessions
+        # and their locks come and go.
+        self._counted: weakref.WeakKeyDictionary[ReentrantLock, tuple[int, int, float, float]] = weakref.WeakKeyDictionary()
+
+        self.node_stats = {
+            field: r.gauge(f"koe_node_{field}", f"The latest {field.replace('_', ' ')} reported by each node.", ("node",))
+            for field in FIELDS
+        }
+
+    def __repr__(self) -> str:
+        return f"<KoeMetrics enabled: {self.enabled}>"
+
+    def bind(self, koe: 'Koe') -> None:
+        """
+        Collect Koe's sessions, locks and node statistics when scraped.
+        """
+        self.registry.register_collector(lambda: self.collect(koe))
+
+    def track_event(self, data: dict[str, t.Any]) -> None:
+        """
+        Count a track event frame from the websocket.
+        """
+        kind = data.get('type', None)
+        if kind == "TrackStartEvent":
+            self.track_starts.inc()
+        elif kind == "TrackEndEvent":
+            reason = data.get('reason', "unknown")
+            self.track_transitions.inc((reason,))
+            if reason == "loadFailed":
+                self.track_failures.inc(("load_failed",))
+        elif kind == "TrackExceptionEvent":
+            self.track_failures.inc(("exception",))
+        elif kind == "TrackStuckEvent":
+            self.track_failures.inc(("stuck",))
+
+    def count_locks(self, kind: str, locks: t.Iterable[ReentrantLock]) -> None:
+        """
+        Add whatever the locks have recorded since they were last counted.
+        """
+        acquisitions, contended, wait, hold = 0, 0, 0.0, 0.0
+        for lock in locks:
+            stats = lock.stats
+            current = (stats.acquisitions, stats.contended, stats.total_wait, stats.total_hold)
+            previous = self._counted.get(lock, (0, 0, 0.0, 0.0))
+            self._counted[lock] = current
+
+            acquisitions += current[0] - previous[0]
+            contended += current[1] - previous[1]
+            wait += current[2] - previous[2]
+            hold += current[3] - previous[3]
+
+        labels = (kind,)
+        self.lock_acquisitions.inc(labels, acquisitions)
+        self.lock_contended.inc(labels, contended)
+        self.lock_wait.inc(labels, wait)
+        self.lock_hold.inc(labels, hold)
+
+    def retire_session(self, session: 'Session') -> None:
+        """
+        Count a session's locks one last time, as it's removed.
+        """
+        self.count_locks("session", (session.lock,))
+        self.count_locks("queue", (session.queue.lock,))
+
+    def collect(self, koe: 'Koe') -> None:
+        modes = {mode.value: 0 for mode in SessionMode}
+        locks = {
+            "stripe": list(koe._session_locks),
+            "session": [],
+            "queue": []
+        }
+
+        for session in list(koe._sessions.values()):
+            mode = session.session_mode.value
+            modes[mode] = modes.get(mode, 0) + 1
+            locks["session"].append(session.lock)
+            locks["queue"].append(session.queue.lock)
+
+        for mode, count in modes.items():
+            self.sessions.set(count, (mode,))
+
+        for kind, held in locks.items():
+            self.count_locks(kind, held)
+
+        for gauge in self.node_stats.values():
+            gauge.clear()
+        for node in koe.nodes:
+            for field, gauge in self.node_stats.items():
+                value = node.stats.last(field)
+                if value is not None:
+                    gauge.set(value, (node.name,))
+
+
+class MetricsExporter:
+    """
+    Serves a registry over HTTP, for Prometheus to scrape.
+
+    Ex:
+    ```
+    exporter = MetricsExporter(koe.metrics.registry, port=9100)
+    await exporter.start()
+    ```
+
+    Scrapers asking for `application/openmetrics-text` get the OpenMetrics
+    format. Everything else gets the Prometheus text format.
+    """
+    PROMETHEUS_CONTENT_TYPE: t.ClassVar[str] = "text/plain; version=0.0.4; charset=utf-8"
+    OPENMETRICS_CONTENT_TYPE: t.ClassVar[str] = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+    def __init__(self, registry: MetricsRegistry, host: str = "127.0.0.1", port: int = 9100, path: str = "/metrics"):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self.path = path
+
+        self._runner: web.AppRunner | None = None
+
+    def __repr__(self) -> str:
+        return f"<MetricsExporter {self.host}:{self.port}{self.path}>"
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        openmetrics = "application/openmetrics-text" in request.headers.get("Accept", "")
+        body = self.registry.render(openmetrics=openmetrics)
+
+        return web.Response(
+            body=body.encode(),
+            headers={
+                'Content-Type': self.OPENMETRICS_CONTENT_TYPE if openmetrics else self.PROMETHEUS_CONTENT_TYPE
+            }
+        )
+
+    async def start(self) -> None:
+        if self._runner is not None:
+            raise RuntimeError("Metrics exporter is already running.")
+
+        app = web.Application()
+        app.router.add_get(self.path, self._handle)
+
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+
+        # Port 0 picks a free port, so read back which one.
+        self.port = self._runner.addresses[0][1]
+        logger.info(f"Serving metrics on http://{self.host}:{self.port}{self.path}")
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
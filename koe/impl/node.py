@@ -0,0 +1,271 @@
+from __future__ import annotations
+import asyncio
+import hikari
+import typing
+
+from .rest import RestAPI, TransportConfig
+from .resilience import ResilienceConfig
+from .ws import WebSocket
+from .statistics import StatisticsStore
+from ..errors import NoNodeError
+from ..log import logger
+
+
+if typing.TYPE_CHECKING:
+    from ..client import Koe
+
+
+class Node:
+    """
+    A single Lavalink node.
+
+    Each node has its own websocket, REST API, Lavalink session ID and
+    statistics. Koe places guilds on nodes, and routes each guild's player
+    calls to the node that owns it.
+
+    Attributes
+    ----------
+    name: str
+        The unique name of the node.
+    session_id: str | None
+        The Lavalink session ID, once the node is ready.
+    resume_timeout: int | None
+        How many seconds Lavalink should keep this node's players alive
+        after the websocket drops. None disables resuming.
+    draining: bool
+        Whether or not this node is being drained. Draining nodes are
+        never picked for new players.
+    stats: StatisticsStore
+        The statistics recieved from this node.
+    """
+    def __init__(
+        self,
+        name: str,
+        host: str="localhost",
+        port: int=2333,
+        password: str="",
+        ssl: bool=False,
+        fast_path: bool=True,
+        stats: StatisticsStore | None = None,
+        resume_timeout: int | None = 60,
+        transport: TransportConfig | None = None,
+        resilience: ResilienceConfig | None = None
+    ):
+        self.name = name
+        self.host = host
+        self.port = port
+        self.password = password
+        self.ssl = ssl
+        self.fast_path = fast_path
+        self.resume_timeout = resume_timeout
+        self.transport = transport
+        self.resilience = resilience
+
+        self.session_id: str | None = None
+        self.draining: bool = False
+        self.stats = stats if stats is not None else StatisticsStore()
+
+        self._ws: WebSocket | None = None
+        self._rest: RestAPI | None = None
+        self._guild_ids: set[int] = set()
+        self._tasks: set[asyncio.Task] = set()
+
+    def __repr__(self) -> str:
+        return f"<Node {self.name} {self.host}:{self.port} guilds: {len(self._guild_ids)}>"
+
+    @property
+    def ready(self) -> bool:
+        if self.session_id is None or self._rest is None:
+            return False
+        if not self._rest.resilience.breaker.available:
+            return False
+        return self._ws is not None and self._ws.connected
+
+    @property
+    def rest(self) -> RestAPI:
+        if self._rest is None:
+            raise RuntimeError(f"RestAPI for node {self.name} not ready.")
+        return self._rest
+
+    @property
+    def ws(self) -> WebSocket | None:
+        return self._ws
+
+    @property
+    def guild_ids(self) -> frozenset[int]:
+        return frozenset(self._guild_ids)
+
+    @property
+    def penalty(self) -> float:
+        """
+        How loaded this node is. Lower is better.
+
+        Lavalink only sends stats once a minute, so the number of guilds
+        Koe has placed on this node is used as a floor for the player count,
+        which keeps a burst of new sessions from all landing on one node.
+        """
+        playing = max(self.stats.last("playing_players") or 0, len(self._guild_ids))
+
+        # Grows steeply as the JVM runs out of CPU.
+        cpu = 1.05 ** (100 * (self.stats.last("cpu_lavalink_load") or 0)) * 10 - 10
+
+        # Frames are sent every 20ms, so a full minute is 3000 of them.
+        deficit = self.stats.last("frame_deficit") or 0
+        nulled = self.stats.last("frame_nulled") or 0
+        frames = (1.03 ** (500 * deficit / 3000) * 600 - 600) + nulled * 2
+
+        return playing + cpu + frames
+
+    def start(self, koe: 'Koe', user_id: hikari.Snowflake) -> None:
+        if self._ws is not None:
+            return
+
+        self._ws = WebSocket(
+            user_id,
+            url=self.host,
+            port=self.port,
+            password=self.password,
+            fast_path=self.fast_path,
+            node=self,
+            reconnect=True
+        )
+
+        self._rest = RestAPI(
+            url=self.host,
+            port=self.port,
+            password=self.password,
+            config=self.transport,
+            resilience=self.resilience,
+            metrics=koe.metrics,
+            tracer=koe.tracer,
+            name=self.name
+        )
+
+        self._ws.start(koe)
+        logger.info(f"Started node {self.name}.")
+
+    async def stop(self) -> None:
+        if self._ws is not None:
+            self._ws.stop()
+            self._ws = None
+
+        if self._rest is not None:
+            await self._rest.close()
+            self._rest = None
+
+        self.session_id = None
+
+    async def on_ready(self, koe: 'Koe', session_id: str, resumed: bool) -> None:
+        previous = self.session_id
+        self.session_id = session_id
+        
+        if resumed is True:
+            logger.info(f"Node {self.name} resumed session ID {session_id}.")
+        else:
+            logger.info(f"Node {self.name} ready with session ID {session_id}.")
+            if previous is not None and self._guild_ids:
+                logger.warning(f"Node {self.name} could not resume session {previous}. Rebuilding {len(self._guild_ids)} players.")
+                self._spawn(koe.migrate(self, exclude_source=False))
+        
+        if self.resume_timeout is not None:
+            await self.configure_resuming(self.resume_timeout)
+    
+    def _spawn(self, coro: typing.Coroutine) -> None:
+        # Migrations can take a while, and must not hold up the websocket.
+        task = asyncio.get_running_loop().create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+    
+    async def on_lost(self, koe: 'Koe') -> None:
+        """
+        Called when the websocket has given up reconnecting.
+        """
+        self.session_id = None
+        logger.error(f"Node {self.name} was lost.")
+        
+        if self._guild_ids:
+            self._spawn(koe.migrate(self))
+    
+    async def configure_resuming(self, timeout: int) -> None:
+        """
+        Tell Lavalink to keep this session's players alive for `timeout`
+        seconds after the websocket drops, so they can be resumed.
+        """
+        try:
+            await self.rest.patch(
+                f"sessions/{self.session_id}",
+                payload={
+                    'resuming': True,
+                    'timeout': timeout
+                }
+            )
+        except Exception as e:
+            logger.warning(f"Failed to configure resuming for node {self.name}: {e!r}")
+
+    def add_guild(self, guild_id: int) -> None:
+        self._guild_ids.add(int(guild_id))
+
+    def rm_guild(self, guild_id: int) -> None:
+        self._guild_ids.discard(int(guild_id))
+
+
+class NodePool:
+    """
+    The set of Lavalink nodes available to Koe.
+    """
+    def __init__(self):
+        self._nodes: dict[str, Node] = {}
+
+    def __repr__(self) -> str:
+        return f"<NodePool nodes: {len(self._nodes)}>"
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def __iter__(self) -> typing.Iterator[Node]:
+        return iter(list(self._nodes.values()))
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._nodes
+
+    def add(self, node: Node) -> None:
+        if node.name in self._nodes:
+            raise ValueError(f"A node named {node.name} already exists.")
+        self._nodes[node.name] = node
+
+    def remove(self, name: str) -> Node:
+        node = self._nodes.pop(name, None)
+        if node is None:
+            raise NoNodeError(f"No node named {name} exists.")
+        return node
+
+    def get(self, name: str) -> Node:
+        node = self._nodes.get(name, None)
+        if node is None:
+            raise NoNodeError(f"No node named {name} exists.")
+        return node
+
+    @property
+    def ready(self) -> list[Node]:
+        return [node for node in self._nodes.values() if node.ready]
+
+    def best(self, exclude: typing.Iterable[Node] = ()) -> Node:
+        """
+        Get the least loaded node which is ready.
+
+        Arguments
+        ---------
+        exclude: typing.Iterable[Node]
+            Nodes which should not be considered.
+
+        Returns
+        -------
+        Node
+            The node with the lowest penalty.
+        """
+        excluded = set(id(node) for node in exclude)
+        candidates = [node for node in self.ready if id(node) not in excluded and not node.draining]
+
+        if not candidates:
+            raise NoNodeError("No Lavalink nodes are available.")
+        return min(candidates, key=lambda node: node.penalty)
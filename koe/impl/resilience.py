@@ -0,0 +1,228 @@
+from __future__ import annotations
+import aiohttp
+import asyncio
+from dataclasses import dataclass
+import enum
+import random
+import time
+import typing as t
+
+from ..errors import RestError, CircuitOpenError, BackpressureError
+from ..log import logger
+
+
+T = t.TypeVar("T")
+
+
+@dataclass(slots=True)
+class ResilienceConfig:
+    """
+    Configuration for retries, circuit breaking and backpressure on
+    requests to a single Lavalink node.
+
+    Attributes
+    ----------
+    retries: int
+        How many times a failed request may be retried.
+    backoff_base: float
+        The base delay between retries, in seconds. Doubles each attempt.
+    backoff_cap: float
+        The maximum delay between retries, in seconds.
+    failure_threshold: int
+        How many consecutive failures open the circuit.
+    recovery_time: float
+        How long the circuit stays open before a probe is let through.
+    max_concurrency: int
+        The maximum number of requests in flight at once.
+    max_queue: int
+        The maximum number of requests waiting for a slot. Any more are
+        rejected with a BackpressureError.
+    """
+    retries: int = 2
+    backoff_base: float = 0.1
+    backoff_cap: float = 2.0
+    failure_threshold: int = 5
+    recovery_time: float = 10.0
+    max_concurrency: int = 64
+    max_queue: int = 1024
+
+
+@dataclass(slots=True)
+class ResilienceMetrics:
+    calls: int = 0
+    retries: int = 0
+    failures: int = 0
+    rejected: int = 0
+    shed: int = 0
+    queued: int = 0
+    peak_queued: int = 0
+
+
+class CircuitState(enum.Enum):
+    CLOSED = "CLOSED"
+    OPEN = "OPEN"
+    HALF_OPEN = "HALF_OPEN"
+
+
+class CircuitBreaker:
+    """
+    Stops sending requests to a node after too many consecutive failures.
+
+    After `recovery_time` seconds, a single probe request is let through.
+    If it succeeds the circuit closes again, otherwise it stays open.
+    """
+    def __init__(self, failure_threshold: int = 5, recovery_time: float = 10.0):
+        self.failure_threshold = failure_threshold
+        self.recovery_time = recovery_time
+
+        self.state = CircuitState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._probe_started = 0.0
+
+    def __repr__(self) -> str:
+        return f"<CircuitBreaker {self.state.value} failures: {self._failures}>"
+
+    @property
+    def available(self) -> bool:
+        if self.state is CircuitState.OPEN:
+            return time.monotonic() - self._opened_at >= self.recovery_time
+        return True
+
+    def before(self) -> None:
+        """
+        Raise CircuitOpenError if a request may not be sent right now.
+        """
+        if self.state is CircuitState.CLOSED:
+            return
+
+        elapsed = time.monotonic() - self._opened_at
+        if self.state is CircuitState.OPEN and elapsed >= self.recovery_time:
+            self.state = CircuitState.HALF_OPEN
+            self._probing = False
+
+        if self.state is CircuitState.HALF_OPEN:
+            # A probe which never finished (cancelled, say) mustn't leave
+            # the circuit stuck, so it's given up on after recovery_time.
+            now = time.monotonic()
+            if self._probing is False or now - self._probe_started >= self.recovery_time:
+                self._probing = True
+                self._probe_started = now
+                return
+
+        raise CircuitOpenError(max(self.recovery_time - elapsed, 0.0))
+
+    def record_success(self) -> None:
+        if self.state is not CircuitState.CLOSED:
+            logger.info("Circuit closed.")
+        self.state = CircuitState.CLOSED
+        self._failures = 0
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self._failures += 1
+
+        if self.state is CircuitState.HALF_OPEN or self._failures >= self.failure_threshold:
+            if self.state is not CircuitState.OPEN:
+                logger.warning(f"Circuit opened after {self._failures} consecutive failures.")
+            self.state = CircuitState.OPEN
+            self._opened_at = time.monotonic()
+            self._probing = False
+
+
+def is_transient(error: BaseException) -> bool:
+    if isinstance(error, RestError):
+        return error.status >= 500 or error.status == 429
+    return isinstance(error, (aiohttp.ClientConnectionError, asyncio.TimeoutError))
+
+
+def is_unsent(error: BaseException) -> bool:
+    # The connection couldn't be made, so the request never reached Lavalink
+    # and it's safe to retry no matter what it was.
+    return isinstance(error, aiohttp.ClientConnectorError)
+
+
+class Resilience:
+    """
+    Retries, circuit breaking and bounded concurrency for one node.
+    """
+    def __init__(self, config: ResilienceConfig | None = None):
+        self.config = config if config is not None else ResilienceConfig()
+        self.breaker = CircuitBreaker(
+            failure_threshold=self.config.failure_threshold,
+            recovery_time=self.config.recovery_time
+        )
+        self.metrics = ResilienceMetrics()
+        self._semaphore = asyncio.Semaphore(self.config.max_concurrency)
+
+    def __repr__(self) -> str:
+        return f"<Resilience {self.breaker.state.value} queued: {self.metrics.queued}>"
+
+    def backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.config.backoff_cap, self.config.backoff_base * (2 ** attempt)))
+
+    async def _acquire(self) -> None:
+        if self._semaphore.locked() and self.metrics.queued >= self.config.max_queue:
+            self.metrics.shed += 1
+            raise BackpressureError(self.metrics.queued)
+
+        self.metrics.queued += 1
+        self.metrics.peak_queued = max(self.metrics.peak_queued, self.metrics.queued)
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.metrics.queued -= 1
+
+    async def call(self, send: t.Callable[[], t.Awaitable[T]], retryable: bool) -> T:
+        """
+        Send a request.
+
+        Arguments
+        ---------
+        send: t.Callable[[], t.Awaitable[T]]
+            Sends the request. Called once per attempt.
+        retryable: bool
+            Whether or not the request is idempotent, and may be retried
+            after it might have reached Lavalink.
+        """
+        self.metrics.calls += 1
+
+        try:
+            self.breaker.before()
+        except CircuitOpenError:
+            self.metrics.rejected += 1
+            raise
+
+        await self._acquire()
+        try:
+            attempt = 0
+            while True:
+                try:
+                    result = await send()
+                except Exception as e:
+                    if not is_transient(e):
+                        # Lavalink answered, so the node itself is fine.
+                        self.breaker.record_success()
+                        raise
+
+                    self.metrics.failures += 1
+                    self.breaker.record_failure()
+
+                    if attempt >= self.config.retries or not (retryable or is_unsent(e)):
+                        raise
+
+                    await asyncio.sleep(self.backoff(attempt))
+                    attempt += 1
+                    self.metrics.retries += 1
+
+                    try:
+                        self.breaker.before()
+                    except CircuitOpenError:
+                        self.metrics.rejected += 1
+                        raise e
+                else:
+                    self.breaker.record_success()
+                    return result
+        finally:
+            self._semaphore.release()
@@ -1,16 +1,59 @@
+from dataclasses import dataclass
 import aiohttp
 import orjson as json
+import time
+import typing
 
 from .connection import Connection
+from .metrics import KoeMetrics, route_template
+from .tracing import Tracer
+from .resilience import Resilience, ResilienceConfig
+from ..errors import RestError
 from ..utils import lavalink_dictovert
 
 
+@dataclass(slots=True)
+class TransportConfig:
+    """
+    Configuration of the HTTP transport used to talk to Lavalink.
+
+    Attributes
+    ----------
+    limit: int
+        The maximum number of open connections. 0 is unlimited.
+    limit_per_host: int
+        The maximum number of open connections per host. 0 is unlimited.
+    keepalive_timeout: float
+        How long idle connections are kept open for reuse, in seconds.
+    ttl_dns_cache: int | None
+        How long DNS lookups are cached for, in seconds. None caches forever.
+    total_timeout: float | None
+        The default timeout of a whole request, in seconds.
+    connect_timeout: float | None
+        The default timeout for getting a connection, in seconds.
+    read_timeout: float | None
+        The default timeout between reads of a response, in seconds.
+    """
+    limit: int = 100
+    limit_per_host: int = 0
+    keepalive_timeout: float = 30.0
+    ttl_dns_cache: int | None = 300
+    total_timeout: float | None = 10.0
+    connect_timeout: float | None = 5.0
+    read_timeout: float | None = None
+
+
 class RestAPI(Connection):
     def __init__(
         self,
         url: str="localhost",
         port: int=2333,
-        password: str=""
+        password: str="",
+        config: TransportConfig | None = None,
+        resilience: ResilienceConfig | None = None,
+        metrics: KoeMetrics | None = None,
+        tracer: Tracer | None = None,
+        name: str = "default"
     ):
         super().__init__(
             protocol="http",
@@ -18,53 +61,156 @@ class RestAPI(Connection):
             port=port,
             password=password
         )
-        
-        self._http = aiohttp.ClientSession()
-        
-    @property
-    def headers(self) -> dict[str, str]:
-        return {
+
+        self.config = config if config is not None else TransportConfig()
+        self.metrics = metrics if metrics is not None else KoeMetrics()
+        self.tracer = tracer if tracer is not None else Tracer()
+        self.name = name
+
+        self._base = f"{self.route}/v4/"
+        self._headers = {
             'Authorization': self.password,
             'Content-Type': 'application/json'
         }
+
+        self._http = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=self.config.limit,
+                limit_per_host=self.config.limit_per_host,
+                keepalive_timeout=self.config.keepalive_timeout,
+                use_dns_cache=True,
+                ttl_dns_cache=self.config.ttl_dns_cache
+            ),
+            timeout=aiohttp.ClientTimeout(
+                total=self.config.total_timeout,
+                connect=self.config.connect_timeout,
+                sock_read=self.config.read_timeout
+            ),
+            headers=self._headers
+        )
+
+        self.resilience = Resilience(resilience)
         
-    @staticmethod
-    def get_query_str(d: dict[str, str]) -> str:
-        if d:
-            p = []
-            for key, value in d.items():
-                p.append(f"{key}={value}")
-            return f"?{'&'.join(p)}"
-        else:
-            return ""
-    
-    async def get(self, endpoint: str, params={}, payload={}) -> dict:
-        query = self.get_query_str(params)
-        response = await self._http.get(
-            f"{self.route}/v4/{endpoint}{query}",
-            headers=self.headers,
-            data=payload
+        # Counters for sizing the connection pool.
+        self.requests: int = 0
+        self.in_flight: int = 0
+        self.peak_in_flight: int = 0
+        self.saturated: int = 0
+
+    async def close(self) -> None:
+        await self._http.close()
+
+    @property
+    def headers(self) -> dict[str, str]:
+        return self._headers
+
+    @property
+    def saturation(self) -> float:
+        """
+        The fraction of the connection pool currently in use.
+        """
+        if self.config.limit == 0:
+            return 0.0
+        return self.in_flight / self.config.limit
+
+    async def request(
+        self,
+        method: str,
+        endpoint: str,
+        params: dict[str, str] | None = None,
+        payload: typing.Any = None,
+        timeout: float | None = None,
+        idempotent: bool | None = None
+    ) -> bytes:
+        """
+        Make a request, and return the raw body of the response.
+        
+        Requests go through this node's Resilience, so they may be retried,
+        rejected while the node's circuit is open, or shed if too many are
+        already waiting.
+
+        Arguments
+        ---------
+        method: str
+            The HTTP method.
+        endpoint: str
+            The endpoint, relative to /v4/.
+        params: dict[str, str] | None
+            Query parameters, which are URL encoded.
+        payload: typing.Any
+            A payload to be sent as JSON. None sends no body.
+        timeout: float | None
+            Overrides the total timeout for this request.
+        idempotent: bool | None
+            Whether the request may be retried once it might have reached
+            Lavalink. Defaults to True for GET and DELETE, False otherwise.
+        """
+        if idempotent is None:
+            idempotent = method in ("GET", "DELETE")
+        
+        return await self.resilience.call(
+            lambda: self._send(method, endpoint, params, payload, timeout),
+            retryable=idempotent
         )
-        data = await response.text()
+    
+    async def _send(
+        self,
+        method: str,
+        endpoint: str,
+        params: dict[str, str] | None,
+        payload: typing.Any,
+        timeout: float | None
+    ) -> bytes:
+        self.requests += 1
+        if self.config.limit and self.in_flight >= self.config.limit:
+            # This request will have to wait for a connection.
+            self.saturated += 1
+
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+        kwargs: dict[str, typing.Any] = {}
+        if params:
+            kwargs['params'] = params
+        if payload is not None:
+            kwargs['data'] = json.dumps(payload)
+        if timeout is not None:
+            kwargs['timeout'] = aiohttp.ClientTimeout(total=timeout)
+
+        metrics = self.metrics
+        start = time.perf_counter() if metrics.enabled else 0.0
+        status = "error"
+
+        try:
+            with self.tracer.span(
+                f"koe.rest {method}",
+                **{'http.request.method': method, 'url.template': route_template(endpoint), 'koe.node': self.name}
+            ) as span:
+                async with self._http.request(method, self._base + endpoint, **kwargs) as response:
+                    status = str(response.status)
+                    span.set_attribute("http.response.status_code", response.status)
+                    data = await response.read()
+                    if response.status >= 500 or response.status == 429:
+                        raise RestError(method, endpoint, response.status, data)
+                    return data
+        finally:
+            self.in_flight -= 1
+            if metrics.enabled:
+                metrics.rest_latency.observe(
+                    time.perf_counter() - start,
+                    (self.name, method, route_template(endpoint), status)
+                )
+
+    async def get(self, endpoint: str, params={}, payload={}, timeout: float | None=None) -> dict:
+        data = await self.request("GET", endpoint, params=params, payload=payload or None, timeout=timeout)
         return lavalink_dictovert(json.loads(data))
 
-    async def patch(self, endpoint: str, params={}, payload={}) -> dict:
-        query = self.get_query_str(params)
-        response = await self._http.patch(
-            f"{self.route}/v4/{endpoint}{query}",
-            headers=self.headers,
-            data=json.dumps(payload)
-        )
-        data = await response.text()
+    async def patch(self, endpoint: str, params={}, payload={}, timeout: float | None=None, idempotent: bool=False) -> dict:
+        data = await self.request("PATCH", endpoint, params=params, payload=payload, timeout=timeout, idempotent=idempotent)
         return lavalink_dictovert(json.loads(data))
 
-    async def delete(self, endpoint: str, payload={}) -> dict:
-        response = await self._http.delete(
-            f"{self.route}/v4/{endpoint}",
-            headers=self.headers,
-            data=payload
-        )
-        data = await response.text()
+    async def delete(self, endpoint: str, payload={}, timeout: float | None=None) -> dict:
+        data = await self.request("DELETE", endpoint, payload=payload or None, timeout=timeout)
         if data:
             return lavalink_dictovert(json.loads(data))
         return {}
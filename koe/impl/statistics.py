@@ -0,0 +1,319 @@
+from __future__ import annotations
+import array
+from collections import deque
+from dataclasses import dataclass
+import math
+import time
+import typing as t
+
+from .constructs.stats import NodeStats
+
+
+FIELDS: tuple[str, ...] = (
+    "players",
+    "playing_players",
+    "memory_used",
+    "memory_allocated",
+    "cpu_system_load",
+    "cpu_lavalink_load",
+    "frame_sent",
+    "frame_nulled",
+    "frame_deficit"
+)
+
+
+def _extract(stats: NodeStats) -> tuple[float, ...]:
+    frames = stats.frame_stats
+    return (
+        stats.players,
+        stats.playing_players,
+        stats.memory.used,
+        stats.memory.allocated,
+        stats.cpu.system_load,
+        stats.cpu.lavalink_load,
+        frames.sent if frames is not None else 0,
+        frames.nulled if frames is not None else 0,
+        frames.deficit if frames is not None else 0
+    )
+
+
+@dataclass(slots=True)
+class Aggregate:
+    """
+    Aggregate values of one statistic over a window.
+
+    Attributes
+    ----------
+    count: int
+        The number of samples in the window.
+    mean: float
+        The mean of the samples.
+    min: float
+        The smallest sample.
+    max: float
+        The largest sample.
+    p95: float
+        The 95th percentile of the samples.
+    """
+    count: int
+    mean: float
+    min: float
+    max: float
+    p95: float
+
+
+class _Window:
+    """
+    Rolling aggregates over the most recent `span` seconds of a store.
+
+    Sums are kept for the mean, and monotonic deques of sequence numbers
+    for min and max, so all three are maintained in amortized O(1) per
+    sample. The p95 is computed when asked for, and cached until the
+    window next changes.
+    """
+    def __init__(self, store: StatisticsStore, span: float):
+        self.store = store
+        self.span = span
+        self.seqs: deque[int] = deque()
+        self.sums = [0.0] * len(FIELDS)
+        self.mins: list[deque[int]] = [deque() for _ in FIELDS]
+        self.maxs: list[deque[int]] = [deque() for _ in FIELDS]
+        self._p95: dict[int, float] = {}
+
+    def push(self, seq: int) -> None:
+        self.seqs.append(seq)
+        self._p95.clear()
+
+        for i, column in enumerate(self.store._columns):
+            value = self.store._value(column, seq)
+            self.sums[i] += value
+
+            mins = self.mins[i]
+            while mins and self.store._value(column, mins[-1]) >= value:
+                mins.pop()
+            mins.append(seq)
+
+            maxs = self.maxs[i]
+            while maxs and self.store._value(column, maxs[-1]) <= value:
+                maxs.pop()
+            maxs.append(seq)
+
+    def evict(self, first: int, now: float) -> None:
+        cutoff = now - self.span
+
+        while self.seqs:
+            seq = self.seqs[0]
+            if seq >= first and self.store._value(self.store._times, seq) >= cutoff:
+                break
+
+            self.seqs.popleft()
+            self._p95.clear()
+
+            for i, column in enumerate(self.store._columns):
+                self.sums[i] -= self.store._value(column, seq)
+                if self.mins[i] and self.mins[i][0] == seq:
+                    self.mins[i].popleft()
+                if self.maxs[i] and self.maxs[i][0] == seq:
+                    self.maxs[i].popleft()
+
+        if not self.seqs:
+            self.sums = [0.0] * len(FIELDS)
+
+    def aggregate(self, index: int) -> Aggregate | None:
+        count = len(self.seqs)
+        if count == 0:
+            return None
+
+        column = self.store._columns[index]
+        p95 = self._p95.get(index, None)
+        if p95 is None:
+            p95 = self._p95[index] = _percentile(
+                [self.store._value(column, seq) for seq in self.seqs],
+                0.95
+            )
+
+        return Aggregate(
+            count=count,
+            mean=self.sums[index] / count,
+            min=self.store._value(column, self.mins[index][0]),
+            max=self.store._value(column, self.maxs[index][0]),
+            p95=p95
+        )
+
+
+def _percentile(values: list[float], q: float) -> float:
+    values = sorted(values)
+    rank = max(math.ceil(q * len(values)) - 1, 0)
+    return values[rank]
+
+
+class StatisticsStore:
+    """
+    A bounded store for Lavalink node statistics.
+
+    Only the numeric fields of each stats frame are kept, in fixed size
+    array-backed columns which are used as a ring buffer. The store is
+    bounded by `capacity` samples and optionally by `max_age` seconds.
+
+    Rolling aggregates are maintained incrementally for each of the
+    windows (in seconds) passed in, as well as over the whole store.
+
+    Ex:
+    ```
+    agg = koe.stats.aggregate("playing_players", window=300)
+    if agg is not None and agg.p95 > 500:
+      # this node is busy
+    ```
+    """
+    def __init__(
+        self,
+        capacity: int = 1440,
+        max_age: float | None = None,
+        windows: t.Iterable[float] = (300.0, 3600.0)
+    ):
+        if capacity <= 0:
+            raise ValueError("Capacity must be greater than 0.")
+
+        self.capacity = capacity
+        self.max_age = max_age
+
+        self._times = array.array('d', [0.0]) * capacity
+        self._columns = [array.array('d', [0.0]) * capacity for _ in FIELDS]
+
+        # Samples are numbered sequentially as they're appended. A sample
+        # lives at index seq % capacity, and the samples from _first up
+        # to (but not including) _next are the ones currently stored.
+        self._first = 0
+        self._next = 0
+
+        self._windows: dict[float, _Window] = {math.inf: _Window(self, math.inf)}
+        for span in windows:
+            self._windows[float(span)] = _Window(self, float(span))
+
+    def __repr__(self) -> str:
+        return f"<StatisticsStore len: {len(self)}, capacity: {self.capacity}>"
+
+    def __len__(self) -> int:
+        return self._next - self._first
+
+    def __iter__(self) -> t.Iterator[dict[str, float]]:
+        for seq in range(self._first, self._next):
+            yield self._row(seq)
+
+    def _value(self, column: array.array, seq: int) -> float:
+        return column[seq % self.capacity]
+
+    def _row(self, seq: int) -> dict[str, float]:
+        row = {'time': self._value(self._times, seq)}
+        for name, column in zip(FIELDS, self._columns):
+            row[name] = self._value(column, seq)
+        return row
+
+    def _index(self, field: str) -> int:
+        try:
+            return FIELDS.index(field)
+        except ValueError:
+            raise ValueError(f"Unknown statistic `{field}`. Must be one of {', '.join(FIELDS)}.")
+
+    def _expire(self, now: float, making_room: bool = False) -> None:
+        if making_room and len(self) == self.capacity:
+            self._first += 1
+
+        if self.max_age is not None:
+            cutoff = now - self.max_age
+            while len(self) > 0 and self._value(self._times, self._first) < cutoff:
+                self._first += 1
+
+        # Windows must evict before the slot is overwritten, since they
+        # read the old values back out to update their sums.
+        for window in self._windows.values():
+            window.evict(self._first, now)
+
+    def append(self, stats: NodeStats, timestamp: float | None = None) -> None:
+        """
+        Record a set of node statistics.
+
+        Arguments
+        ---------
+        stats: NodeStats
+            The statistics to record.
+        timestamp: float | None
+            The time the statistics were recieved. Defaults to now.
+        """
+        now = time.time() if timestamp is None else timestamp
+        self._expire(now, making_room=True)
+
+        seq = self._next
+        index = seq % self.capacity
+        self._times[index] = now
+        for column, value in zip(self._columns, _extract(stats)):
+            column[index] = value
+        self._next += 1
+
+        for window in self._windows.values():
+            window.push(seq)
+
+    def clear(self) -> None:
+        self._first = self._next
+        for window in self._windows.values():
+            window.evict(self._first, time.time())
+
+    def last(self, field: str) -> float | None:
+        """
+        Get the most recent value of a statistic, if any.
+        """
+        index = self._index(field)
+        if len(self) == 0:
+            return None
+        return self._value(self._columns[index], self._next - 1)
+
+    def column(self, field: str, window: float | None = None) -> list[float]:
+        """
+        Get the stored values of a statistic, oldest first.
+        """
+        index = self._index(field)
+        start = self._first
+
+        if window is not None:
+            cutoff = time.time() - window
+            while start < self._next and self._value(self._times, start) < cutoff:
+                start += 1
+        return [self._value(self._columns[index], seq) for seq in range(start, self._next)]
+
+    def aggregate(self, field: str, window: float | None = None) -> Aggregate | None:
+        """
+        Get aggregate values for a statistic.
+
+        Arguments
+        ---------
+        field: str
+            The statistic to aggregate. Must be one of FIELDS.
+        window: float | None
+            The number of seconds back to aggregate over. If this is one
+            of the windows the store was created with, the aggregates are
+            maintained incrementally. Otherwise, they're computed on the
+            spot. None aggregates over the entire store.
+
+        Returns
+        -------
+        Aggregate | None
+            The aggregates, or None if there are no samples in the window.
+        """
+        index = self._index(field)
+        self._expire(time.time())
+
+        span = math.inf if window is None else float(window)
+        rolling = self._windows.get(span, None)
+        if rolling is not None:
+            return rolling.aggregate(index)
+
+        values = self.column(field, window=window)
+        if not values:
+            return None
+        return Aggregate(
+            count=len(values),
+            mean=sum(values) / len(values),
+            min=min(values),
+            max=max(values),
+            p95=_percentile(values, 0.95)
+        )
@@ -0,0 +1,306 @@
+from __future__ import annotations
+import contextlib
+import contextvars
+from dataclasses import dataclass
+import time
+import typing as t
+
+
+_current_span: contextvars.ContextVar['Span | None'] = contextvars.ContextVar("koe_current_span", default=None)
+
+
+def current_span() -> 'Span | None':
+    """
+    The span which is currently active in this task, if any.
+    """
+    return _current_span.get()
+
+
+@contextlib.contextmanager
+def use_span(span: 'Span') -> t.Iterator['Span']:
+    """
+    Make a span current for the duration of a with block, without ending it.
+    """
+    token = _current_span.set(span)
+    try:
+        yield span
+    finally:
+        _current_span.reset(token)
+
+
+class Span:
+    """
+    One timed operation. This base class records nothing.
+
+    The methods mirror OpenTelemetry's Span, so a tracer can hand back
+    its own spans and Koe's calls pass straight through to them.
+    """
+    __slots__ = ()
+
+    def set_attribute(self, key: str, value: t.Any) -> None:
+        pass
+
+    def set_attributes(self, attributes: dict[str, t.Any]) -> None:
+        for key, value in attributes.items():
+            self.set_attribute(key, value)
+
+    def record_exception(self, exception: BaseException) -> None:
+        pass
+
+    def set_error(self, description: str | None = None) -> None:
+        pass
+
+    def end(self) -> None:
+        pass
+
+
+_NULL_SPAN = Span()
+
+
+class _Scope:
+    """
+    Makes a span current for the duration of a with block, then ends it.
+    """
+    __slots__ = ("span", "_token")
+
+    def __init__(self, span: Span):
+        self.span = span
+        self._token: contextvars.Token | None = None
+
+    def __enter__(self) -> Span:
+        self._token = _current_span.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc is not None:
+            self.span.record_exception(exc)
+            self.span.set_error(repr(exc))
+        self.span.end()
+        if self._token is not None:
+            _current_span.reset(self._token)
+
+
+class _TracedAcquire:
+    __slots__ = ("tracer", "lock", "name")
+
+    def __init__(self, tracer: 'Tracer', lock: t.Any, name: str):
+        self.tracer = tracer
+        self.lock = lock
+        self.name = name
+
+    async def __aenter__(self) -> None:
+        with self.tracer.span(self.name):
+            await self.lock.acquire()
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self.lock.release()
+
+
+class _NullScope:
+    __slots__ = ()
+
+    def __enter__(self) -> Span:
+        return _NULL_SPAN
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+
+_NULL_SCOPE = _NullScope()
+
+
+class Tracer:
+    """
+    Starts spans around Koe's work. This base class is the no-op default.
+
+    Ex:
+    ```
+    with koe.tracer.span("my_bot.play", query=query):
+      result = await koe.load_tracks(query)
+      # load_tracks, and the REST request it makes, are children of my_bot.play
+    ```
+
+    Subclasses override start_span(), and set `enabled`. Spans started with
+    span() become current for the duration of the with block, so anything
+    traced inside it, including in tasks created inside it, is a child of
+    it. This follows contextvars, the same way OpenTelemetry does.
+    """
+    enabled: bool = False
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} enabled: {self.enabled}>"
+
+    def start_span(self, name: str, attributes: dict[str, t.Any] | None = None, parent: Span | None = None) -> Span:
+        """
+        Start a span without making it current. It has to be ended by the
+        caller.
+        """
+        return _NULL_SPAN
+
+    def span(self, name: str, **attributes: t.Any) -> t.ContextManager[Span]:
+        """
+        Start a span as a child of the current one, and make it current
+        until the with block exits.
+        """
+        if self.enabled is False:
+            return _NULL_SCOPE
+        return _Scope(self.start_span(name, attributes or None, parent=_current_span.get()))
+
+    def acquire(self, lock: t.Any, name: str = "koe.lock") -> t.AsyncContextManager:
+        """
+        Use in place of `async with lock`, to trace the time spent waiting
+        for the lock. When tracing is off, this is just the lock.
+        """
+        if self.enabled is False:
+            return lock
+        return _TracedAcquire(self, lock, name)
+
+
+class OpenTelemetryTracer(Tracer):
+    """
+    Sends Koe's spans to an OpenTelemetry tracer.
+
+    Ex:
+    ```
+    from opentelemetry import trace
+    koe = Koe(bot, tracer=OpenTelemetryTracer(trace.get_tracer("koe")))
+    ```
+
+    This needs the opentelemetry-api package, which Koe doesn't depend on.
+    """
+    enabled = True
+
+    def __init__(self, tracer: t.Any):
+        try:
+            from opentelemetry import trace
+        except ImportError as e:
+            raise ImportError("OpenTelemetryTracer requires the opentelemetry-api package.") from e
+
+        self._trace = trace
+        self.tracer = tracer
+
+    def start_span(self, name: str, attributes: dict[str, t.Any] | None = None, parent: Span | None = None) -> Span:
+        context = None
+        if isinstance(parent, _OpenTelemetrySpan):
+            context = self._trace.set_span_in_context(parent.span)
+        return _OpenTelemetrySpan(self, self.tracer.start_span(name, context=context, attributes=attributes))
+
+
+class _OpenTelemetrySpan(Span):
+    __slots__ = ("tracer", "span")
+
+    def __init__(self, tracer: OpenTelemetryTracer, span: t.Any):
+        self.tracer = tracer
+        self.span = span
+
+    def set_attribute(self, key: str, value: t.Any) -> None:
+        self.span.set_attribute(key, value)
+
+    def record_exception(self, exception: BaseException) -> None:
+        self.span.record_exception(exception)
+
+    def set_error(self, description: str | None = None) -> None:
+        trace = self.tracer._trace
+        self.span.set_status(trace.Status(trace.StatusCode.ERROR, description))
+
+    def end(self) -> None:
+        self.span.end()
+
+
+@dataclass(slots=True)
+class PendingStart:
+    """
+    A track sent to a guild's player, which hasn't started yet.
+
+    Attributes
+    ----------
+    span: Span
+        The span covering everything up to the TrackStartEvent.
+    started_at: float
+        When it began, from time.perf_counter().
+    """
+    span: Span
+    started_at: float
+
+
+class StartTracker:
+    """
+    Matches the work leading up to playback in a guild to the
+    TrackStartEvent it eventually produces, to measure time to first audio.
+
+    A pending start is opened by Koe.trace_play(), or automatically when a
+    session replaces its track, and closed from the websocket as soon as
+    the TrackStartEvent frame for that guild arrives. Only one can be
+    pending per guild. Opening another ends the previous one, marked as
+    superseded.
+    """
+    def __init__(self, tracer: Tracer, on_started: t.Callable[[float], None] | None = None):
+        self.tracer = tracer
+        self.on_started = on_started
+
+        self._pending: dict[int, PendingStart] = {}
+
+    def __repr__(self) -> str:
+        return f"<StartTracker pending: {len(self._pending)}>"
+
+    def __contains__(self, guild_id: int) -> bool:
+        return int(guild_id) in self._pending
+
+    @property
+    def active(self) -> bool:
+        """
+        Whether anything is listening. If not, starts aren't tracked.
+        """
+        return self.tracer.enabled or self.on_started is not None
+
+    def open(self, guild_id: int, name: str = "koe.play", parent: Span | None = None, **attributes: t.Any) -> PendingStart:
+        guild_id = int(guild_id)
+        self.close(guild_id, outcome="superseded")
+
+        attributes['guild_id'] = guild_id
+        pending = self._pending[guild_id] = PendingStart(
+            span=self.tracer.start_span(name, attributes, parent=parent if parent is not None else _current_span.get()),
+            started_at=time.perf_counter()
+        )
+        return pending
+
+    def close(self, guild_id: int, outcome: str = "started") -> float | None:
+        """
+        End a guild's pending start, if there is one.
+
+        Returns
+        -------
+        float | None
+            Seconds since it was opened, or None if nothing was pending.
+        """
+        pending = self._pending.pop(int(guild_id), None)
+        if pending is None:
+            return None
+
+        elapsed = time.perf_counter() - pending.started_at
+        pending.span.set_attribute("koe.outcome", outcome)
+        if outcome == "failed":
+            pending.span.set_error("The track failed to start.")
+        pending.span.end()
+
+        if outcome == "started" and self.on_started is not None:
+            self.on_started(elapsed)
+        return elapsed
+
+    def on_event(self, data: dict[str, t.Any]) -> None:
+        """
+        Close a pending start from a track event frame, as soon as it's
+        recieved on the websocket.
+        """
+        if not self._pending:
+            return
+
+        kind = data.get('type', None)
+        if kind == "TrackStartEvent":
+            self.close(data['guild_id'], outcome="started")
+        elif kind == "TrackExceptionEvent" or (kind == "TrackEndEvent" and data.get('reason', None) == "loadFailed"):
+            self.close(data['guild_id'], outcome="failed")
+
+    def clear(self) -> None:
+        for guild_id in list(self._pending):
+            self.close(guild_id, outcome="abandoned")
@@ -1,6 +1,8 @@
 import asyncio
 import hikari
 import orjson as json
+import random
+import time
 import typing
 import websockets
 
@@ -10,11 +12,13 @@ from ..events.player import PlayerUpdateEvent
 from ..events.track import TrackStartEvent, TrackEndEvent
 from ..const import __version__
 from ..utils import lavalink_dictovert
+from .decoders import decode_player_update, decode_stats
 from ..log import logger
 
 
 if typing.TYPE_CHECKING:
     from ..client import Koe
+    from .node import Node
 
 
 class WebSocket(Connection):
@@ -25,7 +29,13 @@ class WebSocket(Connection):
         protocol: str="ws", 
         url: str="localhost", 
         port: int=80, 
-        password: str=""
+        password: str="",
+        fast_path: bool=True,
+        node: 'Node | None' = None,
+        reconnect: bool=True,
+        max_retries: int | None=None,
+        backoff_base: float=1.0,
+        backoff_cap: float=60.0
     ):
         self.user_id = user_id
         self.client_identifier = client_identifier
@@ -33,43 +43,159 @@ class WebSocket(Connection):
         self.url = url
         self.port = port
         self.password = password
+        self.fast_path = fast_path
+        self.node = node
+        self.reconnect = reconnect
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
         
+        self.session_id: str | None = None
         self._connected: bool = False
         self._task: asyncio.Task | None = None
     
+    @property
+    def connected(self) -> bool:
+        return self._connected
+    
     @property
     def headers(self) -> dict[str, str]:
-        return {
+        headers = {
             'Authorization': self.password,
             'User-Id': str(self.user_id),
             'Client-Name': self.client_identifier
         }
         
+        # Sending the previous session ID asks Lavalink to resume it, which
+        # keeps its players playing through the reconnect.
+        if self.session_id is not None:
+            headers['Session-Id'] = self.session_id
+        return headers
+    
+    def backoff(self, attempt: int) -> float:
+        """
+        Exponential backoff with full jitter.
+        """
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * (2 ** attempt)))
+    
+    async def _supervise(self, koe: 'Koe') -> None:
+        attempt = 0
+        
+        while True:
+            try:
+                await self._loop(koe)
+                logger.warning(f"Websocket connection to {self.route} closed.")
+            except asyncio.CancelledError:
+                raise
+            except (OSError, asyncio.TimeoutError, websockets.exceptions.WebSocketException) as e:
+                logger.warning(f"Websocket connection to {self.route} failed: {e!r}")
+            except Exception as e:
+                # A bug handling one message mustn't take the node down for
+                # good, so reconnect as if the connection had dropped.
+                logger.opt(exception=e).error(f"Websocket connection to {self.route} crashed: {e!r}")
+            finally:
+                if self._connected is True:
+                    # We got a connection this time around, so start over.
+                    attempt = 0
+                self._connected = False
+            
+            if self.reconnect is False:
+                break
+            
+            if self.max_retries is not None and attempt >= self.max_retries:
+                logger.error(f"Giving up on websocket connection to {self.route} after {attempt} retries.")
+                break
+            
+            delay = self.backoff(attempt)
+            attempt += 1
+            logger.info(f"Reconnecting to {self.route} in {delay:.2f}s (attempt {attempt}).")
+            await asyncio.sleep(delay)
+        
+        if self.node is not None:
+            await self.node.on_lost(koe)
+        
     async def _loop(self, koe: 'Koe') -> None:
         async with websockets.connect(f"{self.route}/v4/websocket", additional_headers=self.headers) as ws:
             self._connected = True
             
+            metrics = koe.metrics
+            name = self.node.name if self.node is not None else "default"
+            
             async for message in ws:
-                data = json.loads(message)
+                if metrics.enabled:
+                    start = time.perf_counter()
+                    data = json.loads(message)
+                    op = data['op']
+                    labels = (name, op)
+                    metrics.ws_decode.observe(time.perf_counter() - start, labels)
+                    metrics.ws_messages.inc(labels)
+                else:
+                    data = json.loads(message)
+                    op = data['op']
+                
+                if op == 'playerUpdate' or op == 'stats':
+                    # These arrive constantly, so one bad frame is logged
+                    # and skipped rather than dropping the connection.
+                    try:
+                        if op == 'playerUpdate':
+                            self.handle_player_update(koe, data)
+                        else:
+                            self.handle_stats(koe, data)
+                    except Exception as e:
+                        logger.opt(exception=e).error(f"Failed to handle {op} from {self.route}: {e!r}")
+                    continue
+                
                 data = lavalink_dictovert(data)
                 
-                if data['op'] == "ready":
+                if op == "ready":
                     event = LavalinkReadyEvent(koe, data)
+                    self.session_id = event.session_id
+                    if self.node is not None:
+                        await self.node.on_ready(koe, event.session_id, event.resumed)
                     
-                elif data['op'] == "stats":
-                    event = StatisticsEvent(koe, data)
-                
-                elif data['op'] == 'playerUpdate':
-                    event = PlayerUpdateEvent(koe, data)
-                    
-                elif data['op'] == 'event':
-                    event = self.handle_ws_event(koe, data)
+                elif op == 'event':
+                    if metrics.enabled:
+                        metrics.track_event(data)
+                    # Closed here rather than by a listener, so time to first
+                    # audio doesn't include hikari's dispatch.
+                    koe.starts.on_event(data)
+                    try:
+                        event = self.handle_ws_event(koe, data)
+                    except ValueError as e:
+                        logger.warning(str(e))
+                        continue
                 else:
-                    print(f"Unknown event type {data}")
+                    logger.warning(f"Unknown op {op} from {self.route}: {data}")
                     continue
 
                 koe.bot.event_manager.dispatch(event)
     
+    def has_listeners(self, koe: 'Koe', event_type: type[hikari.Event]) -> bool:
+        """
+        Whether or not building and dispatching an event of this type is
+        worth doing. With the fast path disabled, this is always true.
+        """
+        if self.fast_path is False:
+            return True
+        return len(koe.bot.event_manager.get_listeners(event_type)) > 0
+    
+    def handle_player_update(self, koe: 'Koe', data: dict[str, typing.Any]) -> None:
+        guild_id, state = decode_player_update(data)
+        koe.on_player_state(guild_id, state)
+        
+        if self.has_listeners(koe, PlayerUpdateEvent):
+            event = PlayerUpdateEvent(koe, lavalink_dictovert(data), state=state)
+            koe.bot.event_manager.dispatch(event)
+    
+    def handle_stats(self, koe: 'Koe', data: dict[str, typing.Any]) -> None:
+        stats = decode_stats(data)
+        if self.node is not None:
+            koe.on_statistics(self.node, stats)
+        
+        if self.has_listeners(koe, StatisticsEvent):
+            event = StatisticsEvent(koe, lavalink_dictovert(data), stats=stats)
+            koe.bot.event_manager.dispatch(event)
+    
     def handle_ws_event(self, koe: 'Koe', data: dict[str, typing.Any]) -> WebSocketRecvEvent:
         if data['type'] == 'WebSocketClosedEvent':
             event = WebSocketClosedEvent(koe, data)
@@ -82,12 +208,12 @@ class WebSocket(Connection):
         return event
     
     def start(self, koe: 'Koe') -> None:
-        if self._connected is True:
-            raise RuntimeError("Websocket loop is already connected.")
+        if self._task is not None and not self._task.done():
+            raise RuntimeError("Websocket loop is already running.")
         
         loop = asyncio.get_event_loop()
         logger.info(f"Starting websocket connection to {self.route}/v4/websocket")
-        self._task = loop.create_task(self._loop(koe))
+        self._task = loop.create_task(self._supervise(koe))
     
     def stop(self) -> None:
         if self._task is not None:
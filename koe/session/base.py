@@ -5,19 +5,23 @@ import hikari
 import time
 import typing
 
-from ..utils import AsyncConditionalLock, ensure_one_of
+from ..utils import ReentrantLock, ensure_one_of
 from ..impl.constructs.track import Track
-from ..impl.constructs.player import PlayerState
+from ..impl.constructs.player import Player, PlayerSnapshot, PlayerState
 from ..impl.constructs.queue import Queue
-from ..impl.constructs.history import HistoryRecord
-from ..impl.constructs.enums import RepeatMode, SessionMode
-from ..events.player import PlayerUpdateEvent
+from ..impl.constructs.history import HistoryRecord, HistoryStore, HistoryView
+from ..impl.constructs.enums import HistoryAction, RepeatMode, SessionMode
+from ..impl.constructs.snapshot import SessionSnapshot
 from ..events.track import TrackStartEvent, TrackEndEvent
 from ..errors import UninitializedSessionError, NoSessionError, ExistingSessionError
+from .coalesce import PlayerWriteCoalescer
+from .prefetch import TrackPrefetcher
+from ..log import logger
 
 
 if typing.TYPE_CHECKING:
     from ..client import Koe
+    from ..impl.node import Node
 
 
 def require_connected(func: Callable) -> Callable:
@@ -29,21 +33,31 @@ def require_connected(func: Callable) -> Callable:
 
 
 class Session:
-    def __init__(self, koe: 'Koe'):
+    def __init__(self, koe: 'Koe', history_size: int=1000):
         self.koe = koe
         
         self._guild_id: hikari.Snowflake | None = None
         self._voice_id: hikari.Snowflake | None = None
         self._channel_id: hikari.Snowflake | None = None
         self._id: str | None = None
-        self._history: list[HistoryRecord] = []
+        self._voice_token: str | None = None
+        self._voice_endpoint: str | None = None
+        self._history = HistoryStore(history_size)
         self._repeat_mode: RepeatMode = RepeatMode.NONE
         self.session_mode: SessionMode = SessionMode.PERSISTENT
         self.transient_dc_delay: float = 0.5
         
-        self.lock = AsyncConditionalLock()
+        self.lock = ReentrantLock()
         self.queue = Queue()
         
+        # Opt-in. When set, volume, pause, seek and filter writes made within
+        # the window are merged into one PATCH. See enable_coalescing().
+        self.coalescer: PlayerWriteCoalescer | None = None
+        
+        # Opt-in. When set, upcoming tracks are checked before the current
+        # one ends. See enable_prefetch().
+        self.prefetcher: TrackPrefetcher | None = None
+        
         self._connected: bool = False
         self._volume: int = 100
         self._player_state: PlayerState | None = None
@@ -76,28 +90,47 @@ class Session:
         
     async def set_channel_id(self, channel_id: hikari.Snowflake) -> None:
         async with self.lock:
-            self._channel_id = channel_id
+            await self.koe.move_session(self, channel_id=channel_id)
     
     @property
     def exists(self) -> bool:
         return self._connected
     
-    async def add_history(self, actor_id: int | None, action: str, unsafe: bool=False) -> None:
-        async with self.lock(unsafe=unsafe):
-            self._history.append(
-                HistoryRecord(time.time(), actor_id, action)
-            )
+    async def add_history(self, actor_id: int | None, action: HistoryAction | str, arg: typing.Any=None) -> None:
+        """
+        Record an action. Free-form strings are recorded as
+        HistoryAction.OTHER, with the string as the argument.
+        """
+        async with self.lock:
+            if isinstance(action, str):
+                action, arg = HistoryAction.OTHER, action
+            self._history.append(action, actor_id, arg)
         
-    async def get_history(self, unsafe: bool=False) -> list[HistoryRecord]:
-        async with self.lock(unsafe=unsafe):
-            return self._history
+    async def get_history(self) -> HistoryView:
+        async with self.lock:
+            return self._history.view()
+    
+    async def query_history(
+        self,
+        actor_id: int | None = None,
+        action: HistoryAction | None = None,
+        since: float | None = None,
+        until: float | None = None,
+        limit: int | None = None
+    ) -> list[HistoryRecord]:
+        """
+        Find history records by actor, action and/or time range. See
+        HistoryStore.query().
+        """
+        async with self.lock:
+            return self._history.query(actor_id=actor_id, code=action, since=since, until=until, limit=limit)
     
-    async def set_repeat_mode(self, mode: RepeatMode, user_id: hikari.Snowflake | None=None, unsafe: bool=False) -> None:
-        async with self.lock(unsafe=unsafe):
+    async def set_repeat_mode(self, mode: RepeatMode, user_id: hikari.Snowflake | None=None) -> None:
+        async with self.lock:
             self._repeat_mode = mode
     
-    async def get_repeat_mode(self, unsafe: bool=False) -> RepeatMode:
-        async with self.lock(unsafe=unsafe):
+    async def get_repeat_mode(self) -> RepeatMode:
+        async with self.lock:
             return self._repeat_mode 
 
     async def on_voice_state_update(self, event: hikari.VoiceStateUpdateEvent) -> None:
@@ -105,20 +138,26 @@ class Session:
         if event.state.user_id != self.koe.bot_id:
             return
         
-        # A disconnect happened.
+        # A disconnect happened, such as being kicked from the channel.
+        # Discord has already left, so there's no voice state to update.
         if event.state.channel_id is None:
-            try:
-                await self.koe.rm_session(self.guild_id)
-                return
-            except NoSessionError:
-                return
+            async with self.lock:
+                if self._connected is False:
+                    return
+                await self._teardown()
+                try:
+                    await self.koe.rm_session(self.guild_id)
+                except NoSessionError:
+                    pass
+                
+                await self.add_history(None, HistoryAction.DISCONNECT)
+            return
 
         if event.guild_id == self.guild_id:
             async with self.lock:                
                 # If not, the channel must have updated.
-                self._guild_id = event.guild_id
                 self._id = event.state.session_id
-                self._voice_id = event.state.channel_id
+                await self.koe.move_session(self, voice_id=event.state.channel_id)
     
     async def on_voice_server_update(self, event: hikari.VoiceServerUpdateEvent) -> None:
         async with self.lock:
@@ -126,20 +165,90 @@ class Session:
                 return
             
             assert event.endpoint is not None
+            
+            # Kept so that the player can be rebuilt on another node.
+            self._voice_token = event.token
+            self._voice_endpoint = event.endpoint.replace("wss://", "")
         
             player = await self.koe.update_player(
                 guild_id=event.guild_id,
                 data={
                     'voice': {
-                        'token': event.token,
+                        'token': self._voice_token,
                         'sessionId': self._id,
-                        'endpoint': event.endpoint.replace("wss://", ""),
+                        'endpoint': self._voice_endpoint,
                         'channelId': str(self.voice_id)
                     }
                 }
             )
             
-            self._state = player.state
+            self._player_state = player.state
+            self._current_track_pos = player.state.position
+    
+    def snapshot_player(self) -> PlayerSnapshot:
+        """
+        Snapshot the state of this session's player.
+        
+        The position is extrapolated from the last player update, so
+        that playback resumes close to where it actually is.
+        """
+        if self._voice_token is None or self._voice_endpoint is None or self._id is None:
+            raise UninitializedSessionError
+        
+        return PlayerSnapshot(
+            guild_id=int(self.guild_id),
+            token=self._voice_token,
+            endpoint=self._voice_endpoint,
+            session_id=self._id,
+            channel_id=int(self.voice_id),
+            encoded=self._current_track.encoded if self._is_playing and self._current_track is not None else None,
+            position=self._estimate_position(),
+            volume=self._volume,
+            paused=bool(self._paused)
+        )
+    
+    def _estimate_position(self) -> int:
+        position = self._current_track_pos or 0
+        if self._is_playing and not self._paused and self._player_state is not None:
+            position += max(int(time.time() * 1000) - self._player_state.time, 0)
+        return position
+    
+    def snapshot(self, history_tail: int=50) -> SessionSnapshot:
+        """
+        Snapshot this session, so it can be restored after a restart.
+        
+        This doesn't take the lock or await anything, so every session can
+        be snapshotted in one pass without yielding to the event loop.
+        
+        Arguments
+        ---------
+        history_tail: int
+            How many of the most recent history records to keep.
+        """
+        return SessionSnapshot(
+            guild_id=int(self.guild_id),
+            voice_id=int(self.voice_id),
+            channel_id=int(self._channel_id) if self._channel_id is not None else None,
+            mode=self.session_mode.value,
+            repeat_mode=self._repeat_mode.value,
+            volume=self._volume,
+            paused=bool(self._paused),
+            queue=[track.encoded for track in self.queue._queue],
+            queue_pos=self.queue._pos,
+            position=self._estimate_position() if self._is_playing else None,
+            history=[
+                (record.time, record.actor_id, int(record.code), record.arg)
+                for record in self._history.tail(history_tail)
+            ]
+        )
+    
+    async def migrate(self, node: 'Node') -> None:
+        """
+        Move this session's player to another node with a single PATCH.
+        """
+        async with self.lock:
+            snapshot = self.snapshot_player()
+            await self.koe.update_player(self.guild_id, data=snapshot.to_payload(), node=node)
     
     async def on_track_start(self, event: TrackStartEvent) -> None:
         async with self.lock:
@@ -161,7 +270,7 @@ class Session:
                         if next_track is None:
                             if self.session_mode is SessionMode.TRANSIENT:
                                 await asyncio.sleep(self.transient_dc_delay)
-                                await self.disconnect(unsafe=True)
+                                await self.disconnect()
                                 await self.koe.delete_player(self.guild_id)
                             return
                         
@@ -172,40 +281,36 @@ class Session:
 
                 assert next_track is not None
                 self._current_track = next_track
-                await self.play(next_track, replace=False, unsafe=True)
+                await self.play(next_track, replace=False)
 
-    async def on_player_update(self, event: PlayerUpdateEvent) -> None:
-        if event.guild_id != self.guild_id:
-            return
+    def on_player_state(self, state: PlayerState) -> None:
+        # Called synchronously from the websocket for every playerUpdate,
+        # so there's no lock here. These are plain attribute assignments.
+        self._player_state = state
+        self._current_track_pos = state.position
         
-        async with self.lock:
-            self._current_track_pos = event.state.position
+        if self.prefetcher is not None:
+            self.prefetcher.on_player_state(state)
+    
+    def _peek_next_index(self) -> int | None:
+        # The queue position on_track_end() will play next, if any.
+        pos, length = self.queue._pos, len(self.queue)
+        if length == 0:
+            return None
+        if self._repeat_mode is RepeatMode.ONE:
+            return pos
+        if pos + 1 < length:
+            return pos + 1
+        return 0 if self._repeat_mode is RepeatMode.ALL else None
             
-    def subscribe(self) -> None:
-        self.bot.subscribe(hikari.VoiceStateUpdateEvent, self.on_voice_state_update)
-        self.bot.subscribe(hikari.VoiceServerUpdateEvent, self.on_voice_server_update)
-        self.bot.subscribe(PlayerUpdateEvent, self.on_player_update)
-        self.bot.subscribe(TrackStartEvent, self.on_track_start)
-        self.bot.subscribe(TrackEndEvent, self.on_track_end)
-        self.bot.subscribe(PlayerUpdateEvent, self.on_player_update)
-    
-    def unsubscribe(self) -> None:
-        self.bot.unsubscribe(hikari.VoiceStateUpdateEvent, self.on_voice_state_update)
-        self.bot.unsubscribe(hikari.VoiceServerUpdateEvent, self.on_voice_server_update)
-        self.bot.unsubscribe(PlayerUpdateEvent, self.on_player_update)
-        self.bot.unsubscribe(TrackStartEvent, self.on_track_start)
-        self.bot.unsubscribe(TrackEndEvent, self.on_track_end)
-        self.bot.unsubscribe(PlayerUpdateEvent, self.on_player_update)
-        
     async def connect(
         self,
         guild_id: hikari.Snowflake,
         voice_id: hikari.Snowflake,
         channel_id: hikari.Snowflake | None = None,
-        user_id: hikari.Snowflake | None = None,
-        unsafe: bool=False
+        user_id: hikari.Snowflake | None = None
     ) -> None:
-        async with self.lock(unsafe=unsafe):
+        async with self.lock:
             try:
                 self._connected = True
                 self._guild_id = guild_id
@@ -214,19 +319,92 @@ class Session:
                 await self.koe.add_session(self)
                 await self.koe.update_player(guild_id)
                 await self.bot.update_voice_state(guild_id, voice_id)
-                self.subscribe()
-                await self.add_history(user_id, "connect", unsafe=True)
+                await self.add_history(user_id, HistoryAction.CONNECT)
             except ExistingSessionError:
                 self._connected = False
                 self._guild_id = None
                 self._voice_id = None
                 self._channel_id = None
                 raise
+            except Exception:
+                # The session was added, but never became usable. Its player
+                # may have been created, and its guild placed on a node.
+                self._connected = False
+                try:
+                    await self.koe.rm_session(guild_id)
+                except NoSessionError:
+                    pass
+                try:
+                    await self.koe.delete_player(guild_id)
+                except Exception as e:
+                    logger.warning(f"Failed to delete player for GID {guild_id} after a failed connect: {e!r}")
+                finally:
+                    self.koe.release_node(guild_id)
+                self._guild_id = None
+                self._voice_id = None
+                self._channel_id = None
+                raise
     
-    async def disconnect(self, user_id: hikari.Snowflake | None=None, unsafe: bool=False) -> None:
-        async with self.lock(unsafe=unsafe):
-            self._connected = False
-            await self.koe.delete_player(self.guild_id)
+    async def restore(self, snapshot: SessionSnapshot, tracks: list[Track]) -> None:
+        """
+        Restore the state in a snapshot, and resume playing its current
+        track where it left off.
+        
+        Arguments
+        ---------
+        snapshot: SessionSnapshot
+            The snapshot to restore.
+        tracks: list[Track]
+            The snapshot's queue, decoded.
+        """
+        async with self.lock:
+            self.session_mode = SessionMode(snapshot.mode)
+            self._repeat_mode = RepeatMode(snapshot.repeat_mode)
+            self._volume = snapshot.volume
+            self._paused = snapshot.paused
+            self._history.clear()
+            for record in snapshot.history or []:
+                if len(record) == 3:
+                    # Older snapshots stored the rendered action.
+                    timestamp, actor_id, arg = record
+                    code = HistoryAction.OTHER
+                else:
+                    timestamp, actor_id, code, arg = record
+                self._history.append(HistoryAction(code), actor_id, arg, timestamp=timestamp)
+            await self.queue.replace(tracks, snapshot.queue_pos)
+            
+            data: dict[str, typing.Any] = {}
+            if snapshot.volume != 100:
+                data['volume'] = snapshot.volume
+            if snapshot.paused:
+                data['paused'] = True
+            
+            if tracks and snapshot.position is not None:
+                track = tracks[snapshot.queue_pos]
+                self._current_track = track
+                self._current_track_pos = snapshot.position
+                data['track'] = {'encoded': track.encoded}
+                data['position'] = snapshot.position
+            
+            if data:
+                await self.koe.update_player(self.guild_id, data=data)
+    
+    async def _teardown(self) -> None:
+        """
+        Stop everything running for this session, and delete its player.
+        Must be called with the lock held.
+        """
+        self._connected = False
+        if self.prefetcher is not None:
+            await self.prefetcher.close()
+        if self.coalescer is not None:
+            await self.coalescer.cancel()
+        self.koe.starts.close(self.guild_id, outcome="abandoned")
+        await self.koe.delete_player(self.guild_id)
+    
+    async def disconnect(self, user_id: hikari.Snowflake | None=None) -> None:
+        async with self.lock:
+            await self._teardown()
             await self.bot.update_voice_state(self.guild_id, None)
     
             try:
@@ -234,37 +412,94 @@ class Session:
             except NoSessionError:
                 pass
             
-            self.unsubscribe()
-            await self.add_history(user_id, "disconnect", unsafe=True)
+            await self.add_history(user_id, HistoryAction.DISCONNECT)
+    
+    def enable_coalescing(self, window: float=0.05) -> None:
+        """
+        Merge volume, pause, seek and filter writes made within `window`
+        seconds of each other into a single PATCH.
+        """
+        self.coalescer = PlayerWriteCoalescer(self, window=window)
+    
+    def enable_prefetch(self, lookahead: int=3, threshold: int=15000, preplay: bool=False) -> None:
+        """
+        Check the next `lookahead` tracks once the current one has less
+        than `threshold` milliseconds left. See TrackPrefetcher.
+        """
+        self.prefetcher = TrackPrefetcher(self, lookahead=lookahead, threshold=threshold, preplay=preplay)
+    
+    async def disable_prefetch(self) -> None:
+        if self.prefetcher is not None:
+            await self.prefetcher.close()
+            self.prefetcher = None
+    
+    async def disable_coalescing(self) -> None:
+        if self.coalescer is not None:
+            await self.coalescer.flush()
+            self.coalescer = None
     
     @require_connected
-    async def _set_volume(self, level: int) -> None:
+    async def _write(self, data: dict) -> asyncio.Future[Player] | None:
+        """
+        Write player fields which don't involve the track.
+        
+        With coalescing enabled, the write is queued and a future for the
+        resulting Player is returned, which should be awaited once the lock
+        has been released. Otherwise the write happens right away.
+        """
+        if self.coalescer is not None:
+            return self.coalescer.submit(data)
+        
         await self.koe.update_player(
             self.guild_id,
             no_replace=True,
-            data={
-                'volume': level
-            }
+            data=data
         )
+        return None
+    
+    def _cancel_preplay(self) -> None:
+        # Anything that changes the track or its position invalidates a
+        # scheduled preplay. The next player update schedules a new one.
+        if self.prefetcher is not None:
+            self.prefetcher.cancel()
+    
+    async def _flush_writes(self) -> None:
+        # Pending writes must land before anything that changes the track,
+        # or a queued seek could apply to the next one.
+        if self.coalescer is not None:
+            await self.coalescer.flush()
+    
+    @require_connected
+    async def _set_volume(self, level: int) -> asyncio.Future[Player] | None:
+        pending = await self._write({'volume': level})
         self._volume = level
+        return pending
     
-    async def set_volume(self, level: int, user_id: hikari.Snowflake | None=None, unsafe: bool=False) -> None:
-        async with self.lock(unsafe=unsafe):
+    async def set_volume(self, level: int, user_id: hikari.Snowflake | None=None) -> None:
+        async with self.lock:
             self._volume = level
-            await self._set_volume(self._volume)
-            await self.add_history(user_id, f"set volume={level}", unsafe=True)
+            pending = await self._set_volume(self._volume)
+            await self.add_history(user_id, HistoryAction.SET_VOLUME, level)
+        
+        if pending is not None:
+            await pending
     
-    async def incr_volume(self, level: int, user_id: hikari.Snowflake | None=None, unsafe: bool=False) -> None:
-        async with self.lock(unsafe=unsafe):
+    async def incr_volume(self, level: int, user_id: hikari.Snowflake | None=None) -> None:
+        async with self.lock:
             if self._volume is None:
                 raise RuntimeError("Volume is null.")
             level = self._volume + level
-            await self._set_volume(level)
-            await self.add_history(user_id, f"incr volume={level}", unsafe=True)
+            pending = await self._set_volume(level)
+            await self.add_history(user_id, HistoryAction.INCR_VOLUME, level)
+        
+        if pending is not None:
+            await pending
     
     @require_connected
-    async def stop(self, user_id: hikari.Snowflake | None=None, unsafe: bool=False) -> None:
-        async with self.lock(unsafe=unsafe):
+    async def stop(self, user_id: hikari.Snowflake | None=None) -> None:
+        async with self.lock:
+            self._cancel_preplay()
+            await self._flush_writes()
             await self.koe.update_player(
                 self.guild_id,
                 no_replace=False,
@@ -274,90 +509,141 @@ class Session:
                     }
                 }
             )
-            await self.add_history(user_id, f"stop", unsafe=True)
+            await self.add_history(user_id, HistoryAction.STOP)
     
     @require_connected
-    async def skip(self, to: int | None=None, by: int | None=None, user_id: hikari.Snowflake | None=None, unsafe: bool=False) -> None:
+    async def skip(self, to: int | None=None, by: int | None=None, user_id: hikari.Snowflake | None=None) -> None:
         ensure_one_of(to=to, by=by)
-        async with self.lock(unsafe=unsafe):
+        async with self.lock:
             if to is not None:
                 track = await self.queue.advance_to(to)
-                await self.add_history(user_id, f"skip to={to}", unsafe=True)
+                await self.add_history(user_id, HistoryAction.SKIP_TO, to)
             else:
                 assert by is not None
                 track = await self.queue.advance_by(by)
-                await self.add_history(user_id, f"skip by={by}", unsafe=True)
+                await self.add_history(user_id, HistoryAction.SKIP_BY, by)
             
-            await self.play(track, replace=True, unsafe=True)
+            await self.play(track, replace=True)
     
     @require_connected
-    async def play(self, track: Track, replace: bool=True, unsafe: bool=False) -> None:
-        async with self.lock(unsafe=unsafe):
-            await self.koe.update_player(
-                self.guild_id,
-                no_replace=not replace,
-                data={
-                    'track': {
-                        'encoded': track.encoded
-                    }
-                }
-            )
+    async def play(self, track: Track, replace: bool=True) -> None:
+        async with self.lock:
+            if replace is True:
+                self._cancel_preplay()
+                
+                # Unless the caller is already tracing this with trace_play(),
+                # time to first audio is measured from here.
+                starts = self.koe.starts
+                if starts.active and self.guild_id not in starts:
+                    starts.open(self.guild_id)
+            
+            try:
+                await self._flush_writes()
+                with self.koe.tracer.span("koe.session.play", guild_id=int(self.guild_id)):
+                    await self.koe.update_player(
+                        self.guild_id,
+                        no_replace=not replace,
+                        data={
+                            'track': {
+                                'encoded': track.encoded
+                            }
+                        }
+                    )
+            except BaseException:
+                # No TrackStartEvent is coming to close it.
+                if replace is True:
+                    self.koe.starts.close(self.guild_id, outcome="failed")
+                raise
     
     @require_connected
-    async def seek(self, hours: int=0, minutes: int=0, seconds: int=0, millis: int=0, user_id: hikari.Snowflake | None=None, unsafe: bool=False) -> None:
-        async with self.lock(unsafe=unsafe):
+    async def seek(self, hours: int=0, minutes: int=0, seconds: int=0, millis: int=0, user_id: hikari.Snowflake | None=None) -> None:
+        async with self.lock:
             pos = (hours * 3600) * 1000
             pos += (minutes * 60) * 1000
             pos += seconds * 1000
             pos += millis
             
             assert self._current_track is not None
-            if millis > self._current_track.info.length:
+            if pos > self._current_track.info.length:
                 raise ValueError("The time entered is longer than the current track.")
-                        
-            await self.koe.update_player(
-                self.guild_id,
-                no_replace=True,
-                data={
-                    'position': millis
-                }
-            )
-            await self.add_history(user_id, f"seek pos={millis}", unsafe=True)
+            
+            self._cancel_preplay()
+            pending = await self._write({'position': pos})
+            await self.add_history(user_id, HistoryAction.SEEK, pos)
+        
+        if pending is not None:
+            await pending
     
     @require_connected
-    async def set_pause(self, state: bool, user_id: hikari.Snowflake | None=None, unsafe: bool=False) -> bool:
-        async with self.lock(unsafe=unsafe):
+    async def set_pause(self, state: bool, user_id: hikari.Snowflake | None=None) -> bool:
+        async with self.lock:
             if self._paused == state:
                 return False
             
-            await self.koe.update_player(
-                self.guild_id,
-                no_replace=True,
-                data={
-                    'paused': state
-                }
-            )
+            pending = await self._write({'paused': state})
             self._paused = state
-            await self.add_history(user_id, f"pause set={self._paused}", unsafe=True)
-            return True
+            await self.add_history(user_id, HistoryAction.PAUSE, self._paused)
+        
+        if pending is not None:
+            await pending
+        return True
     
     @require_connected
-    async def toggle_pause(self, user_id: hikari.Snowflake | None=None, unsafe: bool=False) -> None:
-        async with self.lock(unsafe=unsafe):
-            await self.set_pause(not self._paused, user_id=user_id, unsafe=True)
+    async def toggle_pause(self, user_id: hikari.Snowflake | None=None) -> None:
+        async with self.lock:
+            await self.set_pause(not self._paused, user_id=user_id)
     
     @require_connected
     async def enqueue(self, track: Track, user_id: hikari.Snowflake | None=None, begin_playback: bool=True):
-        async with self.lock:
-            await self.queue.append(track)
-            
-            if not self._is_playing and begin_playback is True:
-                next_track = await self.queue.advance()
+        tracer = self.koe.tracer
+        with tracer.span("koe.session.enqueue", guild_id=int(self.guild_id)):
+            async with tracer.acquire(self.lock, "koe.session.lock"):
+                with tracer.span("koe.queue.append"):
+                    await self.queue.append(track)
                 
-                if next_track is None:
-                    next_track = track
+                if not self._is_playing and begin_playback is True:
+                    next_track = await self.queue.advance()
                     
-                assert next_track is not None
-                await self.play(next_track, unsafe=True)
-            
-            await self.add_history(user_id, f"enqueue track={track.info.title}", unsafe=True)
\ No newline at end of file
+                    if next_track is None:
+                        next_track = track
+                        
+                    assert next_track is not None
+                    await self.play(next_track)
+                
+                await self.add_history(user_id, HistoryAction.ENQUEUE, track.encoded)
+    
+    @require_connected
+    async def enqueue_many(self, tracks: typing.Iterable[Track], user_id: hikari.Snowflake | None=None, begin_playback: bool=True) -> int:
+        """
+        Enqueue many tracks at once, such as a whole Playlist.
+        
+        The lock is taken once and the queue extended in a single step,
+        rather than once per track.
+        
+        Returns
+        -------
+        int
+            The number of tracks enqueued.
+        """
+        tracks = list(tracks)
+        if not tracks:
+            return 0
+        
+        tracer = self.koe.tracer
+        with tracer.span("koe.session.enqueue_many", guild_id=int(self.guild_id), count=len(tracks)):
+            async with tracer.acquire(self.lock, "koe.session.lock"):
+                was_empty = await self.queue.is_empty()
+                with tracer.span("koe.queue.extend"):
+                    await self.queue.extend(tracks)
+                
+                if not self._is_playing and begin_playback is True:
+                    # An empty queue starts from its first track, rather than
+                    # advancing past it.
+                    next_track = await self.queue.get_current() if was_empty else await self.queue.advance()
+                    
+                    if next_track is None:
+                        next_track = tracks[0]
+                    await self.play(next_track)
+                
+                await self.add_history(user_id, HistoryAction.ENQUEUE_MANY, len(tracks))
+        return len(tracks)
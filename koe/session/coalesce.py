@@ -0,0 +1,134 @@
+from __future__ import annotations
+import asyncio
+import typing
+
+from ..impl.constructs.player import Player
+from ..errors import NoSessionError
+
+
+if typing.TYPE_CHECKING:
+    from .base import Session
+
+
+class PlayerWriteCoalescer:
+    """
+    Merges rapid-fire player writes into a single PATCH.
+
+    Writes to the fields in COALESCED_FIELDS submitted within `window`
+    seconds of each other are merged, with later writes winning, and sent
+    as one PATCH. Every caller waiting on the batch gets the resulting
+    Player. Batches are always sent in the order they were created.
+    """
+    COALESCED_FIELDS: typing.ClassVar[frozenset[str]] = frozenset(["volume", "paused", "position", "filters"])
+
+    def __init__(self, session: 'Session', window: float = 0.05):
+        self.session = session
+        self.window = window
+
+        self._pending: dict[str, typing.Any] = {}
+        self._waiters: list[asyncio.Future[Player]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._send_lock = asyncio.Lock()
+        self._tasks: set[asyncio.Task] = set()
+
+    def __repr__(self) -> str:
+        return f"<PlayerWriteCoalescer pending: {len(self._waiters)}>"
+
+    @classmethod
+    def can_coalesce(cls, data: dict[str, typing.Any]) -> bool:
+        return len(data) > 0 and all(key in cls.COALESCED_FIELDS for key in data)
+
+    def submit(self, data: dict[str, typing.Any]) -> asyncio.Future[Player]:
+        """
+        Queue a write, returning a future for the Player it results in.
+        """
+        if not self.can_coalesce(data):
+            raise ValueError(f"Only {', '.join(sorted(self.COALESCED_FIELDS))} can be coalesced.")
+
+        for key, value in data.items():
+            if key == "filters" and isinstance(self._pending.get(key, None), dict):
+                self._pending[key] = {**self._pending[key], **value}
+            else:
+                self._pending[key] = value
+
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[Player] = loop.create_future()
+        self._waiters.append(future)
+
+        if self._timer is None:
+            self._timer = loop.call_later(self.window, self._schedule_flush)
+        return future
+
+    def _schedule_flush(self) -> None:
+        self._timer = None
+        if not self.session.exists:
+            # A write sent after the player was deleted would recreate it.
+            self._fail_pending(NoSessionError(guild_id=self.session.guild_id))
+            return
+
+        task = asyncio.get_running_loop().create_task(self.flush())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    @staticmethod
+    def _fail(waiters: list[asyncio.Future[Player]], exception: Exception) -> None:
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_exception(exception)
+                waiter.exception()
+
+    def _fail_pending(self, exception: Exception) -> None:
+        waiters = self._waiters
+        self._pending, self._waiters = {}, []
+        self._fail(waiters, exception)
+
+    async def cancel(self) -> None:
+        """
+        Drop everything pending, failing its waiters with NoSessionError,
+        and cancel any batch still being sent. Used when the session
+        disconnects, before its player is deleted.
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._fail_pending(NoSessionError(guild_id=self.session.guild_id))
+
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def flush(self) -> None:
+        """
+        Send whatever is pending right now.
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        data, waiters = self._pending, self._waiters
+        self._pending, self._waiters = {}, []
+
+        try:
+            async with self._send_lock:
+                if not waiters:
+                    return
+                player = await self.session.koe.update_player(
+                    self.session.guild_id,
+                    no_replace=True,
+                    data=data
+                )
+        except asyncio.CancelledError:
+            if not self.session.exists:
+                # Cancelled by cancel(), on disconnect.
+                self._fail(waiters, NoSessionError(guild_id=self.session.guild_id))
+            for waiter in waiters:
+                waiter.cancel()
+            raise
+        except Exception as e:
+            self._fail(waiters, e)
+            return
+
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(player)
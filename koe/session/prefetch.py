@@ -0,0 +1,174 @@
+from __future__ import annotations
+import asyncio
+import time
+import typing
+
+from ..impl.constructs.player import PlayerState
+from ..impl.constructs.track import Track, decode_track_info
+from ..log import logger
+
+
+if typing.TYPE_CHECKING:
+    from .base import Session
+
+
+class TrackPrefetcher:
+    """
+    Gets the next tracks in a session's queue ready before they're needed.
+
+    Player updates drive it. Once the current track has less than
+    `threshold` milliseconds left, the next `lookahead` tracks are checked
+    in the background. Each one's encoded string is decoded locally, which
+    also builds its info. A track whose string can't be decoded is
+    re-resolved from its URI, and swapped into the queue in place, so that
+    nothing has to be resolved once the current track ends.
+
+    Lavalink has no way to queue a track on the server. With `preplay`
+    set, the next track is sent with noReplace just as the current one is
+    expected to end. Lavalink ignores it if the current track is still
+    playing, and starts it straight away otherwise, without waiting for
+    the TrackEndEvent round trip.
+    """
+    # Seconds after the expected end of a track to preplay the next one,
+    # so it isn't sent while the current track is still finishing.
+    PREPLAY_MARGIN: typing.ClassVar[float] = 0.05
+
+    def __init__(self, session: 'Session', lookahead: int = 3, threshold: int = 15000, preplay: bool = False):
+        self.session = session
+        self.lookahead = lookahead
+        self.threshold = threshold
+        self.preplay = preplay
+
+        self._prefetched_for: Track | None = None
+        self._preplay_timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    def __repr__(self) -> str:
+        return f"<TrackPrefetcher lookahead: {self.lookahead}, threshold: {self.threshold}ms>"
+
+    def _spawn(self, coro: typing.Coroutine) -> None:
+        task = asyncio.get_running_loop().create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def on_player_state(self, state: PlayerState) -> None:
+        """
+        Called with every player update, from Session.on_player_state().
+        """
+        current = self.session._current_track
+        if current is None or not self.session._is_playing:
+            return
+
+        info = current.info
+        if info.is_stream:
+            return
+
+        remaining = info.length - state.position
+        if remaining > self.threshold:
+            return
+
+        if self._prefetched_for is not current:
+            self._prefetched_for = current
+            self._spawn(self.prefetch())
+
+        if self.preplay is True and not self.session._paused:
+            # Player updates are sent every few seconds, so extrapolate from
+            # when this one was taken.
+            elapsed = max(int(time.time() * 1000) - state.time, 0)
+            self._schedule_preplay(current, max(remaining - elapsed, 0) / 1000 + self.PREPLAY_MARGIN)
+
+    async def prefetch(self) -> None:
+        """
+        Validate, and re-resolve if need be, the next `lookahead` tracks.
+        """
+        queue = self.session.queue
+        async with queue.lock:
+            start = queue._pos + 1
+            upcoming = queue._queue.slice(start, start + self.lookahead)
+
+        for index, track in enumerate(upcoming, start):
+            resolved = await self._resolve(track)
+            if resolved is None or resolved is track:
+                continue
+
+            async with queue.lock:
+                # Only swap it in if the queue hasn't moved it in the meantime.
+                if index < len(queue._queue) and queue._queue[index] is track:
+                    queue._queue[index] = resolved
+
+    async def _resolve(self, track: Track) -> Track | None:
+        try:
+            # Lavalink is sent the encoded string, so that's what has to
+            # decode. Info Lavalink sent along with it is kept, otherwise
+            # the decoded info is used rather than decoding it again.
+            info = decode_track_info(track.encoded)
+            if track._info is None and track._raw_info is None:
+                track.info = info
+            else:
+                track.info
+            return track
+        except Exception as e:
+            logger.warning(f"Queued track in GID {self.session._guild_id} could not be decoded: {e!r}")
+
+        uri = track._info.uri if track._info is not None else (track._raw_info or {}).get('uri', None)
+        if uri is None:
+            return None
+
+        try:
+            result = await self.session.koe.load_tracks(uri)
+        except Exception as e:
+            logger.warning(f"Failed to re-resolve {uri}: {e!r}")
+            return None
+        return result if isinstance(result, Track) else None
+
+    def _schedule_preplay(self, current: Track, delay: float) -> None:
+        self.cancel()
+        self._preplay_timer = asyncio.get_running_loop().call_later(
+            delay,
+            lambda: self._spawn(self._preplay(current))
+        )
+
+    async def _preplay(self, expected: Track) -> None:
+        self._preplay_timer = None
+        session = self.session
+
+        # Anything the user did in the meantime takes priority.
+        if not session.exists or session._current_track is not expected or not session._is_playing or session._paused:
+            return
+
+        index = session._peek_next_index()
+        if index is None:
+            return
+
+        try:
+            await session.koe.update_player(
+                session.guild_id,
+                no_replace=True,
+                data={
+                    'track': {
+                        'encoded': session.queue._queue[index].encoded
+                    }
+                }
+            )
+        except Exception as e:
+            logger.warning(f"Preplay failed for GID {session._guild_id}: {e!r}")
+
+    def cancel(self) -> None:
+        """
+        Cancel a scheduled preplay. Prefetches already running carry on.
+        """
+        if self._preplay_timer is not None:
+            self._preplay_timer.cancel()
+            self._preplay_timer = None
+
+    async def close(self) -> None:
+        """
+        Cancel a scheduled preplay and everything running, and wait for it
+        to stop. Used when the session disconnects, before its player is
+        deleted, so a preplay can't recreate it.
+        """
+        self.cancel()
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
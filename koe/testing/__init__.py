@@ -0,0 +1,17 @@
+"""
+Stand-ins for Lavalink and Discord, for testing and benchmarking Koe on a
+single machine. Nothing here is imported by Koe itself.
+"""
+from .gateway import FakeEventManager, FakeGatewayBot, FakeUser
+from .lavalink import FakeLavalink, FakeLavalinkConfig, FakePlayer, make_track
+
+
+__all__ = [
+    "FakeEventManager",
+    "FakeGatewayBot",
+    "FakeLavalink",
+    "FakeLavalinkConfig",
+    "FakePlayer",
+    "FakeUser",
+    "make_track"
+]
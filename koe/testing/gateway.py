@@ -0,0 +1,179 @@
+from __future__ import annotations
+import asyncio
+from dataclasses import dataclass
+import hikari
+import typing as t
+import uuid
+
+from ..log import logger
+
+
+Callback = t.Callable[[t.Any], t.Coroutine[t.Any, t.Any, None]]
+
+
+class FakeEventManager:
+    """
+    The parts of hikari's event manager Koe uses, without a gateway.
+
+    Like hikari's, dispatching an event calls the listeners of its type
+    and of every type it inherits from, each in its own task.
+    """
+    def __init__(self):
+        self._listeners: dict[type, list[Callback]] = {}
+        self.dispatched: dict[type, int] = {}
+
+    def __repr__(self) -> str:
+        return f"<FakeEventManager listeners: {sum(len(callbacks) for callbacks in self._listeners.values())}>"
+
+    def subscribe(self, event_type: type, callback: Callback) -> None:
+        self._listeners.setdefault(event_type, []).append(callback)
+
+    def unsubscribe(self, event_type: type, callback: Callback) -> None:
+        callbacks = self._listeners.get(event_type, [])
+        if callback in callbacks:
+            callbacks.remove(callback)
+
+    def get_listeners(self, event_type: type, *, polymorphic: bool = True) -> list[Callback]:
+        if polymorphic is False:
+            return list(self._listeners.get(event_type, []))
+
+        callbacks: list[Callback] = []
+        for cls in event_type.mro():
+            callbacks.extend(self._listeners.get(cls, []))
+        return callbacks
+
+    async def _invoke(self, callback: Callback, event: t.Any) -> None:
+        try:
+            await callback(event)
+        except Exception as e:
+            logger.opt(exception=e).error(f"{type(event).__name__} listener {callback!r} failed: {e!r}")
+
+    def dispatch(self, event: t.Any) -> asyncio.Future[t.Any]:
+        self.dispatched[type(event)] = self.dispatched.get(type(event), 0) + 1
+        return asyncio.gather(*(
+            asyncio.get_running_loop().create_task(self._invoke(callback, event))
+            for callback in self.get_listeners(type(event))
+        ))
+
+
+@dataclass(slots=True)
+class FakeUser:
+    id: hikari.Snowflake
+    username: str = "koe"
+
+
+class FakeGatewayBot:
+    """
+    Enough of a hikari.GatewayBot to run Koe, without connecting to Discord.
+
+    Voice state updates are answered the way Discord would answer them,
+    with a VoiceStateUpdateEvent and a VoiceServerUpdateEvent, so sessions
+    connect all the way through to Lavalink.
+
+    Ex:
+    ```
+    bot = FakeGatewayBot()
+    koe = Koe(bot, host=lavalink.host, port=lavalink.port, password=lavalink.password)
+    await bot.start()
+    ```
+
+    Attributes
+    ----------
+    voice_updates: list[tuple[int, int | None]]
+        Every (guild ID, channel ID) voice state update sent.
+    voice_delay: float
+        Seconds before voice state updates are answered.
+    """
+    def __init__(self, user_id: int = 1, shard_count: int = 1, voice_delay: float = 0.0):
+        self.event_manager = FakeEventManager()
+        self.shard_count = shard_count
+        self.voice_delay = voice_delay
+        self.voice_updates: list[tuple[int, int | None]] = []
+
+        self._me = FakeUser(hikari.Snowflake(user_id))
+        self._tasks: set[asyncio.Task] = set()
+
+    def __repr__(self) -> str:
+        return f"<FakeGatewayBot user: {self._me.id}, shards: {self.shard_count}>"
+
+    def get_me(self) -> t.Any:
+        return self._me
+
+    def subscribe(self, event_type: type, callback: Callback) -> None:
+        self.event_manager.subscribe(event_type, callback)
+
+    def unsubscribe(self, event_type: type, callback: Callback) -> None:
+        self.event_manager.unsubscribe(event_type, callback)
+
+    def dispatch(self, event: t.Any) -> asyncio.Future[t.Any]:
+        return self.event_manager.dispatch(event)
+
+    async def start(self) -> None:
+        """
+        Fire a ShardReadyEvent for each shard, which starts Koe.
+        """
+        for shard_id in range(self.shard_count):
+            await self.dispatch(hikari.ShardReadyEvent(
+                shard=t.cast(t.Any, None),
+                actual_gateway_version=10,
+                resume_gateway_url="",
+                session_id=f"fake-{shard_id}",
+                my_user=t.cast(t.Any, self._me),
+                unavailable_guilds=[],
+                application_id=self._me.id,
+                application_flags=hikari.ApplicationFlags(0)
+            ))
+
+    async def update_voice_state(
+        self,
+        guild: hikari.SnowflakeishOr[hikari.PartialGuild],
+        channel: hikari.SnowflakeishOr[hikari.GuildVoiceChannel] | None,
+        *,
+        self_mute: bool = False,
+        self_deaf: bool = False
+    ) -> None:
+        guild_id = hikari.Snowflake(guild)
+        channel_id = hikari.Snowflake(channel) if channel is not None else None
+        self.voice_updates.append((int(guild_id), int(channel_id) if channel_id is not None else None))
+
+        # Discord answers after the request returns, so answer in a task.
+        task = asyncio.get_running_loop().create_task(self._answer_voice(guild_id, channel_id, self_mute, self_deaf))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _answer_voice(
+        self,
+        guild_id: hikari.Snowflake,
+        channel_id: hikari.Snowflake | None,
+        self_mute: bool,
+        self_deaf: bool
+    ) -> None:
+        if self.voice_delay > 0:
+            await asyncio.sleep(self.voice_delay)
+
+        state = hikari.VoiceState(
+            app=t.cast(t.Any, self),
+            channel_id=channel_id,
+            guild_id=guild_id,
+            is_guild_deafened=False,
+            is_guild_muted=False,
+            is_self_deafened=self_deaf,
+            is_self_muted=self_mute,
+            is_streaming=False,
+            is_suppressed=False,
+            is_video_enabled=False,
+            user_id=self._me.id,
+            member=None,
+            session_id=uuid.uuid4().hex,
+            requested_to_speak_at=None
+        )
+        await self.dispatch(hikari.VoiceStateUpdateEvent(shard=t.cast(t.Any, None), old_state=None, state=state))
+
+        if channel_id is not None:
+            await self.dispatch(hikari.VoiceServerUpdateEvent(
+                app=t.cast(t.Any, self),
+                shard=t.cast(t.Any, None),
+                guild_id=guild_id,
+                token=uuid.uuid4().hex,
+                raw_endpoint="fake.discord.media:443"
+            ))
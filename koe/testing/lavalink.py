@@ -0,0 +1,579 @@
+from __future__ import annotations
+import asyncio
+from dataclasses import dataclass, field
+import hashlib
+import orjson as json
+import random
+import time
+import typing as t
+import uuid
+
+from aiohttp import web, WSMsgType
+
+from ..impl.constructs.track import TrackInfo, decode_track_info, encode_track_info
+from ..log import logger
+
+
+SEARCH_PREFIXES: tuple[str, ...] = ("ytsearch:", "ytmsearch:", "scsearch:", "search:")
+
+
+@dataclass(slots=True)
+class FakeLavalinkConfig:
+    """
+    How a FakeLavalink behaves.
+
+    Attributes
+    ----------
+    latency: float
+        Seconds added before every REST response.
+    jitter: float
+        Up to this many more seconds are added at random.
+    error_rate: float
+        The fraction of REST requests which fail with `error_status`.
+    error_status: int
+        The status failed requests respond with.
+    update_interval: float
+        Seconds between playerUpdates for each playing player.
+    stats_interval: float
+        Seconds between stats frames.
+    start_delay: float
+        Seconds between a track being set and its TrackStartEvent.
+    time_scale: float
+        How much faster than real time tracks play. At 1000, a three
+        minute track ends after 0.18 seconds.
+    track_length: int
+        The length of generated tracks, in milliseconds.
+    search_results: int
+        The number of tracks returned by searches.
+    playlist_size: int
+        The number of tracks in generated playlists.
+    seed: int | None
+        Seeds the randomness of latency and errors, for repeatable runs.
+    """
+    latency: float = 0.0
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    error_status: int = 500
+    update_interval: float = 5.0
+    stats_interval: float = 60.0
+    start_delay: float = 0.0
+    time_scale: float = 1.0
+    track_length: int = 180000
+    search_results: int = 5
+    playlist_size: int = 20
+    seed: int | None = None
+
+
+@dataclass(slots=True)
+class FakePlayer:
+    guild_id: int
+    track: dict[str, t.Any] | None = None
+    volume: int = 100
+    paused: bool = False
+    voice: dict[str, t.Any] = field(default_factory=lambda: {'token': "", 'endpoint': "", 'sessionId': "", 'channelId': None})
+
+    # Where playback was at `anchor`, a time.monotonic() reading.
+    position: int = 0
+    anchor: float = 0.0
+    started: bool = False
+    timer: asyncio.TimerHandle | None = None
+
+
+@dataclass(slots=True)
+class FakeSession:
+    session_id: str
+    players: dict[int, FakePlayer] = field(default_factory=dict)
+    ws: web.WebSocketResponse | None = None
+    resuming: bool = False
+    timeout: int = 60
+    expiry: asyncio.TimerHandle | None = None
+    tasks: set[asyncio.Task] = field(default_factory=set)
+
+
+def make_track(identifier: str, index: int = 0, length: int = 180000) -> dict[str, t.Any]:
+    """
+    Make the JSON of a track, the same every time for the same arguments.
+    """
+    key = hashlib.blake2b(f"{identifier}:{index}".encode(), digest_size=8).hexdigest()
+    info = TrackInfo(
+        identifier=key,
+        is_seekable=True,
+        author="Koe",
+        length=length,
+        is_stream=False,
+        position=0,
+        title=f"{identifier} #{index}" if index else identifier,
+        uri=f"https://example.com/{key}",
+        artwork_url=None,
+        irsc=None,
+        source_name="http"
+    )
+    return {
+        'encoded': encode_track_info(info),
+        'info': {
+            'identifier': info.identifier,
+            'isSeekable': info.is_seekable,
+            'author': info.author,
+            'length': info.length,
+            'isStream': info.is_stream,
+            'position': info.position,
+            'title': info.title,
+            'uri': info.uri,
+            'artworkUrl': info.artwork_url,
+            'isrc': info.irsc,
+            'sourceName': info.source_name
+        },
+        'pluginInfo': {},
+        'userData': {}
+    }
+
+
+class FakeLavalink:
+    """
+    An in-process stand-in for a Lavalink v4 node.
+
+    It serves the REST endpoints and websocket ops Koe uses, and plays
+    tracks on a simulated clock: TrackStartEvents, playerUpdates and
+    TrackEndEvents are sent as a real node would send them. Latency,
+    errors and how often things happen are set by a FakeLavalinkConfig.
+
+    Ex:
+    ```
+    lavalink = FakeLavalink(FakeLavalinkConfig(time_scale=100))
+    await lavalink.start()
+    koe = Koe(bot, host=lavalink.host, port=lavalink.port, password=lavalink.password)
+    ```
+
+    `loadtracks` makes up tracks from the identifier. `ytsearch:` and
+    friends return a search, `playlist:` a playlist, `empty:` nothing and
+    `error:` an error. Anything else is a single track.
+
+    Attributes
+    ----------
+    requests: dict[tuple[str, str], int]
+        REST requests served, by method and route.
+    frames: dict[str, int]
+        Websocket frames sent, by op.
+    """
+    def __init__(
+        self,
+        config: FakeLavalinkConfig | None = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        password: str = "youshallnotpass"
+    ):
+        self.config = config if config is not None else FakeLavalinkConfig()
+        self.host = host
+        self.port = port
+        self.password = password
+
+        self.requests: dict[tuple[str, str], int] = {}
+        self.frames: dict[str, int] = {}
+
+        self._random = random.Random(self.config.seed)
+        self._sessions: dict[str, FakeSession] = {}
+        self._runner: web.AppRunner | None = None
+        self._started_at = time.monotonic()
+        self._ready = asyncio.Event()
+
+    def __repr__(self) -> str:
+        return f"<FakeLavalink {self.host}:{self.port} sessions: {len(self._sessions)}>"
+
+    @property
+    def players(self) -> dict[int, FakePlayer]:
+        """
+        Every player, across every session.
+        """
+        return {guild_id: player for session in self._sessions.values() for guild_id, player in session.players.items()}
+
+    async def start(self) -> None:
+        if self._runner is not None:
+            raise RuntimeError("FakeLavalink is already running.")
+
+        app = web.Application(middlewares=[self._middleware])
+        app.router.add_get("/v4/websocket", self._websocket)
+        app.router.add_get("/v4/loadtracks", self._load_tracks)
+        app.router.add_patch("/v4/sessions/{session_id}", self._update_session)
+        app.router.add_get("/v4/sessions/{session_id}/players", self._get_players)
+        app.router.add_get("/v4/sessions/{session_id}/players/{guild_id}", self._get_player)
+        app.router.add_patch("/v4/sessions/{session_id}/players/{guild_id}", self._update_player)
+        app.router.add_delete("/v4/sessions/{session_id}/players/{guild_id}", self._delete_player)
+
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+
+        # Port 0 picks a free port, so read back which one.
+        self.port = self._runner.addresses[0][1]
+        logger.info(f"Fake Lavalink listening on {self.host}:{self.port}")
+
+    async def stop(self) -> None:
+        for session in list(self._sessions.values()):
+            self._end_session(session)
+        self._sessions.clear()
+
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def wait_ready(self, timeout: float | None = 10.0) -> None:
+        """
+        Wait until a client has connected and been sent `ready`.
+        """
+        await asyncio.wait_for(self._ready.wait(), timeout)
+
+    async def drop_connections(self) -> None:
+        """
+        Close every websocket, as if the node restarted. Sessions with
+        resuming enabled can still be resumed.
+        """
+        for session in list(self._sessions.values()):
+            if session.ws is not None:
+                await session.ws.close()
+
+    # Plumbing
+
+    def _json(self, data: t.Any, status: int = 200) -> web.Response:
+        return web.Response(body=json.dumps(data), status=status, content_type="application/json")
+
+    def _error(self, status: int, message: str, path: str) -> web.Response:
+        return self._json({
+            'timestamp': int(time.time() * 1000),
+            'status': status,
+            'error': message,
+            'message': message,
+            'path': path
+        }, status=status)
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler: t.Callable) -> web.StreamResponse:
+        if request.headers.get("Authorization", None) != self.password:
+            return self._error(401, "Unauthorized", request.path)
+
+        if request.path == "/v4/websocket":
+            return await handler(request)
+
+        route = request.match_info.route.resource.canonical if request.match_info.route.resource else request.path
+        key = (request.method, route)
+        self.requests[key] = self.requests.get(key, 0) + 1
+
+        delay = self.config.latency + (self._random.uniform(0, self.config.jitter) if self.config.jitter else 0.0)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        if self.config.error_rate and self._random.random() < self.config.error_rate:
+            return self._error(self.config.error_status, "Injected error", request.path)
+        return await handler(request)
+
+    def _session(self, request: web.Request) -> FakeSession | None:
+        return self._sessions.get(request.match_info['session_id'], None)
+
+    def _spawn(self, session: FakeSession, coro: t.Coroutine) -> None:
+        task = asyncio.get_running_loop().create_task(coro)
+        session.tasks.add(task)
+        task.add_done_callback(session.tasks.discard)
+
+    async def _send(self, session: FakeSession, data: dict[str, t.Any]) -> None:
+        if session.ws is None or session.ws.closed:
+            return
+        self.frames[data['op']] = self.frames.get(data['op'], 0) + 1
+        try:
+            await session.ws.send_bytes(json.dumps(data))
+        except ConnectionError:
+            pass
+
+    def _end_session(self, session: FakeSession) -> None:
+        for task in session.tasks:
+            task.cancel()
+        for player in session.players.values():
+            if player.timer is not None:
+                player.timer.cancel()
+        if session.expiry is not None:
+            session.expiry.cancel()
+
+    # Websocket
+
+    async def _websocket(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+
+        previous = self._sessions.get(request.headers.get("Session-Id", ""), None)
+        resumed = previous is not None and previous.resuming and previous.ws is None
+        if resumed:
+            assert previous is not None
+            session = previous
+            if session.expiry is not None:
+                session.expiry.cancel()
+                session.expiry = None
+        else:
+            session = FakeSession(session_id=uuid.uuid4().hex[:16])
+            self._sessions[session.session_id] = session
+
+        session.ws = ws
+        await self._send(session, {'op': "ready", 'resumed': resumed, 'sessionId': session.session_id})
+        self._ready.set()
+
+        self._spawn(session, self._stats_loop(session))
+        self._spawn(session, self._update_loop(session))
+
+        async for message in ws:
+            if message.type is WSMsgType.ERROR:
+                break
+
+        session.ws = None
+        for task in list(session.tasks):
+            task.cancel()
+
+        if session.resuming:
+            session.expiry = asyncio.get_running_loop().call_later(
+                session.timeout, self._expire, session.session_id
+            )
+        else:
+            self._expire(session.session_id)
+        return ws
+
+    def _expire(self, session_id: str) -> None:
+        session = self._sessions.pop(session_id, None)
+        if session is not None:
+            self._end_session(session)
+
+    async def _stats_loop(self, session: FakeSession) -> None:
+        while True:
+            await self._send(session, self._stats())
+            await asyncio.sleep(self.config.stats_interval)
+
+    async def _update_loop(self, session: FakeSession) -> None:
+        while True:
+            await asyncio.sleep(self.config.update_interval)
+            now = int(time.time() * 1000)
+            for player in list(session.players.values()):
+                if player.track is None or not player.started:
+                    continue
+                await self._send(session, {
+                    'op': "playerUpdate",
+                    'guildId': str(player.guild_id),
+                    'state': self._state(player, now)
+                })
+
+    def _stats(self) -> dict[str, t.Any]:
+        players = self.players.values()
+        return {
+            'op': "stats",
+            'players': len(players),
+            'playingPlayers': sum(1 for player in players if player.track is not None and not player.paused),
+            'uptime': int((time.monotonic() - self._started_at) * 1000),
+            'memory': {'free': 1 << 28, 'used': 1 << 28, 'allocated': 1 << 29, 'reservable': 1 << 30},
+            'cpu': {'cores': 4, 'systemLoad': 0.1, 'lavalinkLoad': 0.05},
+            'frameStats': {'sent': 3000, 'nulled': 0, 'deficit': 0}
+        }
+
+    # Playback
+
+    def _position(self, player: FakePlayer) -> int:
+        if player.track is None:
+            return 0
+        if player.paused or not player.started:
+            return player.position
+
+        elapsed = (time.monotonic() - player.anchor) * 1000 * self.config.time_scale
+        return min(int(player.position + elapsed), player.track['info']['length'])
+
+    def _state(self, player: FakePlayer, now: int | None = None) -> dict[str, t.Any]:
+        return {
+            'time': now if now is not None else int(time.time() * 1000),
+            'position': self._position(player),
+            'connected': True,
+            'ping': 0
+        }
+
+    def _player_json(self, player: FakePlayer) -> dict[str, t.Any]:
+        return {
+            'guildId': str(player.guild_id),
+            'track': player.track,
+            'volume': player.volume,
+            'paused': player.paused,
+            'state': self._state(player),
+            'voice': player.voice,
+            'filters': {}
+        }
+
+    def _schedule_end(self, session: FakeSession, player: FakePlayer) -> None:
+        if player.timer is not None:
+            player.timer.cancel()
+            player.timer = None
+        if player.track is None or player.paused or not player.started:
+            return
+
+        remaining = (player.track['info']['length'] - self._position(player)) / 1000 / self.config.time_scale
+        player.timer = asyncio.get_running_loop().call_later(
+            max(remaining, 0), lambda: self._spawn(session, self._end_track(session, player, "finished"))
+        )
+
+    async def _start_track(self, session: FakeSession, player: FakePlayer, track: dict[str, t.Any]) -> None:
+        if self.config.start_delay > 0:
+            await asyncio.sleep(self.config.start_delay)
+        if player.track is not track:
+            return
+
+        player.started = True
+        player.anchor = time.monotonic()
+        self._schedule_end(session, player)
+        await self._send(session, {'op': "event", 'type': "TrackStartEvent", 'guildId': str(player.guild_id), 'track': track})
+
+    async def _end_track(self, session: FakeSession, player: FakePlayer, reason: str) -> None:
+        track = player.track
+        if track is None:
+            return
+
+        if player.timer is not None:
+            player.timer.cancel()
+            player.timer = None
+        if reason == "finished":
+            player.track = None
+            player.started = False
+        await self._send(session, {'op': "event", 'type': "TrackEndEvent", 'guildId': str(player.guild_id), 'track': track, 'reason': reason})
+
+    def _set_track(self, session: FakeSession, player: FakePlayer, encoded: str | None, position: int) -> None:
+        if player.track is not None:
+            old = player.track
+            if player.timer is not None:
+                player.timer.cancel()
+                player.timer = None
+            reason = "stopped" if encoded is None else "replaced"
+            self._spawn(session, self._send(session, {'op': "event", 'type': "TrackEndEvent", 'guildId': str(player.guild_id), 'track': old, 'reason': reason}))
+
+        player.started = False
+        player.position = position
+        if encoded is None:
+            player.track = None
+            return
+
+        track = self._find_track(encoded)
+        player.track = track
+        self._spawn(session, self._start_track(session, player, track))
+
+    def _find_track(self, encoded: str) -> dict[str, t.Any]:
+        info = decode_track_info(encoded)
+        return {
+            'encoded': encoded,
+            'info': {
+                'identifier': info.identifier,
+                'isSeekable': info.is_seekable,
+                'author': info.author,
+                'length': info.length,
+                'isStream': info.is_stream,
+                'position': 0,
+                'title': info.title,
+                'uri': info.uri,
+                'artworkUrl': info.artwork_url,
+                'isrc': info.irsc,
+                'sourceName': info.source_name
+            },
+            'pluginInfo': {},
+            'userData': {}
+        }
+
+    # REST
+
+    async def _load_tracks(self, request: web.Request) -> web.Response:
+        identifier = request.query.get("identifier", "")
+        length = self.config.track_length
+
+        if identifier.startswith("empty:"):
+            return self._json({'loadType': "empty", 'data': {}})
+        if identifier.startswith("error:"):
+            return self._json({'loadType': "error", 'data': {'message': identifier[6:], 'severity': "common", 'cause': "Injected"}})
+        if identifier.startswith(SEARCH_PREFIXES):
+            return self._json({
+                'loadType': "search",
+                'data': [make_track(identifier, i, length) for i in range(self.config.search_results)]
+            })
+        if identifier.startswith("playlist:"):
+            return self._json({
+                'loadType': "playlist",
+                'data': {
+                    'info': {'name': identifier[9:], 'selectedTrack': -1},
+                    'pluginInfo': {},
+                    'tracks': [make_track(identifier, i, length) for i in range(self.config.playlist_size)]
+                }
+            })
+        return self._json({'loadType': "track", 'data': make_track(identifier, 0, length)})
+
+    async def _update_session(self, request: web.Request) -> web.Response:
+        session = self._session(request)
+        if session is None:
+            return self._error(404, "Session not found", request.path)
+
+        data = json.loads(await request.read() or b"{}")
+        session.resuming = bool(data.get('resuming', session.resuming))
+        session.timeout = int(data.get('timeout', session.timeout))
+        return self._json({'resuming': session.resuming, 'timeout': session.timeout})
+
+    async def _get_players(self, request: web.Request) -> web.Response:
+        session = self._session(request)
+        if session is None:
+            return self._error(404, "Session not found", request.path)
+        return self._json([self._player_json(player) for player in session.players.values()])
+
+    async def _get_player(self, request: web.Request) -> web.Response:
+        session = self._session(request)
+        if session is None:
+            return self._error(404, "Session not found", request.path)
+
+        player = session.players.get(int(request.match_info['guild_id']), None)
+        if player is None:
+            return self._error(404, "Player not found", request.path)
+        return self._json(self._player_json(player))
+
+    async def _update_player(self, request: web.Request) -> web.Response:
+        session = self._session(request)
+        if session is None:
+            return self._error(404, "Session not found", request.path)
+
+        # Read the body first, so a request cut off halfway doesn't
+        # create a player.
+        data = json.loads(await request.read() or b"{}")
+
+        guild_id = int(request.match_info['guild_id'])
+        player = session.players.get(guild_id, None)
+        if player is None:
+            player = session.players[guild_id] = FakePlayer(guild_id)
+
+        no_replace = request.query.get("noReplace", "false") == "true"
+
+        if 'voice' in data:
+            player.voice = {**player.voice, **data['voice']}
+        if 'volume' in data:
+            player.volume = data['volume']
+
+        position = data.get('position', None)
+        if 'track' in data or 'encodedTrack' in data:
+            encoded = data['track'].get('encoded', None) if 'track' in data else data['encodedTrack']
+            # noReplace only keeps a track which is actually playing.
+            if not (no_replace and player.track is not None and encoded is not None):
+                self._set_track(session, player, encoded, position or 0)
+                position = None
+
+        if 'paused' in data and data['paused'] != player.paused:
+            player.position = self._position(player)
+            player.anchor = time.monotonic()
+            player.paused = data['paused']
+            self._schedule_end(session, player)
+
+        if position is not None and player.track is not None:
+            player.position = min(int(position), player.track['info']['length'])
+            player.anchor = time.monotonic()
+            self._schedule_end(session, player)
+
+        return self._json(self._player_json(player))
+
+    async def _delete_player(self, request: web.Request) -> web.Response:
+        session = self._session(request)
+        if session is None:
+            return self._error(404, "Session not found", request.path)
+
+        player = session.players.pop(int(request.match_info['guild_id']), None)
+        if player is not None and player.timer is not None:
+            player.timer.cancel()
+        return web.Response(status=204)
@@ -1,67 +1,199 @@
 import asyncio
+import collections
+from dataclasses import dataclass
+import functools
+import time
 import typing as t
 
 
-class AsyncConditionalLock:
+@dataclass(slots=True)
+class LockStats:
     """
-    An asyncio.Lock which only locks conditionally.
+    Contention statistics for a ReentrantLock.
+    
+    Attributes
+    ----------
+    acquisitions: int
+        How many times the lock was acquired, not counting re-entries.
+    contended: int
+        How many of those acquisitions had to wait.
+    total_wait: float
+        The total time spent waiting for the lock, in seconds.
+    max_wait: float
+        The longest wait for the lock, in seconds.
+    total_hold: float
+        The total time the lock was held, in seconds.
+    max_hold: float
+        The longest the lock was held, in seconds.
+    """
+    acquisitions: int = 0
+    contended: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+    total_hold: float = 0.0
+    max_hold: float = 0.0
+
+
+class ReentrantLock:
+    """
+    An asyncio.Lock which the task holding it may acquire again.
     
     Ex:
     ```
     async with lock:
-      # do stuff while locked
-    ```
-    ```
-    async with lock(unsafe=True):
-      # do stuff unlocked
+      async with lock:
+        # still fine, as long as it's the same task
     ```
     
-    The primary purpose of this is to facilitate easy lock usage in Koe.
-    Typically, when calling a function which messes with memory data, we
-    want to acquire a lock to ensure thread safety. However, sometimes these
-    functions are called in other functions which have already acquired the
-    same lock, so in this situation we don't want to acquire the lock or else
-    we enter an infinite loop. Rather than having an unsafe version and a
-    safe version, we can just have one function which uses this.
+    Koe's methods frequently call other methods which take the same lock
+    the caller already holds. Ownership is tracked per task, so those
+    nested acquisitions just increase a depth counter, while any other
+    task still has to wait. Only the owning task may release it.
+    
+    Setting `instrumented` to True, either on the class or on one lock,
+    records wait and hold times in `stats`.
     """
-    def __init__(self):
+    instrumented: bool = False
+    
+    def __init__(self, name: str | None = None):
+        self.name = name
+        self.stats = LockStats()
+        
         self._lock = asyncio.Lock()
-        self._unsafe = False
+        self._owner: asyncio.Task | None = None
+        self._depth = 0
+        self._acquired_at = 0.0
     
-    async def __aenter__(self):
-        if self._unsafe is False:
-            await self._lock.acquire()
-        return self
+    def __repr__(self) -> str:
+        return f"<ReentrantLock {self.name or ''} holder: {self.holder}, depth: {self._depth}>"
     
-    async def __aexit__(self, exc_type, exc_val, exc_tb):        
-        if self._lock.locked() is True:
-            self._lock.release()
-            self._unsafe = False
+    @property
+    def holder(self) -> str | None:
+        """
+        The name of the task holding the lock, if any.
+        """
+        if self._owner is None:
+            return None
+        return self._owner.get_name()
+    
+    def locked(self) -> bool:
+        return self._lock.locked()
+    
+    def owned(self) -> bool:
+        """
+        Whether or not the current task holds the lock.
+        """
+        return self._owner is not None and self._owner is asyncio.current_task()
+    
+    async def acquire(self) -> bool:
+        task = asyncio.current_task()
+        if task is None:
+            raise RuntimeError("ReentrantLock must be acquired from within a task.")
+        
+        if self._owner is task:
+            self._depth += 1
+            return True
+        
+        if self.instrumented is False:
+            await self._lock.acquire()
+        else:
+            contended = self._lock.locked()
+            start = time.perf_counter()
+            await self._lock.acquire()
+            self._acquired_at = time.perf_counter()
+            
+            wait = self._acquired_at - start
+            self.stats.acquisitions += 1
+            self.stats.total_wait += wait
+            self.stats.max_wait = max(self.stats.max_wait, wait)
+            if contended:
+                self.stats.contended += 1
         
-        if exc_type is not None:
-            raise exc_val
+        self._owner = task
+        self._depth = 1
         return True
     
-    def __call__(self, unsafe: bool=False):
-        self._unsafe = unsafe
+    def release(self) -> None:
+        if self._owner is None or self._owner is not asyncio.current_task():
+            raise RuntimeError("ReentrantLock can only be released by the task holding it.")
+        
+        self._depth -= 1
+        if self._depth > 0:
+            return
+        
+        if self.instrumented is True and self._acquired_at:
+            hold = time.perf_counter() - self._acquired_at
+            self.stats.total_hold += hold
+            self.stats.max_hold = max(self.stats.max_hold, hold)
+            self._acquired_at = 0.0
+        
+        self._owner = None
+        self._lock.release()
+    
+    async def __aenter__(self) -> 'ReentrantLock':
+        await self.acquire()
         return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.release()
+
+
+class WindowRateLimiter:
+    """
+    Allows at most `limit` acquisitions in any `period` seconds.
+
+    Acquisitions over the limit wait until the oldest one in the window
+    expires, and are let through in the order they arrived.
+    """
+    def __init__(self, limit: int, period: float):
+        self.limit = limit
+        self.period = period
+
+        self._stamps: collections.deque[float] = collections.deque()
+        self._lock = asyncio.Lock()
+
+    def __repr__(self) -> str:
+        return f"<WindowRateLimiter {self.limit}/{self.period}s>"
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                while self._stamps and now - self._stamps[0] >= self.period:
+                    self._stamps.popleft()
+
+                if len(self._stamps) < self.limit:
+                    self._stamps.append(now)
+                    return
+                await asyncio.sleep(self.period - (now - self._stamps[0]))
 
 
 def ensure_one_of(**kwargs) -> None:
     if not any([val is not None for val in kwargs.values()]):
         raise ValueError(f"One of {', '.join(kwargs.keys())} must be passed.")
-    if all(kwargs.values()):
+    if sum(val is not None for val in kwargs.values()) > 1:
         raise ValueError(f"Only one of {', '.join(kwargs.keys())} may be passed.")
 
 
+@functools.lru_cache(maxsize=1024)
 def camel_case_to_snake_case(string: str) -> str:
-    out = ""
-    for char in string:
-        if char.isupper():
-            out += f"_{char.lower()}"
-        else:
-            out += char
-    return out
+    """
+    Convert a camelCase string to snake_case.
+    
+    Lavalink only ever uses a small, fixed set of keys, so results are
+    memoized and the conversion itself only runs once per distinct key.
+    """
+    return "".join([f"_{char.lower()}" if char.isupper() else char for char in string])
+
+
+class LavalinkDict(dict):
+    """
+    A dict whose keys have already been converted to snake_case.
+    
+    lavalink_dictovert() returns these, and passes them through as-is,
+    so the same payload is never walked twice.
+    """
+    pass
 
 
 def lavalink_dictovert(data: dict[str, t.Any]) -> dict[str, t.Any]:
@@ -69,7 +201,8 @@ def lavalink_dictovert(data: dict[str, t.Any]) -> dict[str, t.Any]:
     Convert from lavalink dictionary format to mine.
     
     Lavalink sends camelCased keys in its JSON, but this is Python
-    and I like snake_case better.
+    and I like snake_case better. Dicts which have already been
+    converted are returned untouched.
 
     Args:
         data (dict): The dict converted from JSON from lavalink.
@@ -77,11 +210,12 @@ def lavalink_dictovert(data: dict[str, t.Any]) -> dict[str, t.Any]:
     Returns:
         dict: The same dict, but with snake_case keys.
     """
-    new = {}
+    if isinstance(data, LavalinkDict):
+        return data
+    
+    new = LavalinkDict()
     for key, value in data.items():
         if isinstance(value, dict):
             value = lavalink_dictovert(value)
-            
-        key = camel_case_to_snake_case(key)
-        new[key] = value
-    return new
\ No newline at end of file
+        new[camel_case_to_snake_case(key)] = value
+    return new
@@ -0,0 +1,16 @@
+import asyncio
+import inspect
+
+import pytest
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_pyfunc_call(pyfuncitem: pytest.Function) -> bool | None:
+    # Coroutine tests each get a fresh event loop, so the suite doesn't
+    # depend on an asyncio plugin.
+    if not inspect.iscoroutinefunction(pyfuncitem.obj):
+        return None
+
+    arguments = {name: pyfuncitem.funcargs[name] for name in pyfuncitem._fixtureinfo.argnames}
+    asyncio.run(asyncio.wait_for(pyfuncitem.obj(**arguments), timeout=30))
+    return True
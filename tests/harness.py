@@ -0,0 +1,84 @@
+from __future__ import annotations
+import asyncio
+import contextlib
+import hikari
+import typing as t
+
+import koe
+from koe.testing import FakeGatewayBot, FakeLavalink, FakeLavalinkConfig
+
+
+class Harness:
+    """
+    A Koe connected to one or more FakeLavalinks through a FakeGatewayBot.
+    The first FakeLavalink is Koe's default node. The others are added as
+    nodes named "node-1", "node-2" and so on.
+    """
+    def __init__(self, koe: koe.Koe, bot: FakeGatewayBot, lavalinks: list[FakeLavalink]):
+        self.koe = koe
+        self.bot = bot
+        self.lavalinks = lavalinks
+
+    @property
+    def lavalink(self) -> FakeLavalink:
+        return self.lavalinks[0]
+
+    def lavalink_for(self, node: t.Any) -> FakeLavalink:
+        return next(lavalink for lavalink in self.lavalinks if lavalink.port == node.port)
+
+    async def connect(self, guild_id: int, voice_id: int | None = None, channel_id: int | None = None) -> koe.Session:
+        """
+        Connect a session, and wait for Discord's voice server update to
+        reach Lavalink.
+        """
+        session = koe.Session(self.koe)
+        await session.connect(
+            hikari.Snowflake(guild_id),
+            hikari.Snowflake(voice_id if voice_id is not None else 1000 + guild_id),
+            hikari.Snowflake(channel_id) if channel_id is not None else None
+        )
+
+        lavalink = self.lavalink_for(self.koe.get_node_for(guild_id))
+        await wait_for(lambda: guild_id in lavalink.players and lavalink.players[guild_id].voice['endpoint'] != "")
+        return session
+
+
+async def wait_for(predicate: t.Callable[[], bool], timeout: float = 5.0) -> None:
+    """
+    Poll until a condition holds.
+    """
+    async with asyncio.timeout(timeout):
+        while not predicate():
+            await asyncio.sleep(0.005)
+
+
+@contextlib.asynccontextmanager
+async def running(
+    nodes: int = 1,
+    config: FakeLavalinkConfig | None = None,
+    **options: t.Any
+) -> t.AsyncIterator[Harness]:
+    """
+    Start FakeLavalinks, a FakeGatewayBot and Koe, and stop them all again
+    afterwards. Extra keyword arguments are passed to Koe.
+    """
+    if config is None:
+        config = FakeLavalinkConfig(time_scale=2000, update_interval=0.05, seed=1)
+
+    lavalinks = [FakeLavalink(config) for _ in range(nodes)]
+    for lavalink in lavalinks:
+        await lavalink.start()
+
+    bot = FakeGatewayBot()
+    client = koe.Koe(t.cast(t.Any, bot), host=lavalinks[0].host, port=lavalinks[0].port, password=lavalinks[0].password, **options)
+    for index, lavalink in enumerate(lavalinks[1:], start=1):
+        client.add_node(f"node-{index}", host=lavalink.host, port=lavalink.port, password=lavalink.password)
+
+    try:
+        await bot.start()
+        await wait_for(lambda: len(client.nodes.ready) == nodes)
+        yield Harness(client, bot, lavalinks)
+    finally:
+        await client.stop()
+        for lavalink in lavalinks:
+            await lavalink.stop()
@@ -0,0 +1,52 @@
+import asyncio
+
+import pytest
+
+from koe.errors import NoSessionError
+from koe.testing import FakeLavalinkConfig
+
+from .harness import running
+
+
+async def test_writes_are_merged():
+    async with running() as harness:
+        session = await harness.connect(1)
+        session.enable_coalescing(window=0.05)
+        patches = harness.lavalink.requests[("PATCH", "/v4/sessions/{session_id}/players/{guild_id}")]
+
+        await asyncio.gather(session.set_volume(10), session.set_volume(20), session.set_pause(True))
+        assert harness.lavalink.requests[("PATCH", "/v4/sessions/{session_id}/players/{guild_id}")] == patches + 1
+        assert harness.lavalink.players[1].volume == 20
+        assert harness.lavalink.players[1].paused is True
+
+
+async def test_disconnect_drops_pending_writes():
+    async with running() as harness:
+        session = await harness.connect(1)
+        session.enable_coalescing(window=0.1)
+
+        pending = asyncio.create_task(session.set_volume(10))
+        await asyncio.sleep(0.01)
+        await session.disconnect()
+
+        with pytest.raises(NoSessionError):
+            await pending
+        await asyncio.sleep(0.2)
+        assert 1 not in harness.lavalink.players
+
+
+async def test_disconnect_cancels_writes_in_flight():
+    async with running(config=FakeLavalinkConfig(update_interval=0.05, seed=1)) as harness:
+        session = await harness.connect(1)
+        session.enable_coalescing(window=0.01)
+
+        harness.lavalink.config.latency = 0.2
+        pending = asyncio.create_task(session.set_volume(10))
+        await asyncio.sleep(0.05)
+        harness.lavalink.config.latency = 0.0
+        await session.disconnect()
+
+        with pytest.raises(NoSessionError):
+            await pending
+        await asyncio.sleep(0.3)
+        assert 1 not in harness.lavalink.players
@@ -0,0 +1,62 @@
+import pytest
+
+from koe.impl.constructs.base import Serializable
+from koe.impl.constructs.player import Player
+from koe.impl.constructs.track import Track, TrackInfo, decode_track_info, encode_track_info
+from koe.testing import make_track
+from koe.utils import lavalink_dictovert
+
+
+@pytest.fixture(params=[False, True], ids=["compiled", "strict"])
+def strict(request: pytest.FixtureRequest):
+    previous = Serializable.strict
+    Serializable.strict = request.param
+    yield request.param
+    Serializable.strict = previous
+
+
+def player_json(track: dict | None) -> dict:
+    # As RestAPI hands it over.
+    return lavalink_dictovert({
+        'guildId': "123",
+        'track': track,
+        'volume': 80,
+        'paused': False,
+        'state': {'time': 1, 'position': 2, 'connected': True, 'ping': 3},
+        'voice': {'token': "t", 'endpoint': "e", 'sessionId': "s", 'channelId': "456"},
+        'filters': {}
+    })
+
+
+def test_track(strict: bool):
+    data = make_track("song")
+    track = Track.construct(data)
+
+    assert track.encoded == data['encoded']
+    assert isinstance(track.info, TrackInfo)
+    assert track.info.title == "song"
+    assert track.plugin_info == {}
+
+
+def test_player(strict: bool):
+    data = make_track("song")
+    player = Player.construct(player_json(data))
+
+    assert player.guild_id == 123
+    assert player.voice.channel_id == 456
+    assert isinstance(player.track, Track)
+    assert player.track.encoded == data['encoded']
+    assert player.track.info.length == 180000
+
+
+def test_player_without_track(strict: bool):
+    assert Player.construct(player_json(None)).track is None
+
+
+def test_encoded_round_trip():
+    data = make_track("song", index=4, length=1234)
+    info = decode_track_info(data['encoded'])
+
+    assert info == Track.construct(data).info
+    assert encode_track_info(info) == data['encoded']
+    assert Track.from_encoded(data['encoded']).info == info
@@ -0,0 +1,94 @@
+import asyncio
+import collections
+
+import hikari
+
+import koe
+from koe.impl.constructs.playlist import Playlist
+from koe.testing import FakeLavalinkConfig
+
+from .harness import running, wait_for
+
+
+async def test_load_types():
+    async with running(config=FakeLavalinkConfig(search_results=3, playlist_size=7)) as harness:
+        client = harness.koe
+
+        track = await client.load_tracks("song")
+        assert isinstance(track, koe.Track) and track.info.title == "song"
+
+        results = await client.load_tracks("ytsearch:song")
+        assert isinstance(results, list) and len(results) == 3
+
+        playlist = await client.load_tracks("playlist:mix")
+        assert isinstance(playlist, Playlist) and len(playlist.tracks) == 7
+
+        assert await client.load_tracks("empty:nothing") is None
+        assert await client.load_tracks("error:broken") is None
+
+        # The same identifier is only loaded from Lavalink once.
+        await client.load_tracks("song")
+        assert harness.lavalink.requests[("GET", "/v4/loadtracks")] == 5
+
+
+async def test_many_sessions_play_their_playlists():
+    async with running(nodes=2) as harness:
+        ends: collections.Counter[str] = collections.Counter()
+        async def on_end(event: koe.TrackEndEvent) -> None:
+            ends[event.reason] += 1
+        harness.bot.subscribe(koe.TrackEndEvent, on_end)
+
+        async def listen(guild_id: int) -> koe.Session:
+            session = await harness.connect(guild_id)
+            playlist = await harness.koe.load_tracks(f"playlist:{guild_id % 3}")
+            await session.enqueue_many(playlist.tracks[:3])
+            return session
+
+        sessions = await asyncio.gather(*(listen(guild_id) for guild_id in range(1, 31)))
+        await wait_for(lambda: ends["finished"] == 90, timeout=10)
+
+        assert [await session.queue.get_pos() for session in sessions] == [2] * 30
+        assert all(not session._is_playing for session in sessions)
+        assert sum(len(lavalink.players) for lavalink in harness.lavalinks) == 30
+
+
+async def test_requests_are_retried_through_injected_errors():
+    config = FakeLavalinkConfig(update_interval=0.05, seed=3)
+    async with running(config=config) as harness:
+        session = await harness.connect(1)
+
+        # Every other request fails, but each is retried twice.
+        harness.lavalink.config.error_rate = 0.5
+        for level in range(10, 20):
+            await session.set_volume(level)
+            assert (await harness.koe.get_player(session.guild_id)).volume == level
+        harness.lavalink.config.error_rate = 0.0
+
+
+async def test_checkpoint_restores_into_a_new_client(tmp_path):
+    path = str(tmp_path / "sessions.json")
+
+    async with running() as harness:
+        session = await harness.connect(1, channel_id=2001)
+        await session.set_volume(35)
+        playlist = await harness.koe.load_tracks("playlist:mix")
+        await session.enqueue_many(playlist.tracks[:4], begin_playback=False)
+        await session.skip(to=3)
+        await wait_for(lambda: session._is_playing)
+
+        assert await harness.koe.checkpoint(path) == 1
+        encoded = [track.encoded for track in playlist.tracks[:4]]
+
+    async with running() as harness:
+        results = await harness.koe.restore_checkpoint(path)
+        assert results == {1: None}
+
+        session = await harness.koe.get_session_by(channel_id=hikari.Snowflake(2001))
+        tracks, pos = await session.queue.get_all_and_pos()
+        assert [track.encoded for track in tracks] == encoded
+        assert pos == 2
+
+        await wait_for(lambda: 1 in harness.lavalink.players and harness.lavalink.players[1].track is not None)
+        player = harness.lavalink.players[1]
+        assert player.track['encoded'] == encoded[2]
+        assert player.volume == 35
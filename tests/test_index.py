@@ -0,0 +1,94 @@
+import asyncio
+import hikari
+import pytest
+
+import koe
+from koe.errors import NoSessionError
+
+from .harness import running, wait_for
+
+
+def assert_indexes_match(client: koe.Koe) -> None:
+    sessions = list(client._sessions.values())
+    assert client._voice_index == {int(session._voice_id): session for session in sessions if session._voice_id is not None}
+    assert client._channel_index == {int(session._channel_id): session for session in sessions if session._channel_id is not None}
+
+
+async def test_indexes_follow_sessions():
+    async with running(nodes=2) as harness:
+        client = harness.koe
+
+        sessions = [await harness.connect(guild_id, channel_id=2000 + guild_id) for guild_id in range(1, 5)]
+        assert_indexes_match(client)
+        assert await client.get_session_by(voice_id=hikari.Snowflake(1001)) is sessions[0]
+        assert await client.get_session_by(channel_id=hikari.Snowflake(2002)) is sessions[1]
+
+        # Moved to another voice channel, from Discord's side.
+        await harness.bot.update_voice_state(1, 5001)
+        await wait_for(lambda: sessions[0].voice_id == 5001)
+        assert_indexes_match(client)
+        assert await client.get_session_by(voice_id=hikari.Snowflake(5001)) is sessions[0]
+        assert await client.get_session_or_none_by(voice_id=hikari.Snowflake(1001)) is None
+
+        # Moved to another text channel.
+        await sessions[1].set_channel_id(hikari.Snowflake(6002))
+        assert_indexes_match(client)
+        assert await client.get_session_by(channel_id=hikari.Snowflake(6002)) is sessions[1]
+        assert await client.get_session_or_none_by(channel_id=hikari.Snowflake(2002)) is None
+
+        # Migrated to the other node.
+        source = client.get_node_for(3)
+        target = next(node for node in client.nodes if node is not source)
+        await client.migrate_guild(3, target)
+        assert client.get_node_for(3) is target
+        assert_indexes_match(client)
+        assert await client.get_session_by(voice_id=hikari.Snowflake(1003)) is sessions[2]
+
+        # Disconnected, by us and from Discord's side.
+        await sessions[2].disconnect()
+        assert_indexes_match(client)
+        with pytest.raises(NoSessionError):
+            await client.get_session_by(voice_id=hikari.Snowflake(1003))
+
+        await harness.bot.update_voice_state(4, None)
+        await wait_for(lambda: hikari.Snowflake(4) not in client._sessions)
+        assert_indexes_match(client)
+        assert await client.get_session_or_none_by(channel_id=hikari.Snowflake(2004)) is None
+
+        assert sorted(client._sessions) == [1, 2]
+
+
+async def test_lookups_dont_wait_for_stripe_locks():
+    async with running(lock_stripes=4) as harness:
+        client = harness.koe
+        session = await harness.connect(1, channel_id=2001)
+
+        # Guild 5 shares guild 1's stripe. Its connect holds the stripe
+        # until Discord answers, which here it doesn't.
+        answer = asyncio.Event()
+        update_voice_state = harness.bot.update_voice_state
+        async def held(*args, **kwargs) -> None:
+            await answer.wait()
+            await update_voice_state(*args, **kwargs)
+        harness.bot.update_voice_state = held
+
+        lock = client.session_lock(5)
+        assert lock is client.session_lock(1)
+        async def connect() -> None:
+            async with lock:
+                await koe.Session(client).connect(hikari.Snowflake(5), hikari.Snowflake(1005))
+        connecting = asyncio.create_task(connect())
+        try:
+            await wait_for(lambda: hikari.Snowflake(5) in client._sessions)
+            assert lock.locked()
+
+            found = await asyncio.wait_for(asyncio.gather(
+                client.get_session_by(guild_id=hikari.Snowflake(1)),
+                client.get_session_by(voice_id=hikari.Snowflake(1001)),
+                client.get_session_by(channel_id=hikari.Snowflake(2001))
+            ), 0.5)
+            assert found == [session, session, session]
+            assert lock.locked()
+        finally:
+            answer.set()
+            await connecting
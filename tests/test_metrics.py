@@ -0,0 +1,112 @@
+import aiohttp
+import pytest
+
+from koe.impl.metrics import MetricsExporter, MetricsRegistry
+from koe.utils import ReentrantLock
+
+from .harness import running, wait_for
+
+
+@pytest.fixture(autouse=True)
+def restore_instrumented():
+    # Turning metrics on instruments every ReentrantLock.
+    previous = ReentrantLock.instrumented
+    yield
+    ReentrantLock.instrumented = previous
+
+
+def parse(text: str) -> dict[str, dict[tuple[tuple[str, str], ...], float]]:
+    """
+    Parse the Prometheus text format into {name: {labels: value}}.
+    """
+    samples: dict[str, dict[tuple[tuple[str, str], ...], float]] = {}
+    types: dict[str, str] = {}
+
+    for line in text.splitlines():
+        if line.startswith("# TYPE "):
+            _, _, name, kind = line.split(" ")
+            types[name] = kind
+            continue
+        if not line or line.startswith("#"):
+            continue
+
+        series, value = line.rsplit(" ", 1)
+        name, _, rest = series.partition("{")
+        labels = tuple(
+            (key, raw.strip('"'))
+            for key, raw in (pair.split("=", 1) for pair in rest.rstrip("}").split(",") if pair)
+        )
+        samples.setdefault(name, {})[labels] = float(value)
+
+    assert types, "No TYPE lines"
+    for name in samples:
+        assert any(name == family or name.startswith(f"{family}_") for family in types), name
+    return samples
+
+
+async def scrape(exporter: MetricsExporter, openmetrics: bool = False) -> tuple[str, str]:
+    headers = {'Accept': "application/openmetrics-text"} if openmetrics else {}
+    async with aiohttp.ClientSession() as http:
+        async with http.get(f"http://{exporter.host}:{exporter.port}{exporter.path}", headers=headers) as response:
+            assert response.status == 200
+            return response.headers['Content-Type'], await response.text()
+
+
+async def test_exporter_serves_koe_metrics():
+    registry = MetricsRegistry()
+    async with running(metrics=registry) as harness:
+        exporter = MetricsExporter(registry, port=0)
+        await exporter.start()
+        try:
+            session = await harness.connect(1)
+            await session.play(await harness.koe.load_tracks("song"))
+            await wait_for(lambda: harness.lavalink.players[1].started)
+            await wait_for(lambda: harness.lavalink.players[1].track is None)
+
+            content_type, text = await scrape(exporter)
+            assert content_type.startswith("text/plain; version=0.0.4")
+            samples = parse(text)
+
+            assert samples['koe_sessions'][(('mode', "PERSISTENT"),)] == 1
+            assert samples['koe_track_starts_total'][()] == 1
+            assert samples['koe_track_transitions_total'][(('reason', "finished"),)] == 1
+            assert samples['koe_time_to_first_audio_seconds_count'][()] == 1
+            assert samples['koe_websocket_messages_total'][(('node', "default"), ('op', "ready"))] == 1
+            assert any(dict(labels)['method'] == "PATCH" for labels in samples['koe_rest_request_duration_seconds_count'])
+
+            content_type, text = await scrape(exporter, openmetrics=True)
+            assert content_type.startswith("application/openmetrics-text")
+            assert text.endswith("# EOF\n")
+        finally:
+            await exporter.stop()
+
+
+async def test_lock_counters_never_go_down():
+    registry = MetricsRegistry()
+    async with running(metrics=registry) as harness:
+        exporter = MetricsExporter(registry, port=0)
+        await exporter.start()
+        try:
+            sessions = [await harness.connect(guild_id) for guild_id in range(1, 4)]
+            for session in sessions:
+                await session.set_volume(50)
+
+            before = parse((await scrape(exporter))[1])
+            for session in sessions:
+                await session.disconnect()
+            after = parse((await scrape(exporter))[1])
+
+            for name in ("koe_lock_acquisitions_total", "koe_lock_wait_seconds_total", "koe_lock_hold_seconds_total"):
+                for labels, value in before[name].items():
+                    assert after[name][labels] >= value, (name, labels)
+
+            # Disconnecting took each session's lock once more.
+            session_labels = (('lock', "session"),)
+            assert after['koe_lock_acquisitions_total'][session_labels] >= before['koe_lock_acquisitions_total'][session_labels] + 3
+            assert after['koe_sessions'][(('mode', "PERSISTENT"),)] == 0
+
+            # Scraping again without anything happening changes nothing.
+            again = parse((await scrape(exporter))[1])
+            assert again['koe_lock_acquisitions_total'] == after['koe_lock_acquisitions_total']
+        finally:
+            await exporter.stop()
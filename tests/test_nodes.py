@@ -0,0 +1,62 @@
+import pytest
+
+from koe.errors import NoNodeError
+
+from .harness import running, wait_for
+
+
+async def test_guilds_spread_over_nodes():
+    async with running(nodes=3) as harness:
+        sessions = [await harness.connect(guild_id) for guild_id in range(1, 10)]
+
+        counts = sorted(len(node.guild_ids) for node in harness.koe.nodes)
+        assert counts == [3, 3, 3]
+
+        # Each player exists on exactly the node that owns its guild.
+        for session in sessions:
+            owner = harness.koe.get_node_for(session.guild_id)
+            for lavalink in harness.lavalinks:
+                assert (int(session.guild_id) in lavalink.players) == (lavalink is harness.lavalink_for(owner))
+
+
+async def test_player_calls_route_to_owning_node():
+    async with running(nodes=2) as harness:
+        first = await harness.connect(1)
+        second = await harness.connect(2)
+        owners = {harness.koe.get_node_for(first.guild_id), harness.koe.get_node_for(second.guild_id)}
+        assert len(owners) == 2
+
+        await first.set_volume(50)
+        fake = harness.lavalink_for(harness.koe.get_node_for(first.guild_id))
+        assert fake.players[1].volume == 50
+        assert (await harness.koe.get_player(first.guild_id)).volume == 50
+
+        await first.disconnect()
+        assert 1 not in fake.players
+        assert all(1 not in node.guild_ids for node in harness.koe.nodes)
+        assert 2 in harness.lavalink_for(harness.koe.get_node_for(second.guild_id)).players
+
+
+async def test_draining_node_moves_players():
+    async with running(nodes=2) as harness:
+        for guild_id in range(1, 5):
+            await harness.connect(guild_id)
+
+        results = await harness.koe.drain_node("default")
+        assert all(result is None for result in results.values())
+
+        default = harness.koe.nodes.get("default")
+        assert not default.guild_ids
+        assert len(harness.koe.nodes.get("node-1").guild_ids) == 4
+        await wait_for(lambda: not harness.lavalinks[0].players)
+        assert sorted(harness.lavalinks[1].players) == [1, 2, 3, 4]
+
+        # New guilds aren't placed on a draining node either.
+        await harness.connect(5)
+        assert harness.koe.get_node_for(5).name == "node-1"
+
+
+async def test_unknown_node():
+    async with running() as harness:
+        with pytest.raises(NoNodeError):
+            harness.koe.nodes.get("missing")
@@ -0,0 +1,77 @@
+import asyncio
+
+from koe.impl.constructs import track as track_module
+from koe.impl.constructs.track import Track, decode_track_info
+from koe.session import prefetch
+from koe.testing import FakeLavalinkConfig, make_track
+
+from .harness import running, wait_for
+
+
+def broken(identifier: str) -> Track:
+    """
+    A track whose encoded string doesn't decode, but whose URI resolves.
+    """
+    data = make_track(identifier)
+    return Track.construct({**data, 'encoded': "not a track"})
+
+
+async def test_undecodable_tracks_are_re_resolved():
+    config = FakeLavalinkConfig(update_interval=0.02, track_length=10000, seed=1)
+    async with running(config=config) as harness:
+        session = await harness.connect(1)
+        session.enable_prefetch(lookahead=2, threshold=60000)
+
+        first = await harness.koe.load_tracks("first")
+        second = broken("second")
+        await session.enqueue_many([first, second])
+
+        await wait_for(lambda: session.queue._queue[1] is not second)
+        replacement = session.queue._queue[1]
+        # FakeLavalink names tracks after what was loaded, which was the URI.
+        assert decode_track_info(replacement.encoded).title == second.info.uri
+
+
+async def test_resolve_decodes_once(monkeypatch):
+    calls = []
+    def counting(encoded: str):
+        calls.append(encoded)
+        return decode_track_info(encoded)
+    monkeypatch.setattr(prefetch, "decode_track_info", counting)
+    monkeypatch.setattr(track_module, "decode_track_info", counting)
+
+    async with running() as harness:
+        session = await harness.connect(1)
+        session.enable_prefetch()
+        assert session.prefetcher is not None
+
+        track = Track.from_encoded(make_track("song")['encoded'])
+        assert await session.prefetcher._resolve(track) is track
+        assert len(calls) == 1
+        assert track._info is not None and track.info.title == "song"
+
+
+async def test_disconnect_cancels_prefetches_in_flight():
+    config = FakeLavalinkConfig(update_interval=0.02, track_length=10000, seed=1)
+    async with running(config=config) as harness:
+        session = await harness.connect(1)
+        session.enable_prefetch(lookahead=2, threshold=60000, preplay=True)
+        prefetcher = session.prefetcher
+        assert prefetcher is not None
+
+        await session.enqueue_many([await harness.koe.load_tracks("first"), broken("second")])
+        await wait_for(lambda: session._is_playing)
+
+        # Hold up re-resolving, and a preplay.
+        harness.lavalink.config.latency = 0.3
+        await wait_for(lambda: len(prefetcher._tasks) > 0)
+        prefetcher._spawn(prefetcher._preplay(session._current_track))
+        await asyncio.sleep(0.05)
+        harness.lavalink.config.latency = 0.0
+
+        await session.disconnect()
+        assert not prefetcher._tasks
+        assert prefetcher._preplay_timer is None
+
+        await asyncio.sleep(0.4)
+        assert 1 not in harness.lavalink.players
@@ -0,0 +1,167 @@
+import random
+
+import pytest
+
+from koe.errors import InvalidPosition
+from koe.impl.constructs.queue import BlockList, Queue
+from koe.impl.constructs.track import Track
+
+
+class SmallBlockList(BlockList):
+    # Tiny blocks, so a few hundred operations split and drop plenty.
+    LOAD = 4
+
+
+def assert_consistent(blocks: BlockList, model: list) -> None:
+    assert len(blocks) == len(model)
+    assert blocks.tolist() == model
+    assert all(blocks._blocks), "Empty block left behind"
+    for index in range(len(model)):
+        block, offset = blocks._locate(index)
+        assert blocks._blocks[block][offset] is model[index]
+
+
+@pytest.mark.parametrize("seed", range(25))
+def test_blocklist_matches_list(seed: int):
+    rng = random.Random(seed)
+    initial = [object() for _ in range(rng.randint(0, 40))]
+    blocks = SmallBlockList(initial)
+    model = list(initial)
+
+    for _ in range(500):
+        action = rng.random()
+        size = len(model)
+
+        if action < 0.3:
+            index = rng.randint(-size - 3, size + 3)
+            value = object()
+            blocks.insert(index, value)
+            model.insert(index, value)
+
+        elif action < 0.35:
+            value = object()
+            blocks.append(value)
+            model.append(value)
+
+        elif action < 0.4:
+            values = [object() for _ in range(rng.randint(0, 12))]
+            blocks.extend(values)
+            model.extend(values)
+
+        elif action < 0.65:
+            if size == 0:
+                with pytest.raises(IndexError):
+                    blocks.pop()
+                continue
+            index = rng.randint(-size, size - 1)
+            assert blocks.pop(index) is model.pop(index)
+
+        elif action < 0.75 and size > 0:
+            # Move, the way Queue.move does it.
+            src, dst = rng.randrange(size), rng.randrange(size)
+            blocks.insert(dst, blocks.pop(src))
+            model.insert(dst, model.pop(src))
+
+        elif action < 0.8 and size > 0:
+            index = rng.randint(-size, size - 1)
+            value = object()
+            blocks[index] = value
+            model[index] = value
+
+        elif action < 0.95:
+            start, stop = rng.randint(-5, size + 5), rng.randint(-5, size + 5)
+            step = rng.choice([None, None, 1, 2, -1])
+            assert blocks[start:stop:step] == model[start:stop:step]
+            assert blocks.slice(start, stop) == model[max(start, 0):max(stop, 0)]
+            if size:
+                index = rng.randint(-size, size - 1)
+                assert blocks[index] is model[index]
+            with pytest.raises(IndexError):
+                blocks[size]
+
+        elif action < 0.97:
+            blocks.clear()
+            model.clear()
+
+        else:
+            rng.shuffle(model)
+            blocks.reorder(model)
+
+        assert_consistent(blocks, model)
+
+
+def make_tracks(count: int, start: int = 0) -> list[Track]:
+    return [Track.from_encoded(f"track-{index}") for index in range(start, start + count)]
+
+
+@pytest.mark.parametrize("seed", range(10))
+async def test_queue_keeps_the_current_track(seed: int):
+    rng = random.Random(seed)
+    queue = Queue()
+    queue._queue = SmallBlockList()
+    model: list[Track] = []
+    pos = 0
+    made = 0
+
+    for _ in range(300):
+        action = rng.random()
+        size = len(model)
+        current = model[pos] if model else None
+        advanced = False
+
+        if action < 0.3:
+            track = make_tracks(1, made)[0]
+            made += 1
+            position = rng.randint(0, size)
+            await queue.insert(track, position)
+            if size > 0 and position <= pos:
+                pos += 1
+            model.insert(position, track)
+
+        elif action < 0.4:
+            tracks = make_tracks(rng.randint(1, 6), made)
+            made += len(tracks)
+            await queue.extend(tracks)
+            model.extend(tracks)
+
+        elif action < 0.6 and size > 1:
+            index = rng.randrange(size)
+            if index == pos:
+                with pytest.raises(InvalidPosition):
+                    await queue.remove_at(index + 1)
+                continue
+            assert await queue.remove_at(index + 1) is model.pop(index)
+            if index < pos:
+                pos -= 1
+
+        elif action < 0.8 and size > 0:
+            src, dst = rng.randrange(size), rng.randrange(size)
+            await queue.move(src + 1, dst + 1)
+            model.insert(dst, model.pop(src))
+            pos = model.index(current)
+
+        elif action < 0.9 and size > 1:
+            by = rng.randint(-size, size)
+            if 0 <= pos + by < size and by != 0:
+                assert await queue.advance_by(by) is model[pos + by]
+                pos += by
+                advanced = True
+            else:
+                with pytest.raises(InvalidPosition):
+                    await queue.advance_by(by)
+
+        elif action < 0.95 and size > 0:
+            await queue.shuffle()
+            tracks, new_pos = await queue.get_all_and_pos()
+            assert new_pos == pos
+            assert tracks[:pos + 1] == model[:pos + 1]
+            assert sorted(track.encoded for track in tracks) == sorted(track.encoded for track in model)
+            model = tracks
+
+        tracks, queue_pos = await queue.get_all_and_pos()
+        assert tracks == model
+        assert queue_pos == pos
+        assert await queue.get_current() is (model[pos] if model else None)
+        # Nothing but advancing changes which track is current.
+        if current is not None and not advanced:
+            assert model[pos] is current
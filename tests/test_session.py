@@ -0,0 +1,158 @@
+import hikari
+import pytest
+
+import koe
+
+from koe.errors import CircuitOpenError, ExistingSessionError, NoSessionError, RestError
+from koe.log import logger
+from koe.testing import FakeLavalinkConfig
+
+from .harness import running, wait_for
+
+
+async def test_connect_and_play():
+    async with running() as harness:
+        session = await harness.connect(1)
+        assert harness.lavalink.players[1].voice['endpoint'] == "fake.discord.media:443"
+        assert harness.lavalink.players[1].voice['channelId'] == "1001"
+
+        track = await harness.koe.load_tracks("song")
+        await session.enqueue(track)
+        await wait_for(lambda: harness.lavalink.players[1].started)
+        assert harness.lavalink.players[1].track['encoded'] == track.encoded
+
+
+async def test_tracks_advance_through_the_queue():
+    async with running() as harness:
+        session = await harness.connect(1)
+        playlist = await harness.koe.load_tracks("playlist:mix")
+        assert await session.enqueue_many(playlist.tracks[:3]) == 3
+
+        ends = []
+        async def on_end(event: koe.TrackEndEvent) -> None:
+            ends.append(event.reason)
+        harness.bot.subscribe(koe.TrackEndEvent, on_end)
+
+        await wait_for(lambda: len(ends) == 3)
+        assert ends == ["finished"] * 3
+        assert harness.lavalink.players[1].track is None
+
+
+async def test_duplicate_connect_is_rejected():
+    async with running() as harness:
+        await harness.connect(1)
+        with pytest.raises(ExistingSessionError):
+            await harness.connect(1)
+
+
+async def test_disconnect_deletes_player():
+    async with running() as harness:
+        session = await harness.connect(1)
+        await session.disconnect()
+
+        assert 1 not in harness.lavalink.players
+        with pytest.raises(NoSessionError):
+            await harness.koe.get_session_by(guild_id=1)
+        with pytest.raises(NoSessionError):
+            await session.set_volume(10)
+
+
+async def test_stop_disconnects_everything():
+    async with running() as harness:
+        for guild_id in range(1, 6):
+            await harness.connect(guild_id)
+
+        results = await harness.koe.stop()
+        assert sorted(results) == [1, 2, 3, 4, 5]
+        assert all(result is None for result in results.values())
+        assert not harness.lavalink.players
+        assert harness.bot.voice_updates[-5:] and all(channel is None for _, channel in harness.bot.voice_updates[-5:])
+
+
+async def test_failed_connect_releases_its_node():
+    async with running(nodes=2) as harness:
+        async def fail(*args, **kwargs) -> None:
+            raise RuntimeError("gateway down")
+        harness.bot.update_voice_state = fail
+
+        with pytest.raises(RuntimeError):
+            await harness.connect(1)
+
+        assert all(not node.guild_ids for node in harness.koe.nodes)
+        assert all(1 not in lavalink.players for lavalink in harness.lavalinks)
+        assert await harness.koe.get_session_or_none_by(guild_id=1) is None
+
+
+async def test_failed_player_update_releases_its_node():
+    async with running() as harness:
+        harness.lavalink.config.error_rate = 1.0
+        harness.lavalink.config.error_status = 503
+
+        # Retried until the circuit breaker gives up on the node.
+        with pytest.raises((RestError, CircuitOpenError)):
+            await harness.connect(1)
+
+        assert not harness.koe.nodes.get("default").guild_ids
+        assert 1 not in harness.koe._guild_nodes
+
+
+async def test_disconnect_with_open_breaker_logs_abandoned_player():
+    async with running() as harness:
+        session = await harness.connect(1)
+        node = harness.koe.nodes.get("default")
+        breaker = node.rest.resilience.breaker
+        for _ in range(breaker.failure_threshold):
+            breaker.record_failure()
+        assert not node.ready
+
+        warnings: list[str] = []
+        sink = logger.add(lambda message: warnings.append(message.record['message']), level="WARNING")
+        try:
+            await session.disconnect()
+        finally:
+            logger.remove(sink)
+
+        # The DELETE was refused, so the player is left behind, but the
+        # guild no longer counts against the node.
+        assert 1 in harness.lavalink.players
+        assert any("Left the player for GID 1 behind" in warning for warning in warnings)
+        assert not node.guild_ids
+        assert 1 not in harness.koe._guild_nodes
+
+
+async def test_voice_server_update_takes_the_player_position():
+    async with running(config=FakeLavalinkConfig(update_interval=60.0, seed=1)) as harness:
+        session = await harness.connect(1)
+        await session.play(await harness.koe.load_tracks("song"))
+        await wait_for(lambda: harness.lavalink.players[1].started)
+
+        # Playback moves on without a playerUpdate, then the voice server
+        # changes. Its PATCH answers with where the player really is.
+        player = harness.lavalink.players[1]
+        player.paused = True
+        player.position = 90000
+        await harness.bot.update_voice_state(1, 1001)
+        await wait_for(lambda: session._player_state is not None and session._player_state.position == 90000)
+
+        assert session._current_track_pos == 90000
+        assert 90000 <= session.snapshot_player().position < 91000
+
+
+async def test_kick_tears_the_session_down():
+    async with running(nodes=2) as harness:
+        session = await harness.connect(1)
+        session.enable_prefetch()
+        await session.play(await harness.koe.load_tracks("song"))
+        updates = len(harness.bot.voice_updates)
+
+        # Discord reports the bot leaving voice, without Koe asking to.
+        await harness.bot._answer_voice(hikari.Snowflake(1), None, False, False)
+        await wait_for(lambda: 1 not in harness.koe._guild_nodes)
+
+        assert session._connected is False
+        assert session.prefetcher is not None and not session.prefetcher._tasks
+        assert 1 not in harness.koe.starts
+        assert all(not node.guild_ids for node in harness.koe.nodes)
+        assert all(1 not in lavalink.players for lavalink in harness.lavalinks)
+        assert await harness.koe.get_session_or_none_by(guild_id=1) is None
+        assert len(harness.bot.voice_updates) == updates
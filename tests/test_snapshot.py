@@ -0,0 +1,53 @@
+import os
+import stat
+
+import pytest
+
+from koe.impl.constructs.snapshot import write_atomic
+
+
+def test_write_atomic(tmp_path):
+    path = tmp_path / "sessions.json"
+
+    write_atomic(str(path), b"first")
+    assert path.read_bytes() == b"first"
+
+    write_atomic(str(path), b"second")
+    assert path.read_bytes() == b"second"
+    assert os.listdir(tmp_path) == ["sessions.json"]
+
+
+def test_write_atomic_keeps_permissions(tmp_path):
+    path = tmp_path / "sessions.json"
+    path.write_bytes(b"old")
+    path.chmod(0o640)
+
+    write_atomic(str(path), b"new")
+    assert stat.S_IMODE(path.stat().st_mode) == 0o640
+
+
+def test_failed_write_leaves_the_old_file(tmp_path):
+    path = tmp_path / "sessions.json"
+    path.write_bytes(b"old")
+
+    with pytest.raises(TypeError):
+        write_atomic(str(path), "not bytes")  # type: ignore
+
+    assert path.read_bytes() == b"old"
+    assert os.listdir(tmp_path) == ["sessions.json"]
+
+
+def test_concurrent_writers_dont_share_a_temporary_file(tmp_path, monkeypatch):
+    path = tmp_path / "sessions.json"
+    names = []
+
+    replace = os.replace
+    def record(src, dst):
+        names.append(src)
+        replace(src, dst)
+    monkeypatch.setattr(os, "replace", record)
+
+    write_atomic(str(path), b"a")
+    write_atomic(str(path), b"b")
+    assert len(set(names)) == 2
+    assert all(os.path.dirname(name) == str(tmp_path) for name in names)
@@ -0,0 +1,141 @@
+import math
+import random
+import types
+
+import pytest
+
+from koe.impl import statistics
+from koe.impl.constructs.stats import CPU, FrameStats, Memory, NodeStats
+from koe.impl.statistics import FIELDS, StatisticsStore
+
+
+class Clock:
+    def __init__(self, now: float):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> Clock:
+    clock = Clock(1_000_000.0)
+    monkeypatch.setattr(statistics, "time", types.SimpleNamespace(time=clock.time))
+    return clock
+
+
+def make_stats(rng: random.Random) -> tuple[NodeStats, tuple[float, ...]]:
+    # Small ranges, so there are plenty of ties for min and max.
+    values = (
+        rng.randint(0, 5),
+        rng.randint(0, 5),
+        rng.randint(0, 3) * 1024,
+        rng.randint(4, 6) * 1024,
+        rng.choice([0.0, 0.25, 0.5, 1.0]),
+        rng.choice([0.0, 0.1, 0.2]),
+        rng.randint(0, 3000),
+        rng.randint(0, 10),
+        rng.randint(-3000, 0)
+    )
+    stats = NodeStats(
+        players=values[0],
+        playing_players=values[1],
+        uptime=0,
+        memory=Memory(free=0, used=values[2], allocated=values[3], reservable=0),
+        cpu=CPU(cores=4, system_load=values[4], lavalink_load=values[5]),
+        frame_stats=FrameStats(sent=values[6], nulled=values[7], deficit=values[8])
+    )
+    return stats, values
+
+
+def percentile(values: list[float], q: float) -> float:
+    values = sorted(values)
+    return values[max(math.ceil(q * len(values)) - 1, 0)]
+
+
+class Model:
+    """
+    What a StatisticsStore should hold, as a plain list of (time, values).
+    """
+    def __init__(self, capacity: int, max_age: float | None):
+        self.capacity = capacity
+        self.max_age = max_age
+        self.rows: list[tuple[float, tuple[float, ...]]] = []
+
+    def expire(self, now: float) -> None:
+        if self.max_age is not None:
+            self.rows = [row for row in self.rows if row[0] >= now - self.max_age]
+
+    def append(self, now: float, values: tuple[float, ...]) -> None:
+        if len(self.rows) == self.capacity:
+            self.rows.pop(0)
+        self.expire(now)
+        self.rows.append((now, values))
+
+    def column(self, index: int, now: float, window: float | None = None) -> list[float]:
+        cutoff = -math.inf if window is None else now - window
+        return [values[index] for timestamp, values in self.rows if timestamp >= cutoff]
+
+
+@pytest.mark.parametrize("seed", range(25))
+def test_store_matches_model(clock: Clock, seed: int):
+    rng = random.Random(seed)
+    capacity = rng.randint(1, 24)
+    max_age = rng.choice([None, 40.0, 250.0])
+    windows = (30.0, 120.0)
+
+    store = StatisticsStore(capacity=capacity, max_age=max_age, windows=windows)
+    model = Model(capacity, max_age)
+
+    for _ in range(400):
+        action = rng.random()
+
+        if action < 0.6:
+            clock.now += rng.choice([0.0, 1.0, 5.0, 17.5, 60.0])
+            stats, values = make_stats(rng)
+            store.append(stats, timestamp=clock.now)
+            model.append(clock.now, values)
+
+        elif action < 0.63:
+            store.clear()
+            model.rows = []
+
+        elif action < 0.7:
+            # Time passes with nothing recieved.
+            clock.now += rng.choice([10.0, 100.0])
+
+        else:
+            index = rng.randrange(len(FIELDS))
+            field = FIELDS[index]
+            window = rng.choice([None, *windows, 75.0])
+
+            assert store.column(field, window=window) == model.column(index, clock.now, window)
+
+            aggregate = store.aggregate(field, window=window)
+            model.expire(clock.now)
+            expected = model.column(index, clock.now, window)
+
+            if not expected:
+                assert aggregate is None
+            else:
+                assert aggregate is not None
+                assert aggregate.count == len(expected)
+                assert aggregate.mean == pytest.approx(sum(expected) / len(expected), abs=1e-6)
+                assert aggregate.min == min(expected)
+                assert aggregate.max == max(expected)
+                assert aggregate.p95 == percentile(expected, 0.95)
+
+        assert len(store) == len(model.rows)
+        assert [row['time'] for row in store] == [timestamp for timestamp, _ in model.rows]
+        if model.rows:
+            assert store.last("players") == model.rows[-1][1][0]
+        else:
+            assert store.last("players") is None
+
+
+def test_rejects_unknown_fields():
+    store = StatisticsStore()
+    with pytest.raises(ValueError):
+        store.aggregate("nope")
+    with pytest.raises(ValueError):
+        StatisticsStore(capacity=0)
@@ -0,0 +1,91 @@
+import time
+import typing as t
+
+import pytest
+
+from koe.errors import RestError
+from koe.impl.tracing import Span, Tracer
+
+from .harness import running, wait_for
+
+
+class RecordedSpan(Span):
+    __slots__ = ("name", "attributes", "parent", "error", "ended")
+
+    def __init__(self, name: str, attributes: dict[str, t.Any] | None, parent: Span | None):
+        self.name = name
+        self.attributes = dict(attributes or {})
+        self.parent = parent
+        self.error: str | None = None
+        self.ended: float | None = None
+
+    def set_attribute(self, key: str, value: t.Any) -> None:
+        self.attributes[key] = value
+
+    def set_error(self, description: str | None = None) -> None:
+        self.error = description
+
+    def end(self) -> None:
+        self.ended = time.perf_counter()
+
+
+class RecordingTracer(Tracer):
+    enabled = True
+
+    def __init__(self):
+        self.spans: list[RecordedSpan] = []
+
+    def start_span(self, name: str, attributes: dict[str, t.Any] | None = None, parent: Span | None = None) -> Span:
+        span = RecordedSpan(name, attributes, parent)
+        self.spans.append(span)
+        return span
+
+    def named(self, name: str) -> list[RecordedSpan]:
+        return [span for span in self.spans if span.name == name]
+
+
+def ancestors(span: Span) -> list[Span]:
+    chain = []
+    while isinstance(span, RecordedSpan) and span.parent is not None:
+        span = span.parent
+        chain.append(span)
+    return chain
+
+
+async def test_play_is_traced_until_the_track_starts():
+    tracer = RecordingTracer()
+    async with running(tracer=tracer) as harness:
+        session = await harness.connect(1)
+
+        with harness.koe.trace_play(1, query="song"):
+            await session.enqueue(await harness.koe.load_tracks("song"))
+        assert 1 in harness.koe.starts
+
+        await wait_for(lambda: 1 not in harness.koe.starts)
+        [play] = tracer.named("koe.play")
+        assert play.attributes['koe.outcome'] == "started"
+        assert play.ended is not None
+
+        # Everything done inside trace_play descends from it.
+        [load] = tracer.named("koe.load_tracks")
+        assert load.parent is play
+        [update] = tracer.named("koe.session.play")
+        assert play in ancestors(update)
+
+
+async def test_failed_play_closes_its_start():
+    tracer = RecordingTracer()
+    async with running(tracer=tracer) as harness:
+        session = await harness.connect(1)
+        track = await harness.koe.load_tracks("song")
+
+        harness.lavalink.config.error_rate = 1.0
+        harness.lavalink.config.error_status = 503
+        with pytest.raises(RestError):
+            await session.play(track)
+        harness.lavalink.config.error_rate = 0.0
+
+        assert 1 not in harness.koe.starts
+        [play] = tracer.named("koe.play")
+        assert play.attributes['koe.outcome'] == "failed"
+        assert play.error is not None
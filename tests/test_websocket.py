@@ -0,0 +1,122 @@
+import asyncio
+
+import koe
+from koe.log import logger
+
+from .harness import running, wait_for
+
+
+def fast_reconnects(harness) -> None:
+    for node in harness.koe.nodes:
+        node.ws.backoff_base = 0.01
+
+
+async def test_dropped_connection_resumes():
+    async with running() as harness:
+        fast_reconnects(harness)
+        session = await harness.connect(1)
+        await session.play(await harness.koe.load_tracks("song"))
+
+        node = harness.koe.nodes.get("default")
+        session_id = node.session_id
+        fake = harness.lavalink._sessions[session_id]
+        await wait_for(lambda: fake.resuming)
+
+        connection = fake.ws
+        await harness.lavalink.drop_connections()
+        await wait_for(lambda: fake.ws is not None and fake.ws is not connection and node.ready)
+
+        # Same Lavalink session, so the player kept playing throughout.
+        assert node.session_id == session_id
+        assert len(harness.lavalink._sessions) == 1
+        assert harness.lavalink.players[1].track is not None
+        await session.set_volume(30)
+        assert harness.lavalink.players[1].volume == 30
+
+
+async def test_players_are_rebuilt_without_resuming():
+    async with running(resume_timeout=None) as harness:
+        fast_reconnects(harness)
+        session = await harness.connect(1)
+        await session.set_volume(40)
+
+        node = harness.koe.nodes.get("default")
+        session_id = node.session_id
+        await harness.lavalink.drop_connections()
+        await wait_for(lambda: node.ready and node.session_id != session_id)
+
+        # The old session expired with its players, so they're rebuilt on
+        # the new one.
+        await wait_for(lambda: 1 in harness.lavalink.players)
+        player = harness.lavalink.players[1]
+        assert player.volume == 40
+        assert player.voice['endpoint'] == "fake.discord.media:443"
+
+
+async def test_reconnects_after_unexpected_error():
+    async with running() as harness:
+        fast_reconnects(harness)
+        node = harness.koe.nodes.get("default")
+
+        # Blow up handling the next track event, which nothing expects.
+        on_event = harness.koe.starts.on_event
+        def crash(data: dict) -> None:
+            harness.koe.starts.on_event = on_event
+            raise RuntimeError("boom")
+        harness.koe.starts.on_event = crash
+
+        session = await harness.connect(1)
+        started = asyncio.Event()
+        async def on_start(_: koe.TrackStartEvent) -> None:
+            started.set()
+        harness.bot.subscribe(koe.TrackStartEvent, on_start)
+
+        await session.play(await harness.koe.load_tracks("song"))
+        await wait_for(lambda: harness.koe.starts.on_event is on_event)
+        await wait_for(lambda: node.ready)
+        assert node.ws is not None and node.ws._task is not None and not node.ws._task.done()
+
+        # Events flow again once it's reconnected.
+        await session.play(await harness.koe.load_tracks("other song"))
+        await asyncio.wait_for(started.wait(), 5)
+
+
+async def test_bad_player_update_is_skipped():
+    async with running() as harness:
+        fast_reconnects(harness)
+        session = await harness.connect(1)
+        fake = next(iter(harness.lavalink._sessions.values()))
+        connection = fake.ws
+
+        await harness.lavalink._send(fake, {'op': "playerUpdate", 'guildId': "1"})
+        await harness.lavalink._send(fake, {
+            'op': "playerUpdate",
+            'guildId': "1",
+            'state': {'time': 1, 'position': 1234, 'connected': True, 'ping': 0}
+        })
+
+        await wait_for(lambda: session._player_state is not None and session._player_state.position == 1234)
+        assert fake.ws is connection
+
+
+async def test_unknown_op_is_logged_and_skipped():
+    async with running() as harness:
+        session = await harness.connect(1)
+        fake = next(iter(harness.lavalink._sessions.values()))
+        connection = fake.ws
+
+        warnings: list[str] = []
+        sink = logger.add(lambda message: warnings.append(message.record['message']), level="WARNING")
+        try:
+            await harness.lavalink._send(fake, {'op': "mystery"})
+            await harness.lavalink._send(fake, {
+                'op': "playerUpdate",
+                'guildId': "1",
+                'state': {'time': 1, 'position': 4321, 'connected': True, 'ping': 0}
+            })
+            await wait_for(lambda: session._player_state is not None and session._player_state.position == 4321)
+        finally:
+            logger.remove(sink)
+
+        assert any(warning.startswith("Unknown op mystery") for warning in warnings)
+        assert fake.ws is connection